@@ -3,7 +3,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field, field_validator
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from .deps import get_db
+from .deps import get_db, get_evaluate_strategies, get_indicator_set_repo, get_ingestion
+from ....core.usecases.evaluate_active_strategies_use_case import EvaluateActiveStrategiesUseCase
+from ....core.usecases.start_realtime_ingestion_use_case import StartRealtimeIngestionUseCase
 from ...external.database.indicator_set_repository_mongodb import IndicatorSetRepositoryMongoDB
 from ...external.database.strategy_repository_mongodb import StrategyRepositoryMongoDB
 
@@ -36,12 +38,15 @@ class IndicatorSetOutDTO(BaseModel):
     updated_at: Optional[int] = None
 
 @router.post("/indicator-sets", response_model=IndicatorSetOutDTO)
-async def create_indicator_set(dto: IndicatorSetCreateDTO, db: AsyncIOMotorDatabase = Depends(get_db)):
+async def create_indicator_set(
+    dto: IndicatorSetCreateDTO,
+    repo: IndicatorSetRepositoryMongoDB = Depends(get_indicator_set_repo),
+    ingestion_uc: Optional[StartRealtimeIngestionUseCase] = Depends(get_ingestion),
+):
     """
     Upsert an ACTIVE indicator set (unique per tuple).
     Returns the stored doc including cfg_hash (used as logical id).
     """
-    repo = IndicatorSetRepositoryMongoDB(db)
     stored = await repo.upsert_active({
         "symbol": dto.symbol,
         "ema_fast": dto.ema_fast,
@@ -51,6 +56,8 @@ async def create_indicator_set(dto: IndicatorSetCreateDTO, db: AsyncIOMotorDatab
     })
     if not stored:
         raise HTTPException(status_code=500, detail="Failed to upsert indicator set")
+    if ingestion_uc is not None:
+        ingestion_uc.invalidate_active_sets()
     return stored
 
 @router.get("/indicator-sets", response_model=List[IndicatorSetOutDTO])
@@ -138,12 +145,16 @@ class StrategyOutDTO(BaseModel):
     updated_at: Optional[int] = None
 
 @router.post("/strategies", response_model=StrategyOutDTO)
-async def create_strategy(dto: StrategyCreateDTO, db: AsyncIOMotorDatabase = Depends(get_db)):
+async def create_strategy(
+    dto: StrategyCreateDTO,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    indset_repo: IndicatorSetRepositoryMongoDB = Depends(get_indicator_set_repo),
+    evaluate_uc: Optional[EvaluateActiveStrategiesUseCase] = Depends(get_evaluate_strategies),
+):
     """
     Create or upsert a Strategy linked to an indicator set.
     'indicator_set_id' must be the cfg_hash returned by /indicator-sets.
     """
-    indset_repo = IndicatorSetRepositoryMongoDB(db)
     # Validate that the indicator_set exists and is ACTIVE
     set_doc = await indset_repo.get_by_id(dto.indicator_set_id) or await db[indset_repo.COLLECTION].find_one(
         {"cfg_hash": dto.indicator_set_id, "status": "ACTIVE"}, projection={"_id": False}
@@ -163,4 +174,6 @@ async def create_strategy(dto: StrategyCreateDTO, db: AsyncIOMotorDatabase = Dep
     })
     if not stored:
         raise HTTPException(status_code=500, detail="Failed to upsert strategy")
+    if evaluate_uc is not None:
+        evaluate_uc.invalidate_active(set_doc["cfg_hash"])
     return stored
@@ -1,6 +1,13 @@
+from typing import Optional
+
 from fastapi import Request
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from ...external.database.indicator_set_repository_mongodb import IndicatorSetRepositoryMongoDB
+from ...external.pipeline.pipeline_http_client import PipelineHttpClient
+from ....core.usecases.evaluate_active_strategies_use_case import EvaluateActiveStrategiesUseCase
+from ....core.usecases.start_realtime_ingestion_use_case import StartRealtimeIngestionUseCase
+
 def get_db(request: Request) -> AsyncIOMotorDatabase:
     """
     Resolve the Mongo database from FastAPI app state.
@@ -8,4 +15,40 @@ def get_db(request: Request) -> AsyncIOMotorDatabase:
     db = getattr(request.app.state, "db", None)
     if db is None:
         raise RuntimeError("Database is not initialized in app.state.db")
-    return db
\ No newline at end of file
+    return db
+
+
+def get_pipeline_http(request: Request) -> PipelineHttpClient:
+    """
+    Resolve the process-wide PipelineHttpClient from FastAPI app state.
+    Never build one per request: the shared instance owns the connection pool.
+    """
+    client = getattr(request.app.state, "pipeline_http", None)
+    if client is None:
+        raise RuntimeError("PipelineHttpClient is not initialized in app.state.pipeline_http")
+    return client
+
+
+def get_indicator_set_repo(request: Request) -> IndicatorSetRepositoryMongoDB:
+    """
+    Resolve the supervisor's IndicatorSetRepositoryMongoDB, so writes made here drop the
+    caches the realtime ingestion reads from. Falls back to a fresh one before start().
+    """
+    repo = getattr(request.app.state, "indicator_sets", None)
+    if repo is None:
+        repo = IndicatorSetRepositoryMongoDB(get_db(request))
+    return repo
+
+
+def get_evaluate_strategies(request: Request) -> Optional[EvaluateActiveStrategiesUseCase]:
+    """
+    Resolve the running strategy evaluator, if the realtime supervisor started one.
+    """
+    return getattr(request.app.state, "evaluate_strategies", None)
+
+
+def get_ingestion(request: Request) -> Optional[StartRealtimeIngestionUseCase]:
+    """
+    Resolve the running realtime ingestion, if the realtime supervisor started one.
+    """
+    return getattr(request.app.state, "ingestion", None)
@@ -1,12 +1,43 @@
 import asyncio
-import json
 import logging
 import random
 from typing import Awaitable, Callable, Optional
 
+import msgspec
 import websockets
 from websockets.exceptions import ConnectionClosed, ConnectionClosedError
 
+
+class Kline(msgspec.Struct):
+    """
+    The "k" object of a Binance kline event, with typed fields (prices arrive as strings).
+    """
+
+    interval: str = msgspec.field(name="i")
+    open_time: int = msgspec.field(name="t")
+    close_time: int = msgspec.field(name="T")
+    open: float = msgspec.field(name="o")
+    high: float = msgspec.field(name="h")
+    low: float = msgspec.field(name="l")
+    close: float = msgspec.field(name="c")
+    volume: float = msgspec.field(name="v")
+    trades: int = msgspec.field(name="n")
+    is_closed: bool = msgspec.field(name="x")
+
+
+class KlineEvent(msgspec.Struct):
+    """
+    Binance kline stream message; other messages on the socket decode with kline=None.
+    """
+
+    symbol: str = msgspec.field(name="s", default="")
+    kline: Optional[Kline] = msgspec.field(name="k", default=None)
+
+
+# one C-level pass from the raw frame to typed fields; strict=False parses the numeric strings
+_kline_event_decoder = msgspec.json.Decoder(KlineEvent, strict=False)
+
+
 class BinanceWebsocketClient:
     """
     Minimal native WebSocket client for Binance public kline_1m stream.
@@ -23,16 +54,16 @@ class BinanceWebsocketClient:
         self._logger = logging.getLogger(self.__class__.__name__)
         self._base_ws_url = base_ws_url.rstrip("/")
         self._symbol: Optional[str] = None
-        self._on_kline_closed: Optional[Callable[[dict], Awaitable[None]]] = None
+        self._on_kline_closed: Optional[Callable[[KlineEvent], Awaitable[None]]] = None
         self._stop_event = asyncio.Event()
         self._runner_task: Optional[asyncio.Task] = None
 
-    async def subscribe_kline_1m(self, symbol: str, on_kline_closed: Callable[[dict], Awaitable[None]]):
+    async def subscribe_kline_1m(self, symbol: str, on_kline_closed: Callable[[KlineEvent], Awaitable[None]]):
         """
         Start background task to consume {symbol}@kline_1m and dispatch closed candles.
 
         :param symbol: Trading symbol (e.g., 'ethusdt').
-        :param on_kline_closed: Async callback receiving the full event dict.
+        :param on_kline_closed: Async callback receiving the decoded KlineEvent.
         """
         if self._runner_task and not self._runner_task.done():
             self._logger.info("WebSocket already running; ignoring duplicate subscribe.")
@@ -114,17 +145,17 @@ class BinanceWebsocketClient:
             await asyncio.sleep(sleep_for)
             backoff = min(backoff * 2, backoff_max)
 
-    async def _handle_message(self, message: str):
+    async def _handle_message(self, message: str | bytes):
         """
         Parse an incoming WS message and dispatch closed kline to the callback.
         """
         try:
-            payload = json.loads(message)
-            k = payload.get("k")
-            if not k:
+            event = _kline_event_decoder.decode(message)
+            k = event.kline
+            if k is None:
                 return
             # Only closed candles
-            if k.get("x") is True and self._on_kline_closed is not None:
-                await self._on_kline_closed(payload)
+            if k.is_closed and self._on_kline_closed is not None:
+                await self._on_kline_closed(event)
         except Exception as exc:
             self._logger.exception("Error handling WS message: %s", exc)
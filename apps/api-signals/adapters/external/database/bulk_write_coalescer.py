@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError, WriteError
+
+
+class BulkWriteCoalescer:
+    """
+    Groups write operations submitted within a short window into a single
+    unordered `bulk_write` on one collection.
+
+    - Each caller still awaits its own write and gets the error of its own operation;
+      a failure of the whole batch (network, write concern) reaches every waiter.
+    - Operations are keyed (e.g. by the upsert filter); within one window the last
+      operation for a key wins, which matches what sequential upserts would leave.
+    - ordered=False lets Mongo apply the batch without serializing on each op.
+    """
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        window_sec: float = 0.01,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        :param collection: Motor collection the operations target.
+        :param window_sec: How long to wait for more operations before flushing.
+        :param logger: Optional logger.
+        """
+        self._col = collection
+        self._window = window_sec
+        self._logger = logger or logging.getLogger(self.__class__.__name__)
+        self._pending: Dict[Hashable, Tuple[Any, List[asyncio.Future]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def submit(self, key: Hashable, op: Any) -> bool:
+        """
+        Queue one pymongo write model (UpdateOne, InsertOne, ...) and wait until
+        the batch containing it has been written.
+
+        Returns True when every operation of the batch matched or upserted a document;
+        False means some filter (maybe this one) matched nothing.
+
+        :param key: Dedup key for the operation (last one wins within a window).
+        :param op: pymongo write model.
+        """
+        fut = asyncio.get_running_loop().create_future()
+        prev = self._pending.get(key)
+        waiters = prev[1] if prev else []
+        waiters.append(fut)
+        self._pending[key] = (op, waiters)
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+            self._flush_task.add_done_callback(self._flush_done)
+        return await fut
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        if task.cancelled() and self._flush_task is task:
+            # cancelled before taking its batch (even before it started): release the waiters
+            pending, self._pending = self._pending, {}
+            self._flush_task = None
+            for _, waiters in pending.values():
+                for fut in waiters:
+                    if not fut.done():
+                        fut.cancel()
+
+    async def _flush_later(self) -> None:
+        pending: Dict[Hashable, Tuple[Any, List[asyncio.Future]]] = {}
+        errors: Dict[int, Exception] = {}
+        failure: Optional[BaseException] = None
+        all_matched = False
+        try:
+            await asyncio.sleep(self._window)
+            pending, self._pending = self._pending, {}
+            self._flush_task = None
+            try:
+                res = await self._col.bulk_write([op for op, _ in pending.values()], ordered=False)
+                all_matched = res.matched_count + res.upserted_count >= len(pending)
+            except BulkWriteError as exc:
+                # unordered: only the ops listed in writeErrors failed, the rest were applied
+                for err in exc.details.get("writeErrors", []):
+                    errors[err["index"]] = WriteError(err.get("errmsg"), err.get("code"), err)
+                if exc.details.get("writeConcernErrors"):
+                    failure = exc
+                self._logger.warning(
+                    "bulk_write on %s: %s of %s ops failed", self._col.name, len(errors), len(pending)
+                )
+            except Exception as exc:
+                self._logger.warning("bulk_write on %s failed: %s", self._col.name, exc)
+                failure = exc
+        except asyncio.CancelledError as exc:
+            failure = exc
+            raise
+        finally:
+            for i, (_, waiters) in enumerate(pending.values()):
+                exc = errors.get(i, failure)
+                for fut in waiters:
+                    if fut.done():
+                        continue
+                    if isinstance(exc, asyncio.CancelledError):
+                        fut.cancel()
+                    elif exc is not None:
+                        fut.set_exception(exc)
+                    else:
+                        fut.set_result(all_matched)
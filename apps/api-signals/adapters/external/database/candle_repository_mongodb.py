@@ -1,9 +1,11 @@
 import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import List, Optional
 
+import numpy as np
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from ....core.domain.entities.candle_entity import CANDLE_ARRAY_COLUMNS, CandleDoc
 from ....core.repositories.candle_repository import CandleRepository
 
 
@@ -37,7 +39,7 @@ class CandleRepositoryMongoDB(CandleRepository):
             name="ix_symbol_interval_close_time",
         )
 
-    async def upsert_closed_candle(self, candle_doc: Dict) -> None:
+    async def upsert_closed_candle(self, candle_doc: CandleDoc) -> None:
         """
         Upsert the closed candle. Uses (symbol, interval, open_time) as the unique key.
 
@@ -70,7 +72,7 @@ class CandleRepositoryMongoDB(CandleRepository):
         }
         await self._collection.update_one(key, update, upsert=True)
 
-    async def get_last_n_closed(self, symbol: str, interval: str, n: int) -> List[Dict]:
+    async def get_last_n_closed(self, symbol: str, interval: str, n: int) -> List[CandleDoc]:
         """
         Return the last N closed candles sorted ascending by close_time.
         """
@@ -89,7 +91,22 @@ class CandleRepositoryMongoDB(CandleRepository):
         items.reverse()  # ascending
         return items
 
-    async def get_last_closed(self, symbol: str, interval: str) -> Optional[Dict]:
+    async def get_last_n_closed_array(self, symbol: str, interval: str, n: int) -> np.ndarray:
+        """
+        Return the last N closed candles as a (n, 5) float64 array (CANDLE_ARRAY_COLUMNS),
+        ascending by close_time. Only the numeric columns are fetched.
+        """
+        cursor = self._collection.find(
+            {"symbol": symbol, "interval": interval, "is_closed": True},
+            projection={"_id": False, **{c: True for c in CANDLE_ARRAY_COLUMNS}},
+            sort=[("close_time", -1)],
+            limit=max(1, n),
+        )
+        items = await cursor.to_list(length=max(1, n))
+        arr = np.array([[d[c] for c in CANDLE_ARRAY_COLUMNS] for d in items], dtype=np.float64)
+        return np.ascontiguousarray(arr[::-1].reshape(-1, len(CANDLE_ARRAY_COLUMNS)))  # ascending
+
+    async def get_last_closed(self, symbol: str, interval: str) -> Optional[CandleDoc]:
         """
         Return the most recent closed candle for the given symbol and interval.
         """
@@ -1,9 +1,11 @@
 import time
 from datetime import datetime, timezone
-from typing import Dict
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
 
+from .bulk_write_coalescer import BulkWriteCoalescer
+from ....core.domain.entities.indicator_snapshot_entity import IndicatorSnapshotDoc
 from ....core.repositories.indicator_repository import IndicatorRepository
 
 
@@ -22,6 +24,8 @@ class IndicatorRepositoryMongoDB(IndicatorRepository):
         """
         self._db = db
         self._collection = self._db[self.COLLECTION_NAME]
+        # many streams/sets close on the same second: coalesce into one unordered bulk_write
+        self._writer = BulkWriteCoalescer(self._collection)
 
     async def ensure_indexes(self) -> None:
         """
@@ -38,7 +42,7 @@ class IndicatorRepositoryMongoDB(IndicatorRepository):
             name="ix_symbol_ts_desc",
         )
 
-    async def upsert_snapshot(self, snapshot: Dict) -> None:
+    async def upsert_snapshot(self, snapshot: IndicatorSnapshotDoc) -> None:
         """
         Upsert snapshot keyed by (symbol, ts).
 
@@ -55,4 +59,4 @@ class IndicatorRepositoryMongoDB(IndicatorRepository):
                 "created_at_iso": now_iso
                 },
         }
-        await self._collection.update_one(key, update, upsert=True)
+        await self._writer.submit((snapshot["symbol"], snapshot["ts"]), UpdateOne(key, update, upsert=True))
@@ -1,10 +1,11 @@
 import time
 from datetime import datetime, timezone
 from hashlib import sha1
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from ....core.domain.entities.indicator_set_entity import IndicatorSetDoc
 from ....core.repositories.indicator_set_repository import IndicatorSetRepository
 
 
@@ -17,6 +18,15 @@ class IndicatorSetRepositoryMongoDB(IndicatorSetRepository):
 
     def __init__(self, db: AsyncIOMotorDatabase):
         self._col = db[self.COLLECTION]
+        # in-process caches (immutable metadata; invalidated on upsert_active). The ACTIVE
+        # list is not cached here: the realtime ingestion keeps its own, invalidated by the admin routes.
+        self._by_tuple: Dict[Tuple[str, int, int, int], IndicatorSetDoc] = {}
+        self._by_id: Dict[str, IndicatorSetDoc] = {}
+
+    def invalidate_cache(self) -> None:
+        """Drop every cached lookup (called after any write)."""
+        self._by_tuple.clear()
+        self._by_id.clear()
 
     async def ensure_indexes(self) -> None:
         await self._col.create_index(
@@ -26,7 +36,7 @@ class IndicatorSetRepositoryMongoDB(IndicatorSetRepository):
         )
         await self._col.create_index([("symbol", 1), ("status", 1)], name="ix_symbol_status")
 
-    async def upsert_active(self, doc: Dict) -> Dict:
+    async def upsert_active(self, doc: Dict) -> IndicatorSetDoc:
         now_ms = int(time.time() * 1000)
         now_iso = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
         if "cfg_hash" not in doc:
@@ -50,17 +60,30 @@ class IndicatorSetRepositoryMongoDB(IndicatorSetRepository):
             },
         }
         await self._col.update_one(key, update, upsert=True)
+        self.invalidate_cache()
         return await self._col.find_one(key, projection={"_id": False})
 
-    async def get_active_by_symbol(self, symbol: str) -> List[Dict]:
+    async def get_active_by_symbol(self, symbol: str) -> List[IndicatorSetDoc]:
         cursor = self._col.find({"symbol": symbol, "status": "ACTIVE"}, projection={"_id": False})
         return await cursor.to_list(length=None)
 
-    async def get_by_id(self, indicator_set_id: str) -> Optional[Dict]:
-        return await self._col.find_one({"_id": indicator_set_id}, projection={"_id": False})
+    async def get_by_id(self, indicator_set_id: str) -> Optional[IndicatorSetDoc]:
+        doc = self._by_id.get(indicator_set_id)
+        if doc is None:
+            doc = await self._col.find_one({"_id": indicator_set_id}, projection={"_id": False})
+            if doc is not None:
+                self._by_id[indicator_set_id] = doc
+        # copy: callers may mutate the result, the cached doc stays intact
+        return dict(doc) if doc is not None else None
 
-    async def find_one_by_tuple(self, symbol: str, ema_fast: int, ema_slow: int, atr_window: int) -> Optional[Dict]:
-        return await self._col.find_one(
-            {"symbol": symbol, "ema_fast": ema_fast, "ema_slow": ema_slow, "atr_window": atr_window},
-            projection={"_id": False},
-        )
+    async def find_one_by_tuple(self, symbol: str, ema_fast: int, ema_slow: int, atr_window: int) -> Optional[IndicatorSetDoc]:
+        key = (symbol, int(ema_fast), int(ema_slow), int(atr_window))
+        doc = self._by_tuple.get(key)
+        if doc is None:
+            doc = await self._col.find_one(
+                {"symbol": symbol, "ema_fast": ema_fast, "ema_slow": ema_slow, "atr_window": atr_window},
+                projection={"_id": False},
+            )
+            if doc is not None:
+                self._by_tuple[key] = doc
+        return dict(doc) if doc is not None else None
@@ -0,0 +1,66 @@
+import time
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from .bulk_write_coalescer import BulkWriteCoalescer
+from ....core.domain.entities.indicator_state_entity import IndicatorStateDoc
+from ....core.repositories.indicator_state_repository import IndicatorStateRepository
+
+
+class IndicatorStateRepositoryMongoDB(IndicatorStateRepository):
+    """
+    MongoDB implementation for IndicatorStateRepository (one document per cfg_hash).
+    """
+
+    COLLECTION_NAME = "indicator_state"
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        """
+        :param db: Motor async database instance.
+        """
+        self._db = db
+        self._collection = self._db[self.COLLECTION_NAME]
+        # all sets of a symbol advance on the same candle: coalesce into one unordered bulk_write
+        self._writer = BulkWriteCoalescer(self._collection)
+
+    async def ensure_indexes(self) -> None:
+        """
+        Unique index on 'cfg_hash'.
+        """
+        await self._collection.create_index(
+            [("cfg_hash", 1)],
+            unique=True,
+            name="ux_cfg_hash",
+        )
+
+    async def get(self, cfg_hash: str) -> Optional[IndicatorStateDoc]:
+        """
+        Get the state document of one indicator set.
+        """
+        return await self._collection.find_one({"cfg_hash": cfg_hash}, projection={"_id": False})
+
+    async def get_many(self, cfg_hashes: List[str]) -> Dict[str, IndicatorStateDoc]:
+        """
+        Get the state documents of several indicator sets, keyed by cfg_hash.
+        """
+        if not cfg_hashes:
+            return {}
+        cursor = self._collection.find({"cfg_hash": {"$in": list(cfg_hashes)}}, projection={"_id": False})
+        docs = await cursor.to_list(length=None)
+        return {d["cfg_hash"]: d for d in docs}
+
+    async def upsert(self, state: IndicatorStateDoc) -> None:
+        """
+        Upsert state keyed by cfg_hash. Adds updated_at; sets created_at on insert.
+        """
+        now_ms = int(time.time() * 1000)
+        fields = {k: v for k, v in state.items() if k not in ("created_at", "updated_at")}
+        update = {
+            "$set": {**fields, "updated_at": now_ms},
+            "$setOnInsert": {"created_at": now_ms},
+        }
+        await self._writer.submit(
+            state["cfg_hash"], UpdateOne({"cfg_hash": state["cfg_hash"]}, update, upsert=True)
+        )
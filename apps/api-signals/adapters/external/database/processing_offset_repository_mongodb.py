@@ -1,9 +1,12 @@
 import time
 from datetime import datetime, timezone
-from typing import Optional, Dict
+from typing import Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
 
+from .bulk_write_coalescer import BulkWriteCoalescer
+from ....core.domain.entities.processing_offset_entity import ProcessingOffsetDoc
 from ....core.repositories.processing_offset_repository import ProcessingOffsetRepository
 
 
@@ -20,6 +23,8 @@ class ProcessingOffsetRepositoryMongoDB(ProcessingOffsetRepository):
         """
         self._db = db
         self._collection = self._db[self.COLLECTION_NAME]
+        # many streams/sets close on the same second: coalesce into one unordered bulk_write
+        self._writer = BulkWriteCoalescer(self._collection)
 
     async def ensure_indexes(self) -> None:
         """
@@ -49,9 +54,9 @@ class ProcessingOffsetRepositoryMongoDB(ProcessingOffsetRepository):
                 "created_at_iso": now_iso,
                 },
         }
-        await self._collection.update_one(key, update, upsert=True)
+        await self._writer.submit(stream, UpdateOne(key, update, upsert=True))
 
-    async def get_by_stream(self, stream: str) -> Optional[Dict]:
+    async def get_by_stream(self, stream: str) -> Optional[ProcessingOffsetDoc]:
         """
         Get offset document by stream key.
         """
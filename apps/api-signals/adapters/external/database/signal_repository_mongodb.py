@@ -1,23 +1,30 @@
 # apps/api-signals/adapters/external/database/signal_repository_mongodb.py
 
+import logging
 import time
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Tuple
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
 
+from ....core.domain.entities.signal_entity import SignalDoc
 from ....core.repositories.signal_repository import SignalRepository
+from .bulk_write_coalescer import BulkWriteCoalescer
 
 
 class SignalRepositoryMongoDB(SignalRepository):
     """
-    Mongo implementation for signal logs (PENDING -> EXECUTED/FAILED).
+    Mongo implementation for signal logs (PENDING -> CLAIMED -> SENT/FAILED).
     """
 
     COLLECTION = "signals"
 
     def __init__(self, db: AsyncIOMotorDatabase):
         self._col = db[self.COLLECTION]
+        self._logger = logging.getLogger(self.__class__.__name__)
+        # the executor marks signals of several vaults at once: coalesce into one unordered bulk_write
+        self._writer = BulkWriteCoalescer(self._col)
 
     async def ensure_indexes(self) -> None:
         await self._col.create_index(
@@ -30,9 +37,8 @@ class SignalRepositoryMongoDB(SignalRepository):
             name="ix_status_created_at",
         )
 
-    async def upsert_signal(self, doc: Dict) -> None:
-        now_ms = int(time.time() * 1000)
-        now_iso = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+    @staticmethod
+    def _upsert_key_update(doc: SignalDoc, now_ms: int, now_iso: str) -> Tuple[Dict, Dict]:
         key = {
             "strategy_id": doc["strategy_id"],
             "ts": doc["ts"],
@@ -57,41 +63,91 @@ class SignalRepositoryMongoDB(SignalRepository):
                 "attempts": 0,
             },
         }
+        return key, update
+
+    async def upsert_signal(self, doc: SignalDoc) -> None:
+        now_ms = int(time.time() * 1000)
+        now_iso = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+        key, update = self._upsert_key_update(doc, now_ms, now_iso)
         await self._col.update_one(key, update, upsert=True)
 
-    async def list_pending(self, limit: int = 50) -> List[Dict]:
-        cursor = self._col.find(
-            {"status": "PENDING"},
-            sort=[("created_at", 1)],
-            limit=limit,
+    async def bulk_upsert(self, docs: List[SignalDoc]) -> None:
+        """
+        Upsert several signals (distinct keys) in one unordered bulk_write.
+        """
+        if not docs:
+            return
+        now_ms = int(time.time() * 1000)
+        now_iso = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+        ops = [UpdateOne(*self._upsert_key_update(d, now_ms, now_iso), upsert=True) for d in docs]
+        await self._col.bulk_write(ops, ordered=False)
+
+    async def claim_pending(self, worker_id: str, limit: int = 50) -> AsyncIterator[SignalDoc]:
+        """
+        One find_one_and_update per signal: the PENDING -> CLAIMED flip is atomic, so
+        concurrent executors never get the same signal. The first one is yielded as
+        soon as it is claimed.
+        """
+        for _ in range(limit):
+            now_ms = int(time.time() * 1000)
+            doc = await self._col.find_one_and_update(
+                {"status": "PENDING"},
+                {"$set": {"status": "CLAIMED", "claimed_by": worker_id, "claimed_at": now_ms}},
+                sort=[("created_at", 1)],
+                projection={"_id": False},
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is None:
+                return
+            yield doc
+
+    async def requeue_stale_claims(self, older_than_ms: int) -> int:
+        res = await self._col.update_many(
+            {"status": "CLAIMED", "claimed_at": {"$lt": older_than_ms}},
+            {
+                "$set": {"status": "PENDING", "updated_at": int(time.time() * 1000)},
+                "$unset": {"claimed_by": "", "claimed_at": ""},
+            },
         )
-        docs = await cursor.to_list(length=limit)
-        # remove Mongo _id for cleanliness
-        for d in docs:
-            d.pop("_id", None)
-        return docs
+        return res.modified_count
 
-    async def mark_success(self, signal: Dict) -> None:
-        now_ms = int(time.time() * 1000)
-        key = {
+    @staticmethod
+    def _signal_key(signal: SignalDoc) -> Dict:
+        return {
             "strategy_id": signal["strategy_id"],
             "ts": signal["ts"],
             "signal_type": signal["signal_type"],
         }
-        await self._col.update_one(
-            key,
-            {"$set": {"status": "SENT", "updated_at": now_ms}},
-        )
 
-    async def mark_failure(self, signal: Dict, error_msg: str) -> None:
+    async def _mark(self, signal: SignalDoc, status: str, update: Dict, now_ms: int) -> None:
+        """
+        Apply a final status, only while the signal is still CLAIMED by the worker that
+        took it: after a stale-claim requeue, another executor owns it and a late mark
+        must not overwrite its state.
+        """
+        key = self._signal_key(signal)
+        flt = {**key, "status": "CLAIMED", "claimed_by": signal.get("claimed_by")}
+        update = {**update, "$unset": {"claimed_by": "", "claimed_at": ""}}
+        all_matched = await self._writer.submit(tuple(key.values()), UpdateOne(flt, update))
+        if all_matched:
+            return
+        # some mark of the batch matched nothing: check whether it was this one
+        applied = await self._col.find_one({**key, "status": status, "updated_at": now_ms}, projection={"_id": True})
+        if applied is None:
+            self._logger.warning(
+                "Signal %s not marked %s: claim of %s was lost (requeued or taken by another executor)",
+                key, status, signal.get("claimed_by"),
+            )
+
+    async def mark_success(self, signal: SignalDoc) -> None:
         now_ms = int(time.time() * 1000)
-        key = {
-            "strategy_id": signal["strategy_id"],
-            "ts": signal["ts"],
-            "signal_type": signal["signal_type"],
-        }
-        await self._col.update_one(
-            key,
+        await self._mark(signal, "SENT", {"$set": {"status": "SENT", "updated_at": now_ms}}, now_ms)
+
+    async def mark_failure(self, signal: SignalDoc, error_msg: str) -> None:
+        now_ms = int(time.time() * 1000)
+        await self._mark(
+            signal,
+            "FAILED",
             {
                 "$set": {
                     "status": "FAILED",
@@ -100,4 +156,5 @@ class SignalRepositoryMongoDB(SignalRepository):
                 },
                 "$inc": {"attempts": 1},
             },
-        )
\ No newline at end of file
+            now_ms,
+        )
@@ -1,9 +1,12 @@
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Set
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
+from ....core.domain.entities.strategy_episode_entity import EpisodeDoc
 from ....core.repositories.strategy_episode_repository import StrategyEpisodeRepository
 
 
@@ -21,15 +24,27 @@ class StrategyEpisodeRepositoryMongoDB(StrategyEpisodeRepository):
         await self._col.create_index([("strategy_id", 1), ("status", 1)], name="ix_strategy_status")
         await self._col.create_index([("strategy_id", 1), ("open_time", -1)], name="ix_strategy_open_time")
 
-    async def get_open_by_strategy(self, strategy_id: str) -> Optional[Dict]:
+    async def get_open_by_strategy(self, strategy_id: str) -> Optional[EpisodeDoc]:
         return await self._col.find_one(
             {"strategy_id": strategy_id, "status": "OPEN"},
         )
 
-    async def open_new(self, doc: Dict) -> Dict:
-        now_ms = int(time.time() * 1000)
-        now_iso = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
-        payload = {
+    async def get_open_by_strategy_ids(self, strategy_ids: List[str]) -> Dict[str, EpisodeDoc]:
+        if not strategy_ids:
+            return {}
+        cursor = self._col.find(
+            {"strategy_id": {"$in": list(strategy_ids)}, "status": "OPEN"},
+            sort=[("open_time", -1)],
+        )
+        docs = await cursor.to_list(length=None)
+        out: Dict[str, EpisodeDoc] = {}
+        for d in docs:
+            out.setdefault(d["strategy_id"], d)  # mais recente primeiro
+        return out
+
+    @staticmethod
+    def _open_payload(doc: EpisodeDoc, now_ms: int, now_iso: str) -> EpisodeDoc:
+        return {
             **doc,
             "status": "OPEN",
             "created_at": now_ms,
@@ -38,6 +53,11 @@ class StrategyEpisodeRepositoryMongoDB(StrategyEpisodeRepository):
             "out_above_streak": doc.get("out_above_streak", 0),
             "out_below_streak": doc.get("out_below_streak", 0),
         }
+
+    async def open_new(self, doc: EpisodeDoc) -> EpisodeDoc:
+        now_ms = int(time.time() * 1000)
+        now_iso = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+        payload = self._open_payload(doc, now_ms, now_iso)
         await self._col.insert_one(payload)
         return payload
 
@@ -52,7 +72,56 @@ class StrategyEpisodeRepositoryMongoDB(StrategyEpisodeRepository):
         now_ms = int(time.time() * 1000)
         await self._col.update_one({"_id": episode_id}, {"$set": {**partial, "updated_at": now_ms}})
 
-    async def list_by_strategy(self, strategy_id: str, limit: int = 50) -> List[Dict]:
+    async def bulk_write_episodes(
+        self,
+        *,
+        partials: Dict[str, Dict],
+        closes: Dict[str, Dict],
+        opens: List[EpisodeDoc],
+    ) -> Set[str]:
+        """
+        Apply patches and closes of one snapshot in an unordered bulk_write, then insert the
+        new episodes in a second one. A new episode is upserted only while its strategy has
+        no OPEN episode, so a failed close skips its replacement without touching the others.
+        Returns the ids (patched, closed or new episodes) that were not written.
+        """
+        now_ms = int(time.time() * 1000)
+        now_iso = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+        failed: Set[str] = set()
+
+        ids = list(partials) + list(closes)
+        # patches only touch OPEN episodes: a deferred streak patch that arrives after the close
+        # must not overwrite the final counters written with it
+        ops: List[Any] = [
+            UpdateOne({"_id": episode_id, "status": "OPEN"}, {"$set": {**partial, "updated_at": now_ms}})
+            for episode_id, partial in partials.items()
+        ]
+        ops += [
+            UpdateOne({"_id": episode_id}, {"$set": {**fields, "status": "CLOSED", "updated_at": now_ms}})
+            for episode_id, fields in closes.items()
+        ]
+        if ops:
+            try:
+                await self._col.bulk_write(ops, ordered=False)
+            except BulkWriteError as exc:
+                failed.update(ids[err["index"]] for err in exc.details.get("writeErrors", []))
+
+        if opens:
+            ops = []
+            for doc in opens:
+                payload = self._open_payload(doc, now_ms, now_iso)
+                key = {"strategy_id": payload.pop("strategy_id"), "status": payload.pop("status")}
+                ops.append(UpdateOne(key, {"$setOnInsert": payload}, upsert=True))
+            try:
+                res = await self._col.bulk_write(ops, ordered=False)
+                upserted = set(res.upserted_ids)
+            except BulkWriteError as exc:
+                upserted = {u["index"] for u in exc.details.get("upserted", [])}
+            # sem upsert: a estratégia ainda tem episódio OPEN (fechamento falhou) ou erro de escrita
+            failed.update(doc["_id"] for i, doc in enumerate(opens) if i not in upserted)
+        return failed
+
+    async def list_by_strategy(self, strategy_id: str, limit: int = 50) -> List[EpisodeDoc]:
         cursor = self._col.find({"strategy_id": strategy_id}, sort=[("open_time", -1)], limit=limit, projection={"_id": False})
         return await cursor.to_list(length=limit)
 
@@ -77,4 +146,17 @@ class StrategyEpisodeRepositoryMongoDB(StrategyEpisodeRepository):
         await self._col.update_one(
             {"_id": episode_id},
             {"$push": {"execution_log": final_log}},
-        )
\ No newline at end of file
+        )
+
+    async def bulk_append_execution_logs(self, logs: Dict[str, List[Dict[str, Any]]]) -> None:
+        """
+        One $push/$each per episode, all in a single unordered bulk_write.
+        Entries keep the given order and are expected to carry their own ts/ts_iso.
+        """
+        ops = [
+            UpdateOne({"_id": episode_id}, {"$push": {"execution_log": {"$each": entries}}})
+            for episode_id, entries in logs.items()
+            if entries
+        ]
+        if ops:
+            await self._col.bulk_write(ops, ordered=False)
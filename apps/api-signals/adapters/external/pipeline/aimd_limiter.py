@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Optional
+
+
+class AIMDLimiter:
+    """
+    Concurrency limit that adapts to the downstream service (additive increase,
+    multiplicative decrease), like TCP congestion control.
+
+    - The limit grows by 1 after `limit` consecutive successes (one "window").
+    - It is halved on an overload signal (timeout, 429/503/504), at most once per
+      window: requests started before the last decrease do not halve it again.
+    - Waiters are served in arrival order as slots free up.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        :param initial_limit: Requests allowed in flight at start.
+        :param min_limit: Floor for the limit.
+        :param max_limit: Ceiling for the limit.
+        :param logger: Optional logger.
+        """
+        self._min = max(1, int(min_limit))
+        self._max = max(self._min, int(max_limit))
+        self._limit = min(self._max, max(self._min, int(initial_limit)))
+        self._logger = logger or logging.getLogger(self.__class__.__name__)
+        self._in_flight = 0
+        self._successes = 0
+        # bumped on every decrease; a request carries the epoch it started in
+        self._epoch = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> int:
+        """
+        Wait for a free slot and take it. Returns the token to pass to `release`.
+        """
+        while self._in_flight >= self._limit:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    # woken but cancelled before taking the slot: hand it to the next waiter
+                    self._wake()
+                raise
+            finally:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+        self._in_flight += 1
+        return self._epoch
+
+    def release(self, token: int, overloaded: Optional[bool] = False) -> None:
+        """
+        Free the slot taken by `acquire` and feed the request outcome to the controller
+        (`overloaded=None`: outcome unknown, the limit is left as is).
+        """
+        self._in_flight -= 1
+        if overloaded:
+            if token == self._epoch:
+                old = self._limit
+                self._limit = max(self._min, self._limit // 2)
+                self._epoch += 1
+                self._successes = 0
+                self._logger.warning("Downstream overloaded: concurrency limit %s -> %s", old, self._limit)
+        elif overloaded is not None:
+            self._successes += 1
+            if self._successes >= self._limit and self._limit < self._max:
+                self._limit += 1
+                self._successes = 0
+                self._logger.debug("Concurrency limit raised to %s", self._limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        free = self._limit - self._in_flight
+        while free > 0 and self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
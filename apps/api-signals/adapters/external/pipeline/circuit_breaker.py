@@ -0,0 +1,96 @@
+import logging
+import time
+from typing import Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker (CLOSED -> OPEN -> HALF_OPEN -> CLOSED).
+
+    - CLOSED: calls go through; `failure_threshold` consecutive failures open it.
+    - OPEN: calls fail at once with CircuitOpenError for `open_duration_sec`.
+    - HALF_OPEN: one probe call goes through; success closes the circuit,
+      failure opens it for another `open_duration_sec`.
+
+    Like AIMDLimiter, a call carries the epoch it started in (bumped every time the
+    circuit opens): outcomes of calls started before the circuit last opened are
+    ignored, so a slow success from before the outage cannot close it.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        open_duration_sec: float = 30.0,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        :param name: Endpoint name, used in errors and logs.
+        :param failure_threshold: Consecutive failures that open the circuit.
+        :param open_duration_sec: How long the circuit stays open before a probe.
+        :param logger: Optional logger.
+        """
+        self._name = name
+        self._threshold = max(1, int(failure_threshold))
+        self._open_duration = open_duration_sec
+        self._logger = logger or logging.getLogger(self.__class__.__name__)
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._epoch = 0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before_call(self) -> int:
+        """
+        Raise CircuitOpenError if the call must not be made now.
+        Returns the token to pass to `record`.
+        """
+        if self._state == self.CLOSED:
+            return self._epoch
+        if self._state == self.OPEN:
+            if time.monotonic() - self._opened_at < self._open_duration:
+                raise CircuitOpenError(f"circuit_open:{self._name}")
+            self._state = self.HALF_OPEN
+        if self._probe_in_flight:
+            raise CircuitOpenError(f"circuit_open:{self._name}")
+        self._probe_in_flight = True
+        return self._epoch
+
+    def record(self, token: int, ok: Optional[bool]) -> None:
+        """
+        Feed the outcome of a call allowed by `before_call` (None: unknown, e.g. cancelled).
+        """
+        if token != self._epoch:
+            # started before the circuit last opened: says nothing about the endpoint now
+            return
+        if self._state != self.CLOSED:
+            # only the probe is let through in the current epoch while not CLOSED
+            self._probe_in_flight = False
+        if ok is None:
+            return
+        if ok:
+            if self._state != self.CLOSED:
+                self._logger.info("Circuit %s closed", self._name)
+            self._state = self.CLOSED
+            self._failures = 0
+            return
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self._threshold:
+            self._logger.warning(
+                "Circuit %s open for %.0fs after %s failures", self._name, self._open_duration, self._failures
+            )
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._epoch += 1
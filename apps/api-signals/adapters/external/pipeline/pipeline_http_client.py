@@ -1,7 +1,51 @@
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
+import msgspec
+
+from ....core.domain.entities.lp_status_entity import LpStatus
+from .aimd_limiter import AIMDLimiter
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+# Typed view of the status payload: msgspec decodes only these fields and skips the rest.
+class _PriceSide(msgspec.Struct):
+    p_t1_t0: Optional[float] = None
+
+
+class _Prices(msgspec.Struct):
+    lower: Optional[_PriceSide] = None
+    upper: Optional[_PriceSide] = None
+
+
+class _Decimals(msgspec.Struct):
+    token0: Optional[int] = None
+    token1: Optional[int] = None
+
+
+class _Holdings(msgspec.Struct):
+    decimals: Optional[_Decimals] = None
+
+
+class _StatusWire(msgspec.Struct):
+    pool: Any = None
+    prices: Optional[_Prices] = None
+    lower: Optional[int] = None
+    upper: Optional[int] = None
+    spacing: Optional[int] = None
+    holdings: Optional[_Holdings] = None
+
+
+# provider answers that mean "too much load" (500/502 are application errors: reverts, RPC failures)
+_OVERLOAD_STATUS = frozenset({429, 503, 504})
+# answers that mean "provider unavailable": they count against the endpoint's circuit breaker
+_UNAVAILABLE_STATUS = frozenset({503, 504})
+
+_status_decoder = msgspec.json.Decoder(_StatusWire)
+_json_decoder = msgspec.json.Decoder()
 
 
 class PipelineHttpClient:
@@ -12,23 +56,217 @@ class PipelineHttpClient:
       {base_url}/api/vaults/{dex}/{alias}/...
 
     This client does *no* strategy logic, only raw HTTP.
+
+    One instance (and its pooled httpx.AsyncClient) is created by the supervisor
+    and shared by every consumer; call `close()` on shutdown.
+
+    /status bodies are cached per (dex, alias) for `status_ttl_sec`, and concurrent reads
+    of a vault share one request; every POST drops the cached status of its alias.
+
+    Requests in flight are capped by an AIMDLimiter: the cap starts at `initial_in_flight`,
+    grows while the provider keeps up and halves on timeouts / 429 / 503 / 504, never
+    going above `max_in_flight`.
+
+    Each endpoint (status, collect, withdraw, ...) has a CircuitBreaker: after
+    `breaker_failure_threshold` consecutive transport errors / 503 / 504 its calls raise
+    CircuitOpenError for `breaker_open_sec` instead of waiting on a dead provider.
+    get_status_summary keeps its None-on-error contract; the other calls let it propagate.
     """
 
-    def __init__(self, base_url: str, timeout_sec: float = 180.0):
+    def __init__(
+        self,
+        base_url: str,
+        timeout_sec: float = 180.0,
+        max_connections: int = 64,
+        max_keepalive_connections: int = 32,
+        keepalive_expiry_sec: float = 60.0,
+        max_in_flight: int = 32,
+        initial_in_flight: int = 4,
+        breaker_failure_threshold: int = 5,
+        breaker_open_sec: float = 30.0,
+        status_ttl_sec: float = 2.0,
+        status_timeout_sec: float = 15.0,
+    ):
         self._base_url = base_url.rstrip("/")
         self._timeout = timeout_sec
         self._logger = logging.getLogger(self.__class__.__name__)
+        # keep-alive pool sized for the concurrent executor; the provider speaks plain HTTP/1.1
+        self._client = httpx.AsyncClient(
+            timeout=self._timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry_sec,
+            ),
+        )
+        # caps requests in flight from this process (waiters queue here, not on the pool timeout);
+        # max_in_flight should not exceed max_connections
+        self._limiter = AIMDLimiter(initial_limit=initial_in_flight, max_limit=max_in_flight)
+        self._breaker_threshold = breaker_failure_threshold
+        self._breaker_open_sec = breaker_open_sec
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        # (dex, alias) -> (monotonic ts, raw /status body); shared by get_status and get_status_summary
+        self._status_ttl = status_ttl_sec
+        # /status is a read: fail it fast and let the caller retry (POSTs keep `timeout_sec`,
+        # since they wait for on-chain receipts and cutting them short could repeat a tx)
+        self._status_timeout = status_timeout_sec
+        self._status_cache: Dict[Tuple[str, str], Tuple[float, bytes]] = {}
+        # /status read in flight per (dex, alias): callers missing the cache wait on it
+        self._status_inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        # bumped on every POST / invalidate for an alias; a /status read started before it is not cached
+        self._alias_gen: Dict[str, int] = {}
 
-    async def get_status(self, dex: str, alias: str) -> Optional[Dict[str, Any]]:
+    async def close(self) -> None:
+        """Close the underlying connection pool."""
+        await self._client.aclose()
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current adaptive cap on requests in flight."""
+        return self._limiter.limit
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                endpoint,
+                failure_threshold=self._breaker_threshold,
+                open_duration_sec=self._breaker_open_sec,
+                logger=self._logger,
+            )
+            self._breakers[endpoint] = breaker
+        return breaker
+
+    async def _send(self, endpoint: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        breaker = self._breaker(endpoint)
+        breaker_token = breaker.before_call()
+        try:
+            token = await self._limiter.acquire()
+        except BaseException:
+            # cancelled while waiting for a slot: frees the probe, if this call was it
+            breaker.record(breaker_token, None)
+            raise
+        # None = the provider gave no signal (e.g. cancelled): limiter and breaker are left alone
+        overloaded: Optional[bool] = None
+        available: Optional[bool] = None
+        try:
+            r = await self._client.request(method, url, **kwargs)
+            overloaded = r.status_code in _OVERLOAD_STATUS
+            available = r.status_code not in _UNAVAILABLE_STATUS
+            return r
+        except httpx.TransportError:
+            # timeout / connection refused
+            overloaded, available = True, False
+            raise
+        finally:
+            self._limiter.release(token, overloaded)
+            breaker.record(breaker_token, available)
+
+    async def _get(self, endpoint: str, url: str, **kwargs: Any) -> httpx.Response:
+        return await self._send(endpoint, "GET", url, **kwargs)
+
+    async def _post(self, endpoint: str, url: str, payload: Dict[str, Any], alias: str) -> httpx.Response:
+        try:
+            return await self._send(endpoint, "POST", url, json=payload)
+        finally:
+            # any POST may move the vault (swaps can target another dex path): drop its cached status
+            keys = self._status_cache.keys() | self._status_inflight.keys()
+            self._drop_status(alias, [k for k in keys if k[1] == alias])
+
+    def invalidate(self, dex: str, alias: str) -> None:
+        """Drop the cached /status of one vault; the next read goes to the provider."""
+        self._drop_status(alias, [(dex, alias)])
+
+    def _drop_status(self, alias: str, keys: List[Tuple[str, str]]) -> None:
+        self._alias_gen[alias] = self._alias_gen.get(alias, 0) + 1
+        for key in keys:
+            self._status_cache.pop(key, None)
+            # the read in flight predates the change: later callers start a new one
+            self._status_inflight.pop(key, None)
+
+    async def _status_content(self, dex: str, alias: str, caller: str) -> Optional[bytes]:
+        """
+        Raw 200 body of /status, served from a `status_ttl_sec` cache when fresh.
+        Callers missing the cache share the read already in flight for the vault.
+        Non-200 and transport errors are logged and return None (never cached);
+        CircuitOpenError propagates.
+        """
+        key = (dex, alias)
+        hit = self._status_cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] <= self._status_ttl:
+            return hit[1]
+
+        task = self._status_inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_status_content(dex, alias, caller))
+            self._status_inflight[key] = task
+            task.add_done_callback(lambda t: self._status_done(key, t))
+        # one caller giving up does not cancel the read the others are waiting on
+        return await asyncio.shield(task)
+
+    def _status_done(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        if self._status_inflight.get(key) is task:
+            del self._status_inflight[key]
+        if not task.cancelled():
+            # nobody left awaiting it: no "exception was never retrieved"
+            task.exception()
+
+    async def _fetch_status_content(self, dex: str, alias: str, caller: str) -> Optional[bytes]:
         url = f"{self._base_url}/api/vaults/{dex}/{alias}/status"
+        gen = self._alias_gen.get(alias, 0)
+        started = time.monotonic()
+        try:
+            r = await self._get("status", url, timeout=self._status_timeout)
+            if r.status_code == 200:
+                if self._alias_gen.get(alias, 0) == gen:
+                    self._status_cache[(dex, alias)] = (started, r.content)
+                return r.content
+            self._logger.warning("status non-200 %s: %s %s", url, r.status_code, r.text)
+        except CircuitOpenError:
+            raise
+        except Exception as exc:
+            self._logger.exception("%s error for %s: %s", caller, url, exc)
+        return None
+
+    async def get_status(self, dex: str, alias: str) -> Optional[Dict[str, Any]]:
+        content = await self._status_content(dex, alias, "get_status")
+        if content is None:
+            return None
+        try:
+            return _json_decoder.decode(content)
+        except Exception as exc:
+            self._logger.exception("get_status decode error for %s/%s: %s", dex, alias, exc)
+        return None
+
+    async def get_status_summary(self, dex: str, alias: str) -> Optional[LpStatus]:
+        """
+        Same endpoint as `get_status`, decoded straight from bytes into the few fields
+        the reconciler reads (pool presence and current band, as prices and ticks).
+        """
+        try:
+            content = await self._status_content(dex, alias, "get_status_summary")
+        except CircuitOpenError as exc:
+            self._logger.debug("get_status_summary skipped for %s/%s: %s", dex, alias, exc)
+            return None
+        if content is None:
+            return None
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                r = await client.get(url)
-                if r.status_code == 200:
-                    return r.json()
-                self._logger.warning("status non-200 %s: %s %s", url, r.status_code, r.text)
+            st = _status_decoder.decode(content)
+            lower = st.prices.lower if st.prices else None
+            upper = st.prices.upper if st.prices else None
+            dec = st.holdings.decimals if st.holdings else None
+            return LpStatus(
+                has_pool=bool(st.pool),
+                pa=lower.p_t1_t0 if lower else None,
+                pb=upper.p_t1_t0 if upper else None,
+                lower_tick=st.lower,
+                upper_tick=st.upper,
+                spacing=st.spacing,
+                dec0=dec.token0 if dec else None,
+                dec1=dec.token1 if dec else None,
+            )
         except Exception as exc:
-            self._logger.exception("get_status error for %s: %s", url, exc)
+            self._logger.exception("get_status_summary decode error for %s/%s: %s", dex, alias, exc)
         return None
 
     async def post_collect(self, dex: str, alias: str) -> Optional[Dict[str, Any]]:
@@ -39,11 +277,12 @@ class PipelineHttpClient:
         url = f"{self._base_url}/api/vaults/{dex}/{alias}/collect"
         payload = {"alias": alias}
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                r = await client.post(url, json=payload)
-                if r.status_code == 200:
-                    return r.json()
-                self._logger.warning("collect non-200 %s: %s %s", url, r.status_code, r.text)
+            r = await self._post("collect", url, payload, alias)
+            if r.status_code == 200:
+                return _json_decoder.decode(r.content)
+            self._logger.warning("collect non-200 %s: %s %s", url, r.status_code, r.text)
+        except CircuitOpenError:
+            raise
         except Exception as exc:
             self._logger.exception("post_collect error for %s: %s", url, exc)
         return None
@@ -56,11 +295,12 @@ class PipelineHttpClient:
         url = f"{self._base_url}/api/vaults/{dex}/{alias}/withdraw"
         payload = {"alias": alias, "mode": mode}
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                r = await client.post(url, json=payload)
-                if r.status_code == 200:
-                    return r.json()
-                self._logger.warning("withdraw non-200 %s: %s %s", url, r.status_code, r.text)
+            r = await self._post("withdraw", url, payload, alias)
+            if r.status_code == 200:
+                return _json_decoder.decode(r.content)
+            self._logger.warning("withdraw non-200 %s: %s %s", url, r.status_code, r.text)
+        except CircuitOpenError:
+            raise
         except Exception as exc:
             self._logger.exception("post_withdraw error for %s: %s", url, exc)
         return None
@@ -96,11 +336,12 @@ class PipelineHttpClient:
             "pool_override": pool_override
         }
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                r = await client.post(url, json=payload)
-                if r.status_code == 200:
-                    return r.json()
-                self._logger.warning("swap non-200 %s: %s %s", url, r.status_code, r.text)
+            r = await self._post("swap_exact_in", url, payload, alias)
+            if r.status_code == 200:
+                return _json_decoder.decode(r.content)
+            self._logger.warning("swap non-200 %s: %s %s", url, r.status_code, r.text)
+        except CircuitOpenError:
+            raise
         except Exception as exc:
             self._logger.exception("post_swap_exact_in error for %s: %s", url, exc)
         return None
@@ -138,11 +379,12 @@ class PipelineHttpClient:
             "upper_price": upper_price,
         }
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                r = await client.post(url, json=payload)
-                if r.status_code == 200:
-                    return r.json()
-                self._logger.warning("rebalance non-200 %s: %s %s", url, r.status_code, r.text)
+            r = await self._post("rebalance", url, payload, alias)
+            if r.status_code == 200:
+                return _json_decoder.decode(r.content)
+            self._logger.warning("rebalance non-200 %s: %s %s", url, r.status_code, r.text)
+        except CircuitOpenError:
+            raise
         except Exception as exc:
             self._logger.exception("post_rebalance error for %s: %s", url, exc)
         return None
@@ -179,11 +421,12 @@ class PipelineHttpClient:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                r = await client.post(url, json=payload)
-                if r.status_code == 200:
-                    return r.json()
-                self._logger.warning("open non-200 %s: %s %s", url, r.status_code, r.text)
+            r = await self._post("open", url, payload, alias)
+            if r.status_code == 200:
+                return _json_decoder.decode(r.content)
+            self._logger.warning("open non-200 %s: %s %s", url, r.status_code, r.text)
+        except CircuitOpenError:
+            raise
         except Exception as exc:
             self._logger.exception("post_open error for %s: %s", url, exc)
         return None
@@ -195,11 +438,12 @@ class PipelineHttpClient:
         """
         url = f"{self._base_url}/api/vaults/{dex}/{alias}/unstake"
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                r = await client.post(url, json={})
-                if r.status_code == 200:
-                    return r.json()
-                self._logger.warning("unstake non-200 %s: %s %s", url, r.status_code, r.text)
+            r = await self._post("unstake", url, {}, alias)
+            if r.status_code == 200:
+                return _json_decoder.decode(r.content)
+            self._logger.warning("unstake non-200 %s: %s %s", url, r.status_code, r.text)
+        except CircuitOpenError:
+            raise
         except Exception as exc:
             self._logger.exception("post_unstake error for %s: %s", url, exc)
         return None
@@ -217,11 +461,12 @@ class PipelineHttpClient:
         url = f"{self._base_url}/api/vaults/{dex}/{alias}/stake"
         payload = {}
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                r = await client.post(url, json=payload)
-                if r.status_code == 200:
-                    return r.json()
-                self._logger.warning("stake non-200 %s: %s %s", url, r.status_code, r.text)
+            r = await self._post("stake", url, payload, alias)
+            if r.status_code == 200:
+                return _json_decoder.decode(r.content)
+            self._logger.warning("stake non-200 %s: %s %s", url, r.status_code, r.text)
+        except CircuitOpenError:
+            raise
         except Exception as exc:
             self._logger.exception("post_stake error for %s: %s", url, exc)
         return None
\ No newline at end of file
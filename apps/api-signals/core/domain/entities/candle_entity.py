@@ -0,0 +1,28 @@
+# apps/api-signals/core/domain/entities/candle_entity.py
+
+from typing import NotRequired, TypedDict
+
+
+# Column layout of the (n, 5) float64 arrays returned by CandleRepository.get_last_n_closed_array.
+CANDLE_ARRAY_COLUMNS = ("close_time", "open", "high", "low", "close")
+
+
+class CandleDoc(TypedDict):
+    """
+    Closed kline as stored in 'candles_1m' (keys normalized from the Binance event).
+    """
+
+    symbol: str
+    interval: str
+    open_time: int
+    close_time: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    trades: int
+    is_closed: NotRequired[bool]
+    created_at: NotRequired[int]
+    created_at_iso: NotRequired[str]
+    updated_at: NotRequired[int]
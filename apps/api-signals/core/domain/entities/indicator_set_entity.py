@@ -0,0 +1,20 @@
+# apps/api-signals/core/domain/entities/indicator_set_entity.py
+
+from typing import NotRequired, TypedDict
+
+
+class IndicatorSetDoc(TypedDict):
+    """
+    Indicator set (dedup tuple per symbol) as stored in 'indicator_sets'.
+    cfg_hash doubles as the logical id referenced by strategies.
+    """
+
+    symbol: str
+    ema_fast: int
+    ema_slow: int
+    atr_window: int
+    cfg_hash: str
+    status: str
+    created_at: NotRequired[int]
+    created_at_iso: NotRequired[str]
+    updated_at: NotRequired[int]
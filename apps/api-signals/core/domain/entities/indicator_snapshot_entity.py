@@ -0,0 +1,25 @@
+# apps/api-signals/core/domain/entities/indicator_snapshot_entity.py
+
+from typing import NotRequired, TypedDict
+
+
+class IndicatorSnapshotDoc(TypedDict):
+    """
+    Per-candle indicator snapshot as produced by IndicatorCalculationService
+    and stored in 'indicators_1m'.
+    """
+
+    symbol: str
+    ts: int
+    open: float
+    high: float
+    low: float
+    close: float
+    ema_fast: float
+    ema_slow: float
+    atr_pct: float
+    indicator_set_id: NotRequired[str]
+    cfg_hash: NotRequired[str]
+    created_at: NotRequired[int]
+    created_at_iso: NotRequired[str]
+    updated_at: NotRequired[int]
@@ -0,0 +1,23 @@
+# apps/api-signals/core/domain/entities/indicator_state_entity.py
+
+from typing import NotRequired, TypedDict
+
+
+class IndicatorStateDoc(TypedDict):
+    """
+    Running EMA/ATR state of one indicator set in 'indicator_state', so the next
+    closed candle can be applied incrementally instead of reloading the window.
+    """
+
+    cfg_hash: str
+    symbol: str
+    ema_fast_period: int
+    ema_slow_period: int
+    atr_window: int
+    ts: int  # close_time of the last candle applied
+    prev_close: float
+    ema_fast: float
+    ema_slow: float
+    atr: float
+    created_at: NotRequired[int]
+    updated_at: NotRequired[int]
@@ -0,0 +1,46 @@
+# apps/api-signals/core/domain/entities/lp_status_entity.py
+
+import math
+from typing import Optional, Tuple
+
+import msgspec
+
+_LOG_TICK_BASE = math.log(1.0001)
+
+
+class LpStatus(msgspec.Struct, frozen=True):
+    """
+    Flattened view of GET /api/vaults/{dex}/{alias}/status with only what the
+    reconciler needs: whether a position exists and its current band
+    (as prices and as on-chain ticks).
+    """
+
+    has_pool: bool
+    pa: Optional[float] = None  # prices.lower.p_t1_t0
+    pb: Optional[float] = None  # prices.upper.p_t1_t0
+    lower_tick: Optional[int] = None  # lower
+    upper_tick: Optional[int] = None  # upper
+    spacing: Optional[int] = None
+    dec0: Optional[int] = None  # holdings.decimals.token0
+    dec1: Optional[int] = None  # holdings.decimals.token1
+
+    def ticks_for(self, pa: float, pb: float) -> Optional[Tuple[int, int]]:
+        """
+        (lower, upper) ticks the provider would mint for the band [pa, pb] (p_t1_t0),
+        using the same mapping as its open/rebalance routes: nearest tick, ascending,
+        rounded to the pool spacing. None when decimals are unknown or prices are not > 0.
+        """
+        if self.dec0 is None or self.dec1 is None or pa <= 0 or pb <= 0:
+            return None
+        scale = 10 ** (self.dec0 - self.dec1)
+        lo = int(round(math.log(pa / scale) / _LOG_TICK_BASE))
+        hi = int(round(math.log(pb / scale) / _LOG_TICK_BASE))
+        if lo > hi:
+            lo, hi = hi, lo
+        sp = self.spacing
+        if sp:
+            if lo % sp != 0:
+                lo = int(round(lo / sp) * sp)
+            if hi % sp != 0:
+                hi = int(round(hi / sp) * sp)
+        return lo, hi
@@ -0,0 +1,15 @@
+# apps/api-signals/core/domain/entities/processing_offset_entity.py
+
+from typing import NotRequired, TypedDict
+
+
+class ProcessingOffsetDoc(TypedDict):
+    """
+    Processing checkpoint per stream key (e.g. 'ethusdt_1m') in 'processing_offsets'.
+    """
+
+    stream: str
+    last_closed_open_time: int
+    last_sync_at: int
+    created_at: NotRequired[int]
+    created_at_iso: NotRequired[str]
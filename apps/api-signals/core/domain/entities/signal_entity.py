@@ -1,17 +1,46 @@
 # apps/api-signals/core/domain/entities/signal_entity.py
 
-from typing import Any, Dict, Optional
-from pydantic import BaseModel
-from ..enums.signal_enums import SignalStatus, SignalType
+from typing import Any, Dict, List, Optional, TypedDict
 
+import msgspec
 
-class SignalEntity(BaseModel):
+from ..enums.signal_enums import SignalStatusLiteral, SignalTypeLiteral
+from .strategy_episode_entity import EpisodeDoc, EpisodeEntity
+
+
+class SignalDoc(TypedDict, total=False):
+    """
+    Raw signal document as written to / read from the 'signals' collection.
+    Unique key: (strategy_id, ts, signal_type).
+    """
+
+    strategy_id: str
+    indicator_set_id: str
+    cfg_hash: str
+    symbol: str
+    ts: int
+    signal_type: str
+    steps: List[Dict[str, Any]]
+    episode: EpisodeDoc
+    status: str
+    attempts: int
+    last_error: Optional[str]
+    created_at: int
+    created_at_iso: str
+    updated_at: int
+
+
+class SignalEntity(msgspec.Struct, kw_only=True):
     """
     Canonical in-memory representation of a signal document
     saved in the 'signals' collection.
 
     This mirrors what EvaluateActiveStrategiesUseCase writes
     and what ExecuteSignalPipelineUseCase will later consume.
+
+    msgspec.Struct (not Pydantic) because it is built per emitted signal:
+    slotted, with C-implemented conversion to the Mongo document. Pydantic stays for
+    the FastAPI request/response DTOs only.
     """
 
     strategy_id: str
@@ -20,37 +49,23 @@ class SignalEntity(BaseModel):
     symbol: str
     ts: int  # unix-ish timestamp from the snapshot that created this signal
 
-    signal_type: SignalType
-    status: SignalStatus = SignalStatus.PENDING
+    signal_type: SignalTypeLiteral
+    status: SignalStatusLiteral = "PENDING"
     attempts: int = 0
 
-    # payload is the structured instruction for the executor.
-    # We do NOT enforce a strict schema here because it can vary
-    # slightly depending on signal_type, but in practice we expect:
-    #
-    # {
-    #   "dex": "aerodrome" | "uniswap" | ...
-    #   "alias": "vault1",
-    #   "token0_address": "...",
-    #   "token1_address": "...",
-    #
-    #   "rebalance": {
-    #       "lower_tick": int,
-    #       "upper_tick": int,
-    #       "lower_price": float,
-    #       "upper_price": float,
-    #       "cap0": float,
-    #       "cap1": float
-    #   },
-    #
-    #   "swap": {
-    #       "token_in": str,
-    #       "token_out": str,
-    #       "amount_in": float,
-    #       "amount_in_usd": float
-    #   }
-    # }
-    payload: Dict[str, Any]
+    # ordered execution plan built by StrategyReconcilerService
+    # (COLLECT / WITHDRAW / SWAP_EXACT_IN / OPEN / STAKE ...), each {"action": ..., "payload": {...}}
+    steps: List[Dict[str, Any]]
+
+    # desired episode the plan moves the vault to
+    episode: EpisodeEntity
 
     # Optional execution result metadata
     last_error: Optional[str] = None
+
+    def to_doc(self) -> SignalDoc:
+        """Plain dict for the Mongo boundary (an unset last_error is not written)."""
+        doc = msgspec.to_builtins(self)
+        if doc.get("last_error") is None:
+            doc.pop("last_error", None)
+        return doc
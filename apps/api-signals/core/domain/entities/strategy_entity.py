@@ -0,0 +1,20 @@
+# apps/api-signals/core/domain/entities/strategy_entity.py
+
+from typing import Any, Dict, NotRequired, TypedDict
+
+
+class StrategyDoc(TypedDict):
+    """
+    Strategy document in 'strategies'. `params` follows StrategyParamsDTO
+    (skews, caps, tiers, cooldowns, vault wiring).
+    """
+
+    name: str
+    symbol: str
+    status: str
+    indicator_set_id: str
+    cfg_hash: str
+    params: Dict[str, Any]
+    created_at: NotRequired[int]
+    created_at_iso: NotRequired[str]
+    updated_at: NotRequired[int]
@@ -0,0 +1,82 @@
+# apps/api-signals/core/domain/entities/strategy_episode_entity.py
+
+from typing import Any, Dict, List, Optional, TypedDict
+
+import msgspec
+
+
+class EpisodeDoc(TypedDict, total=False):
+    """
+    Strategy episode (one active band) in 'strategy_episodes'.
+
+    total=False: OPEN episodes carry the open/streak fields, CLOSED ones add
+    the close_* fields, and the executor appends execution_log entries.
+    """
+
+    _id: str
+    strategy_id: str
+    symbol: str
+    status: str
+    pool_type: str
+    mode_on_open: str
+    majority_on_open: str
+    target_major_pct: float
+    target_minor_pct: float
+    open_time: int
+    open_time_iso: Optional[str]
+    open_price: float
+    Pa: float
+    Pb: float
+    last_event_bar: int
+    atr_streak: Dict[str, int]
+    out_above_streak: int
+    out_below_streak: int
+    dex: Optional[str]
+    alias: Optional[str]
+    token0_address: Optional[str]
+    token1_address: Optional[str]
+    gauge_flow_enabled: bool
+    close_time: int
+    close_time_iso: Optional[str]
+    close_reason: str
+    close_price: float
+    execution_log: List[Dict[str, Any]]
+    created_at: int
+    created_at_iso: str
+    updated_at: int
+
+
+class EpisodeEntity(msgspec.Struct, kw_only=True):
+    """
+    New OPEN episode as built by EvaluateActiveStrategiesUseCase.
+
+    Slotted struct while the snapshot is evaluated (reconcile, embedded in the
+    signal); turned into an EpisodeDoc only at the Mongo boundary.
+    """
+
+    id: str = msgspec.field(name="_id")
+    strategy_id: str
+    symbol: str
+    pool_type: str
+    mode_on_open: str
+    majority_on_open: str
+    target_major_pct: float
+    target_minor_pct: float
+    open_time: int
+    open_time_iso: Optional[str] = None
+    open_price: float
+    Pa: float
+    Pb: float
+    last_event_bar: int = 0
+    atr_streak: Dict[str, int] = {}
+    out_above_streak: int = 0
+    out_below_streak: int = 0
+    dex: Optional[str] = None
+    alias: Optional[str] = None
+    token0_address: Optional[str] = None
+    token1_address: Optional[str] = None
+    gauge_flow_enabled: bool = False
+
+    def to_doc(self) -> EpisodeDoc:
+        """Plain dict (with '_id') for the Mongo boundary."""
+        return msgspec.to_builtins(self)
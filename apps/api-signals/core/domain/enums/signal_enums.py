@@ -1,6 +1,7 @@
 # apps/api-signals/core/domain/enums/signal_enums.py
 
 from enum import Enum
+from typing import Literal
 
 
 class SignalStatus(str, Enum):
@@ -8,6 +9,8 @@ class SignalStatus(str, Enum):
     Lifecycle of a signal produced by strategy evaluation.
     """
     PENDING = "PENDING"     # created by EvaluateActiveStrategiesUseCase
+    CLAIMED = "CLAIMED"     # taken by one executor; back to PENDING if it goes stale
+    SENT = "SENT"           # pipeline executed every step (what the executor writes)
     EXECUTED = "EXECUTED"   # successfully sent/applied to vault
     FAILED = "FAILED"       # tried to execute but hit an error
 
@@ -26,9 +29,18 @@ class SignalType(str, Enum):
     # Just realign current range to desired Pa/Pb and caps (no swap).
     REBALANCE_TO_RANGE = "REBALANCE_TO_RANGE"
 
+    # Move an existing position to a new range (withdraw -> swap -> open).
+    ROTATE_RANGE = "ROTATE_RANGE"
+
     # Full maintenance flow on an existing vault:
     # 1) collect fees
     # 2) optionally swap tokens to desired ratio
     # 3) rebalance to target ticks/prices
     FULL_MAINTENANCE = "FULL_MAINTENANCE"
     # (a.k.a collect+swap+rebalance)
+
+
+# Plain-string aliases of the enums above, used by msgspec structs on the
+# queue path (validated by the C decoder, no Enum lookup per field).
+SignalStatusLiteral = Literal["PENDING", "CLAIMED", "SENT", "EXECUTED", "FAILED"]
+SignalTypeLiteral = Literal["OPEN_NEW_RANGE", "REBALANCE_TO_RANGE", "ROTATE_RANGE", "FULL_MAINTENANCE"]
@@ -0,0 +1,26 @@
+# apps/api-signals/core/domain/enums/strategy_enums.py
+
+from enum import IntEnum
+from typing import Optional
+
+
+class TriggerKind(IntEnum):
+    """
+    Why an open episode is closed during strategy evaluation.
+
+    Int-valued so the vectorized gates can carry it in NumPy arrays; the string form
+    only exists in the episode's close_reason.
+    """
+    NONE = 0
+    CROSS_MIN = 1   # price confirmed below Pa
+    CROSS_MAX = 2   # price confirmed above Pb
+    HIGH_VOL = 3    # ATR% above the high-vol threshold (or high-vol band on the wrong side)
+    TIGHTEN = 4     # a tier's ATR% streak confirmed; the tier name comes alongside
+
+    def close_reason(self, tier_name: Optional[str] = None) -> str:
+        """
+        Persisted close_reason: 'cross_min' | 'cross_max' | 'high_vol' | 'tighten_<tier>'.
+        """
+        if self is TriggerKind.TIGHTEN:
+            return f"tighten_{tier_name}"
+        return self.name.lower()
@@ -1,5 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import List, Optional
+
+import numpy as np
+
+from ..domain.entities.candle_entity import CandleDoc
 
 
 class CandleRepository(ABC):
@@ -15,7 +19,7 @@ class CandleRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def upsert_closed_candle(self, candle_doc: Dict) -> None:
+    async def upsert_closed_candle(self, candle_doc: CandleDoc) -> None:
         """
         Upsert a closed 1m candle using a unique key (symbol, interval, open_time).
 
@@ -24,7 +28,7 @@ class CandleRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_last_n_closed(self, symbol: str, interval: str, n: int) -> List[Dict]:
+    async def get_last_n_closed(self, symbol: str, interval: str, n: int) -> List[CandleDoc]:
         """
         Return the last N closed candles for a given symbol and interval, sorted ascending by close_time.
 
@@ -36,7 +40,20 @@ class CandleRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_last_closed(self, symbol: str, interval: str) -> Optional[Dict]:
+    async def get_last_n_closed_array(self, symbol: str, interval: str, n: int) -> np.ndarray:
+        """
+        Same as `get_last_n_closed`, as a float64 array of shape (n, 5) with the columns
+        in CANDLE_ARRAY_COLUMNS order (close_time, open, high, low, close).
+
+        :param symbol: Trading symbol, e.g. 'ETHUSDT'.
+        :param interval: Interval string, e.g. '1m'.
+        :param n: Number of candles to return.
+        :return: 2D array (ascending by close_time).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_last_closed(self, symbol: str, interval: str) -> Optional[CandleDoc]:
         """
         Return the most recent closed candle for the given symbol and interval.
 
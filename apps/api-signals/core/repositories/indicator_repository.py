@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+
+from ..domain.entities.indicator_snapshot_entity import IndicatorSnapshotDoc
 
 
 class IndicatorRepository(ABC):
@@ -15,7 +16,7 @@ class IndicatorRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def upsert_snapshot(self, snapshot: Dict) -> None:
+    async def upsert_snapshot(self, snapshot: IndicatorSnapshotDoc) -> None:
         """
         Upsert a per-candle indicator snapshot document.
 
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional
 
+from ..domain.entities.indicator_set_entity import IndicatorSetDoc
+
 
 class IndicatorSetRepository(ABC):
     """
@@ -13,7 +15,7 @@ class IndicatorSetRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def upsert_active(self, doc: Dict) -> Dict:
+    async def upsert_active(self, doc: Dict) -> IndicatorSetDoc:
         """
         Upsert an ACTIVE indicator set and return the stored document.
         Expected keys: symbol, ema_fast, ema_slow, atr_window, cfg_hash, status.
@@ -21,16 +23,16 @@ class IndicatorSetRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_active_by_symbol(self, symbol: str) -> List[Dict]:
+    async def get_active_by_symbol(self, symbol: str) -> List[IndicatorSetDoc]:
         """Return all ACTIVE sets for a symbol."""
         raise NotImplementedError
 
     @abstractmethod
-    async def get_by_id(self, indicator_set_id: str) -> Optional[Dict]:
+    async def get_by_id(self, indicator_set_id: str) -> Optional[IndicatorSetDoc]:
         """Fetch one indicator set by id."""
         raise NotImplementedError
 
     @abstractmethod
-    async def find_one_by_tuple(self, symbol: str, ema_fast: int, ema_slow: int, atr_window: int) -> Optional[Dict]:
+    async def find_one_by_tuple(self, symbol: str, ema_fast: int, ema_slow: int, atr_window: int) -> Optional[IndicatorSetDoc]:
         """Find set by tuple."""
         raise NotImplementedError
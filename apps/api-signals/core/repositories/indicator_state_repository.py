@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from ..domain.entities.indicator_state_entity import IndicatorStateDoc
+
+
+class IndicatorStateRepository(ABC):
+    """
+    Repository interface for the running EMA/ATR state of each indicator set.
+    """
+
+    @abstractmethod
+    async def ensure_indexes(self) -> None:
+        """
+        Ensure the collection has the proper indexes.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, cfg_hash: str) -> Optional[IndicatorStateDoc]:
+        """
+        Retrieve the state of one indicator set.
+
+        :param cfg_hash: Indicator set hash.
+        :return: State document or None (cold start).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_many(self, cfg_hashes: List[str]) -> Dict[str, IndicatorStateDoc]:
+        """
+        Retrieve the states of several indicator sets in one query.
+
+        :param cfg_hashes: Indicator set hashes.
+        :return: Mapping cfg_hash -> state (missing sets are absent).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upsert(self, state: IndicatorStateDoc) -> None:
+        """
+        Upsert the state keyed by cfg_hash.
+        """
+        raise NotImplementedError
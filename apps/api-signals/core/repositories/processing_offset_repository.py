@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from typing import Optional
+
+from ..domain.entities.processing_offset_entity import ProcessingOffsetDoc
 
 
 class ProcessingOffsetRepository(ABC):
@@ -26,7 +28,7 @@ class ProcessingOffsetRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_by_stream(self, stream: str) -> Optional[Dict]:
+    async def get_by_stream(self, stream: str) -> Optional[ProcessingOffsetDoc]:
         """
         Retrieve the processing offset document for a given stream.
 
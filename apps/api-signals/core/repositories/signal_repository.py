@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import AsyncIterator, List
+
+from ..domain.entities.signal_entity import SignalDoc
 
 
 class SignalRepository(ABC):
@@ -9,25 +11,41 @@ class SignalRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def upsert_signal(self, doc: Dict) -> None:
+    async def upsert_signal(self, doc: SignalDoc) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def bulk_upsert(self, docs: List[SignalDoc]) -> None:
+        """
+        Upsert several signals in a single round-trip.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim_pending(self, worker_id: str, limit: int = 50) -> AsyncIterator[SignalDoc]:
+        """
+        Atomically move pending signals to CLAIMED (oldest first), one at a time, and
+        yield each one claimed by `worker_id`. A signal is yielded to a single worker.
+        """
         raise NotImplementedError
 
     @abstractmethod
-    async def list_pending(self, limit: int = 50) -> List[Dict]:
+    async def requeue_stale_claims(self, older_than_ms: int) -> int:
         """
-        Return latest pending signals to process.
+        Put CLAIMED signals whose claim is older than `older_than_ms` back to PENDING
+        (their executor died). Returns how many were requeued.
         """
         raise NotImplementedError
 
     @abstractmethod
-    async def mark_success(self, signal: Dict) -> None:
+    async def mark_success(self, signal: SignalDoc) -> None:
         """
         Mark as SENT (success).
         """
         raise NotImplementedError
 
     @abstractmethod
-    async def mark_failure(self, signal: Dict, error_msg: str) -> None:
+    async def mark_failure(self, signal: SignalDoc, error_msg: str) -> None:
         """
         Mark as FAILED with last_error.
         """
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Set
+
+from ..domain.entities.strategy_episode_entity import EpisodeDoc
 
 
 class StrategyEpisodeRepository(ABC):
@@ -13,12 +15,17 @@ class StrategyEpisodeRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_open_by_strategy(self, strategy_id: str) -> Optional[Dict]:
+    async def get_open_by_strategy(self, strategy_id: str) -> Optional[EpisodeDoc]:
         """Return the OPEN episode for a strategy or None."""
         raise NotImplementedError
 
     @abstractmethod
-    async def open_new(self, doc: Dict) -> Dict:
+    async def get_open_by_strategy_ids(self, strategy_ids: List[str]) -> Dict[str, EpisodeDoc]:
+        """Return the OPEN episodes of several strategies in one query, keyed by strategy_id."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def open_new(self, doc: EpisodeDoc) -> EpisodeDoc:
         """Insert a new OPEN episode; returns the stored document."""
         raise NotImplementedError
 
@@ -33,7 +40,22 @@ class StrategyEpisodeRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def list_by_strategy(self, strategy_id: str, limit: int = 50) -> List[Dict]:
+    async def bulk_write_episodes(
+        self,
+        *,
+        partials: Dict[str, Dict],
+        closes: Dict[str, Dict],
+        opens: List[EpisodeDoc],
+    ) -> Set[str]:
+        """
+        Apply patches (by episode id), closes (by episode id) and new OPEN episodes in bulk.
+        A failure is isolated to its episode; a new episode is not stored while its strategy
+        still has an OPEN one. Returns the ids that were not written.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_by_strategy(self, strategy_id: str, limit: int = 50) -> List[EpisodeDoc]:
         """History: recent episodes for a strategy."""
         raise NotImplementedError
 
@@ -43,4 +65,9 @@ class StrategyEpisodeRepository(ABC):
         episode_id: str,
         log: Dict[str, Any],
     ) -> None:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    async def bulk_append_execution_logs(self, logs: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Push several execution log entries (already timestamped, in order) per episode in one round-trip."""
+        raise NotImplementedError
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional
 
+from ..domain.entities.strategy_entity import StrategyDoc
+
 
 class StrategyRepository(ABC):
     """
@@ -13,7 +15,7 @@ class StrategyRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def upsert(self, doc: Dict) -> Dict:
+    async def upsert(self, doc: Dict) -> StrategyDoc:
         """
         Upsert a strategy by (name, symbol) or by explicit id.
         Must include: name, symbol, status, indicator_set_id, cfg_hash, params{...}
@@ -21,11 +23,11 @@ class StrategyRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_active_by_indicator_set(self, indicator_set_id: str) -> List[Dict]:
+    async def get_active_by_indicator_set(self, indicator_set_id: str) -> List[StrategyDoc]:
         """Return all ACTIVE strategies for a given indicator_set_id."""
         raise NotImplementedError
 
     @abstractmethod
-    async def get_by_id(self, strategy_id: str) -> Optional[Dict]:
+    async def get_by_id(self, strategy_id: str) -> Optional[StrategyDoc]:
         """Return one strategy by id."""
         raise NotImplementedError
@@ -0,0 +1,22 @@
+"""
+Optional Numba JIT for the scalar hot-path helpers.
+
+`njit` is numba.njit when numba is installed; otherwise it is a no-op decorator,
+so decorated functions keep working as plain Python.
+"""
+
+try:
+    from numba import njit  # type: ignore
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba é opcional
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def _wrap(fn):
+            return fn
+
+        return _wrap
@@ -1,11 +1,41 @@
-from typing import Dict, List, Tuple, Optional
+from typing import List, Tuple, Optional
 
+import numpy as np
 import pandas as pd
 
+from ._jit import njit
+from ..domain.entities.candle_entity import CANDLE_ARRAY_COLUMNS, CandleDoc
+from ..domain.entities.indicator_snapshot_entity import IndicatorSnapshotDoc
+from ..domain.entities.indicator_state_entity import IndicatorStateDoc
+
+
+@njit(cache=True)
+def _ema_atr_last_nb(close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                     ema_fast: int, ema_slow: int, atr_window: int) -> Tuple[float, float, float]:
+    """
+    EMA fast/slow of close and EMA-smoothed True Range (adjust=False, seeded at bar 0)
+    for the last bar. Same recurrences as compute_ema / compute_atr_pct, without min_periods.
+    """
+    a_f = 2.0 / (ema_fast + 1.0)
+    a_s = 2.0 / (ema_slow + 1.0)
+    a_w = 2.0 / (atr_window + 1.0)
+    ef = close[0]
+    es = close[0]
+    atr = abs(high[0] - low[0])
+    for t in range(1, close.shape[0]):
+        c = close[t]
+        pc = close[t - 1]
+        ef = a_f * c + (1.0 - a_f) * ef
+        es = a_s * c + (1.0 - a_s) * es
+        tr = max(abs(high[t] - low[t]), abs(high[t] - pc), abs(low[t] - pc))
+        atr = a_w * tr + (1.0 - a_w) * atr
+    return ef, es, atr
+
 
 class IndicatorCalculationService:
     """
-    Stateless helper for computing EMA (fast/slow) and ATR% over a window of candles.
+    Stateless helper for computing EMA (fast/slow) and ATR% over a window of candles,
+    or incrementally from a previous IndicatorStateDoc.
 
     This implementation expects a list of candle documents with keys:
     ['open','high','low','close','close_time'].
@@ -34,13 +64,146 @@ class IndicatorCalculationService:
         atr_pct = (atr / c).ffill().fillna(0.0)
         return atr_pct
 
+    @staticmethod
+    def _ewm_last_many(values: np.ndarray, spans: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """
+        EMA (adjust=False) of the last bar for several (span, window start) pairs at once.
+
+        Column k starts its recurrence at values[starts[k]] and runs until the last bar,
+        i.e. the same result as `.ewm(span=spans[k], adjust=False)` over values[starts[k]:].
+
+        :param values: 2D array (n_bars, n_cols) of inputs (one column per pair).
+        :param spans: EMA spans, shape (n_cols,).
+        :param starts: First bar index of each column window, shape (n_cols,).
+        :return: Last EMA value per column, shape (n_cols,).
+        """
+        alphas = 2.0 / (spans.astype(np.float64) + 1.0)
+        keep = 1.0 - alphas
+        cols = np.arange(values.shape[1])
+        y = values[starts, cols].astype(np.float64)
+        for t in range(int(starts.min()) + 1, values.shape[0]):
+            active = t > starts
+            y = np.where(active, alphas * values[t] + keep * y, y)
+        return y
+
+    @staticmethod
+    def candles_to_array(candles: List[CandleDoc]) -> np.ndarray:
+        """
+        Candle dicts -> (n, 5) float64 array in CANDLE_ARRAY_COLUMNS order.
+        """
+        arr = np.array([[c[k] for k in CANDLE_ARRAY_COLUMNS] for c in candles], dtype=np.float64)
+        return arr.reshape(-1, len(CANDLE_ARRAY_COLUMNS))
+
+    @staticmethod
+    def candle_from_row(symbol: str, row: np.ndarray) -> CandleDoc:
+        """
+        One row of a candle array back to the candle fields the snapshot needs.
+        """
+        close_time, opn, high, low, close = (float(v) for v in row)
+        return {
+            "symbol": symbol,
+            "close_time": int(close_time),
+            "open": opn,
+            "high": high,
+            "low": low,
+            "close": close,
+        }
+
+    def compute_snapshots_for_last(
+        self,
+        candles: List[CandleDoc],
+        tuples: List[Tuple[int, int, int]],
+    ) -> List[Optional[IndicatorSnapshotDoc]]:
+        """
+        Dict-input wrapper of `compute_snapshots_for_last_array`.
+        """
+        if not candles:
+            return [None] * len(tuples)
+        return self.compute_snapshots_for_last_array(
+            candles[-1]["symbol"], self.candles_to_array(candles), tuples
+        )
+
+    def compute_snapshots_for_last_array(
+        self,
+        symbol: str,
+        candles: np.ndarray,
+        tuples: List[Tuple[int, int, int]],
+    ) -> List[Optional[IndicatorSnapshotDoc]]:
+        """
+        Vectorized variant of `compute_snapshot_for_last` for several
+        (ema_fast, ema_slow, atr_window) tuples sharing the same candle series.
+
+        The candle columns are extracted once and every EMA/ATR recurrence runs in
+        a single NumPy sweep over the bars. Each tuple still uses only its own
+        window (last max(ema_slow, atr_window) bars), so results match the
+        per-tuple computation exactly.
+
+        :param symbol: Trading symbol of the candles.
+        :param candles: (n, 5) array in CANDLE_ARRAY_COLUMNS order (ascending by close_time),
+                        long enough for the largest requested window.
+        :param tuples: List of (ema_fast, ema_slow, atr_window).
+        :return: One snapshot dict (or None if not enough data) per tuple, same order.
+        """
+        n = len(candles)
+        results: List[Optional[IndicatorSnapshotDoc]] = [None] * len(tuples)
+        ready = [
+            (i, int(f), int(s), int(w))
+            for i, (f, s, w) in enumerate(tuples)
+            if 0 < max(int(s), int(w)) <= n
+        ]
+        if not ready:
+            return results
+
+        close_time, opn, high, low, close = (candles[:, j] for j in range(len(CANDLE_ARRAY_COLUMNS)))
+
+        fast = np.array([r[1] for r in ready], dtype=np.int64)
+        slow = np.array([r[2] for r in ready], dtype=np.int64)
+        win = np.array([r[3] for r in ready], dtype=np.int64)
+        starts = n - np.maximum(slow, win)
+        k = len(ready)
+
+        # EMA fast + slow in one sweep: 2k columns over the close series
+        ema_spans = np.concatenate([fast, slow])
+        ema_starts = np.concatenate([starts, starts])
+        ema_last = self._ewm_last_many(np.repeat(close[:, None], 2 * k, axis=1), ema_spans, ema_starts)
+
+        # True Range; at each window's first bar there is no previous close -> H-L
+        hl = np.abs(high - low)
+        tr_full = hl.copy()
+        tr_full[1:] = np.maximum(hl[1:], np.maximum(np.abs(high[1:] - close[:-1]), np.abs(low[1:] - close[:-1])))
+        tr = np.repeat(tr_full[:, None], k, axis=1)
+        tr[starts, np.arange(k)] = hl[starts]
+        atr_last = self._ewm_last_many(tr, win, starts)
+
+        # pandas min_periods semantics: not enough observations -> NaN (ATR% -> 0.0)
+        bars = n - starts
+        ema_fast_v = np.where(bars >= np.maximum(2, fast // 2), ema_last[:k], np.nan)
+        ema_slow_v = np.where(bars >= np.maximum(2, slow // 2), ema_last[k:], np.nan)
+        atr_pct_v = np.where(bars >= np.maximum(2, win // 2), atr_last / close[-1], 0.0)
+
+        for j, (i, _, _, _) in enumerate(ready):
+            results[i] = {
+                "symbol": symbol,
+                "ts": int(close_time[-1]),
+                # include OHLC for convenience / denormalized read
+                "open": float(opn[-1]),
+                "high": float(high[-1]),
+                "low": float(low[-1]),
+                "close": float(close[-1]),
+                # indicators
+                "ema_fast": float(ema_fast_v[j]),
+                "ema_slow": float(ema_slow_v[j]),
+                "atr_pct": float(atr_pct_v[j]),
+            }
+        return results
+
     def compute_snapshot_for_last(
         self,
-        candles: List[Dict],
+        candles: List[CandleDoc],
         ema_fast: int,
         ema_slow: int,
         atr_window: int,
-    ) -> Optional[Dict]:
+    ) -> Optional[IndicatorSnapshotDoc]:
         """
         Given the last N candles (ascending by close_time), compute EMA fast/slow and ATR%
         and return a snapshot for the last candle including OHLC and indicators.
@@ -52,32 +215,109 @@ class IndicatorCalculationService:
         :return: Snapshot dict or None if not enough data.
         """
         required = max(ema_slow, atr_window)
-        if len(candles) < required:
+        if len(candles) < required or not candles:
             return None
 
-        df = pd.DataFrame(candles)
-        # ensure numeric
-        df["close"] = pd.to_numeric(df["close"], errors="coerce").ffill()
-        df["high"] = pd.to_numeric(df["high"], errors="coerce")
-        df["low"] = pd.to_numeric(df["low"], errors="coerce")
-        df["open"] = pd.to_numeric(df["open"], errors="coerce")
-
-        ema_fast_s = self.compute_ema(df["close"], ema_fast)
-        ema_slow_s = self.compute_ema(df["close"], ema_slow)
-        atr_pct_s = self.compute_atr_pct(df, atr_window)
+        arr = self.candles_to_array(candles)
+        close_time, opn, high, low, close = (arr[:, j] for j in range(len(CANDLE_ARRAY_COLUMNS)))
+        ema_f, ema_s, atr = _ema_atr_last_nb(close, high, low, int(ema_fast), int(ema_slow), int(atr_window))
 
-        last = df.iloc[-1]
+        # pandas min_periods semantics: not enough observations -> NaN (ATR% -> 0.0)
+        n = arr.shape[0]
         snapshot = {
             "symbol": candles[-1]["symbol"],
-            "ts": int(last["close_time"]),
+            "ts": int(close_time[-1]),
             # include OHLC for convenience / denormalized read
-            "open": float(last["open"]),
-            "high": float(last["high"]),
-            "low": float(last["low"]),
-            "close": float(last["close"]),
+            "open": float(opn[-1]),
+            "high": float(high[-1]),
+            "low": float(low[-1]),
+            "close": float(close[-1]),
             # indicators
-            "ema_fast": float(ema_fast_s.iloc[-1]),
-            "ema_slow": float(ema_slow_s.iloc[-1]),
-            "atr_pct": float(atr_pct_s.iloc[-1]),
+            "ema_fast": float(ema_f) if n >= max(2, ema_fast // 2) else float("nan"),
+            "ema_slow": float(ema_s) if n >= max(2, ema_slow // 2) else float("nan"),
+            "atr_pct": float(atr / close[-1]) if n >= max(2, atr_window // 2) else 0.0,
         }
         return snapshot
+
+    @staticmethod
+    def state_from_snapshot(
+        snapshot: IndicatorSnapshotDoc,
+        *,
+        cfg_hash: str,
+        ema_fast: int,
+        ema_slow: int,
+        atr_window: int,
+    ) -> Optional[IndicatorStateDoc]:
+        """
+        Seed the running state from a snapshot computed over a full window.
+
+        :return: State dict, or None if the EMAs are not warmed up yet (NaN).
+        """
+        if not (np.isfinite(snapshot["ema_fast"]) and np.isfinite(snapshot["ema_slow"])):
+            return None
+        return {
+            "cfg_hash": cfg_hash,
+            "symbol": snapshot["symbol"],
+            "ema_fast_period": int(ema_fast),
+            "ema_slow_period": int(ema_slow),
+            "atr_window": int(atr_window),
+            "ts": int(snapshot["ts"]),
+            "prev_close": float(snapshot["close"]),
+            "ema_fast": float(snapshot["ema_fast"]),
+            "ema_slow": float(snapshot["ema_slow"]),
+            "atr": float(snapshot["atr_pct"]) * float(snapshot["close"]),
+        }
+
+    @staticmethod
+    def snapshot_from_state(state: IndicatorStateDoc, candle: CandleDoc) -> IndicatorSnapshotDoc:
+        """
+        Build the snapshot of `candle` from a state already advanced up to it.
+        """
+        close = float(candle["close"])
+        return {
+            "symbol": candle["symbol"],
+            "ts": int(candle["close_time"]),
+            # include OHLC for convenience / denormalized read
+            "open": float(candle["open"]),
+            "high": float(candle["high"]),
+            "low": float(candle["low"]),
+            "close": close,
+            # indicators
+            "ema_fast": float(state["ema_fast"]),
+            "ema_slow": float(state["ema_slow"]),
+            "atr_pct": float(state["atr"]) / close if close else 0.0,
+        }
+
+    def update_snapshot(
+        self,
+        state: IndicatorStateDoc,
+        candle: CandleDoc,
+    ) -> Tuple[IndicatorSnapshotDoc, IndicatorStateDoc]:
+        """
+        Apply one new closed candle to the running state in O(1):
+        EMA_t = a*x_t + (1-a)*EMA_{t-1}, with a = 2/(span+1), for both EMAs and for
+        the True Range smoothing (same EMA-like ATR as `compute_atr_pct`).
+
+        :param state: State whose `ts` is the close_time of the previous candle.
+        :param candle: The next closed candle.
+        :return: (snapshot for `candle`, advanced state).
+        """
+        h = float(candle["high"])
+        l = float(candle["low"])
+        c = float(candle["close"])
+        prev_c = float(state["prev_close"])
+        tr = max(abs(h - l), abs(h - prev_c), abs(l - prev_c))
+
+        a_fast = 2.0 / (int(state["ema_fast_period"]) + 1.0)
+        a_slow = 2.0 / (int(state["ema_slow_period"]) + 1.0)
+        a_atr = 2.0 / (int(state["atr_window"]) + 1.0)
+
+        new_state: IndicatorStateDoc = {
+            **state,
+            "ts": int(candle["close_time"]),
+            "prev_close": c,
+            "ema_fast": a_fast * c + (1.0 - a_fast) * float(state["ema_fast"]),
+            "ema_slow": a_slow * c + (1.0 - a_slow) * float(state["ema_slow"]),
+            "atr": a_atr * tr + (1.0 - a_atr) * float(state["atr"]),
+        }
+        return self.snapshot_from_state(new_state, candle), new_state
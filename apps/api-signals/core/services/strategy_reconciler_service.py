@@ -1,6 +1,32 @@
-from typing import Dict, Optional, List
+import math
+import time
+from functools import lru_cache
+from typing import Dict, Optional, List, Tuple
 
 from ...adapters.external.pipeline.pipeline_http_client import PipelineHttpClient
+from ..domain.entities.strategy_episode_entity import EpisodeEntity
+
+
+# Steps whose payload depends only on (dex, alias) are built once and shared between plans.
+# They are plain dicts (BSON / msgspec friendly) and must be treated as read-only.
+@lru_cache(maxsize=512)
+def _collect_step(dex: str, alias: str) -> Dict:
+    return {"action": "COLLECT", "payload": {"dex": dex, "alias": alias}}
+
+
+@lru_cache(maxsize=512)
+def _withdraw_step(dex: str, alias: str) -> Dict:
+    return {"action": "WITHDRAW", "payload": {"dex": dex, "alias": alias, "mode": "pool"}}
+
+
+@lru_cache(maxsize=512)
+def _stake_step(dex: str, alias: str) -> Dict:
+    return {"action": "STAKE", "payload": {"dex": dex, "alias": alias}}
+
+
+@lru_cache(maxsize=512)
+def _unstake_step(dex: str, alias: str) -> Dict:
+    return {"action": "UNSTAKE", "payload": {"dex": dex, "alias": alias}}
 
 
 class StrategyReconcilerService:
@@ -16,12 +42,34 @@ class StrategyReconcilerService:
       4) OPEN           (mint new range using idle balances)
     """
 
-    def __init__(self, lp_client: PipelineHttpClient):
+    def __init__(self, lp_client: PipelineHttpClient, aligned_ttl_sec: float = 60.0):
+        """
+        :param lp_client: Pipeline HTTP client (the process singleton).
+        :param aligned_ttl_sec: How long an "already aligned" answer is trusted without
+            reading /status again (the vault can move outside this process).
+        """
         self._lp = lp_client
+        self._aligned_ttl = aligned_ttl_sec
+        # strategy_id -> ((dex, alias, Pa, Pb), monotonic ts) last confirmed aligned with the LP
+        self._last_aligned: Dict[str, Tuple[Tuple[Optional[str], Optional[str], float, float], float]] = {}
 
-    async def reconcile(self, strategy_id: str, desired: Dict, symbol: str) -> Optional[Dict]:
+    def forget_vault(self, dex: str, alias: str) -> None:
+        """
+        Drop the cached alignment of every strategy on this vault, e.g. after the executor
+        failed or skipped a step on it: the next reconcile reads /status again.
+        """
+        for sid in [k for k, (key, _) in self._last_aligned.items() if key[0] == dex and key[1] == alias]:
+            del self._last_aligned[sid]
+
+    async def reconcile(
+        self,
+        strategy_id: str,
+        desired: EpisodeEntity,
+        symbol: str,
+    ) -> Optional[Dict]:
         """
         Build an execution plan for the given desired episode.
+        Strategies of the same vault share the client's cached / in-flight /status read.
 
         Returns:
             {
@@ -40,21 +88,28 @@ class StrategyReconcilerService:
         Or None if LP is already aligned.
         """
 
-        Pa_des = float(desired["Pa"])
-        Pb_des = float(desired["Pb"])
+        Pa_des = float(desired.Pa)
+        Pb_des = float(desired.Pb)
 
-        dex = desired.get("dex")
-        alias = desired.get("alias")
+        dex = desired.dex
+        alias = desired.alias
 
-        gauge_flow = bool(desired.get("gauge_flow_enabled"))
+        gauge_flow = bool(desired.gauge_flow_enabled)
+
+        # same desired band already confirmed aligned -> skip the get_status round-trip
+        aligned_key = (dex, alias, Pa_des, Pb_des)
+        hit = self._last_aligned.get(strategy_id)
+        if hit is not None and hit[0] == aligned_key and time.monotonic() - hit[1] <= self._aligned_ttl:
+            return None
         
         # pull live vault status so we know if position exists / is aligned
         lp_status = None
         if dex and alias:
-            lp_status = await self._lp.get_status(dex=dex, alias=alias)
+            lp_status = await self._lp.get_status_summary(dex=dex, alias=alias)
 
         # No LP or no position yet -> first time open
-        if not lp_status or not lp_status.get("pool"):
+        if lp_status is None or not lp_status.has_pool:
+            self._last_aligned.pop(strategy_id, None)
             if dex and alias:
                 # temos vault configurado, mas ainda não tem posição ativa
                 steps = [
@@ -70,7 +125,7 @@ class StrategyReconcilerService:
                     }
                 ]
                 if gauge_flow:
-                    steps.append({"action": "STAKE", "payload": {"dex": dex, "alias": alias}})
+                    steps.append(_stake_step(dex, alias))
                     
             else:
                 # não temos dex/alias => não tem infra. Registrar intenção apenas.
@@ -93,25 +148,33 @@ class StrategyReconcilerService:
                 "symbol": symbol,
             }
 
-        # Try to read current band
-        prices_cur = lp_status.get("prices", {}) or {}
-        lower_cur = prices_cur.get("lower", {}) or {}
-        upper_cur = prices_cur.get("upper", {}) or {}
-
-        Pa_lp = lower_cur.get("p_t1_t0")
-        Pb_lp = upper_cur.get("p_t1_t0")
+        # current band (already flattened by get_status_summary)
+        Pa_lp = lp_status.pa
+        Pb_lp = lp_status.pb
 
-        tol = 1e-9
-        aligned = (
-            Pa_lp is not None
-            and Pb_lp is not None
-            and abs(Pa_lp - Pa_des) <= tol
-            and abs(Pb_lp - Pb_des) <= tol
+        # compare on-chain ticks when both sides are known (exact); prices are only a fallback
+        ticks_des = (
+            lp_status.ticks_for(Pa_des, Pb_des)
+            if lp_status.lower_tick is not None and lp_status.upper_tick is not None
+            else None
         )
+        if ticks_des is not None:
+            aligned = ticks_des == (lp_status.lower_tick, lp_status.upper_tick)
+        else:
+            tol = 1e-9
+            aligned = (
+                Pa_lp is not None
+                and Pb_lp is not None
+                and math.isclose(Pa_lp, Pa_des, rel_tol=0.0, abs_tol=tol)
+                and math.isclose(Pb_lp, Pb_des, rel_tol=0.0, abs_tol=tol)
+            )
         if aligned:
             # nothing to do
+            self._last_aligned[strategy_id] = (aligned_key, time.monotonic())
             return None
 
+        self._last_aligned.pop(strategy_id, None)
+
         # Not aligned -> full rotate plan
         return self._build_full_plan(
             dex=dex,
@@ -131,34 +194,35 @@ class StrategyReconcilerService:
         Pa_des: float,
         Pb_des: float,
         strategy_id: str,
-        desired: Dict,
+        desired: EpisodeEntity,
         symbol: str,
         reason: str,
     ) -> Dict:
         """
         Build canonical rotation steps with WITHDRAW included.
         If dex/alias is missing, we can't actually call vault API, so fall back to NOOP.
+        Only price-carrying steps (SWAP_*, OPEN) are allocated per call; the rest are shared templates.
         """
         steps: List[Dict] = []
-        gauge_flow = bool(desired.get("gauge_flow_enabled"))
+        gauge_flow = bool(desired.gauge_flow_enabled)
         
         if dex and alias:
             if gauge_flow:
                 # fluxo com gauge
-                steps.append({"action": "UNSTAKE", "payload": {"dex": dex, "alias": alias}})
+                steps.append(_unstake_step(dex, alias))
                 steps.append({"action": "SWAP_EXACT_IN_REWARD", "payload": {"dex": dex, "alias": alias,
                                                                         "lower_price": Pa_des, "upper_price": Pb_des}})  
                 if dex == "pancake":
-                    steps.append({"action": "COLLECT", "payload": {"dex": dex, "alias": alias}})                  
-                steps.append({"action": "WITHDRAW", "payload": {"dex": dex, "alias": alias, "mode": "pool"}})
+                    steps.append(_collect_step(dex, alias))
+                steps.append(_withdraw_step(dex, alias))
                 steps.append({"action": "SWAP_EXACT_IN", "payload": {"dex": dex, "alias": alias,
                                                                      "lower_price": Pa_des, "upper_price": Pb_des}})
                 steps.append({"action": "OPEN", "payload": {"dex": dex, "alias": alias,
                                                             "lower_price": Pa_des, "upper_price": Pb_des}})
-                steps.append({"action": "STAKE", "payload": {"dex": dex, "alias": alias}})
+                steps.append(_stake_step(dex, alias))
             else:
-                steps.append({"action": "COLLECT", "payload": {"dex": dex, "alias": alias}})
-                steps.append({"action": "WITHDRAW", "payload": {"dex": dex, "alias": alias, "mode": "pool"}})
+                steps.append(_collect_step(dex, alias))
+                steps.append(_withdraw_step(dex, alias))
                 steps.append({"action": "SWAP_EXACT_IN", "payload": {"dex": dex, "alias": alias,
                                                                      "lower_price": Pa_des, "upper_price": Pb_des}})
                 steps.append({"action": "OPEN", "payload": {"dex": dex, "alias": alias,
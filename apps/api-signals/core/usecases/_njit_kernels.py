@@ -0,0 +1,66 @@
+"""
+Numeric kernels of EvaluateActiveStrategiesUseCase, compiled with numba when available
+(see core/services/_jit.py). Without numba they run as plain Python loops, which for the
+handful of tiers of a strategy is still cheaper than a chain of small NumPy calls.
+"""
+
+import numpy as np
+
+from ..services._jit import njit
+
+
+@njit(cache=True)
+def tier_scan(atr_pct: float, thresholds: np.ndarray, bars_required: np.ndarray,
+              eligible: np.ndarray, streaks: np.ndarray) -> int:
+    """
+    Scan crescente dos tiers (arrays alinhados por atr_pct_threshold crescente).
+    Atualiza `streaks` in-place nos tiers elegíveis até o primeiro que confirma e
+    retorna o índice dele, ou -1 se nenhum confirmou.
+    """
+    for i in range(thresholds.shape[0]):
+        if not eligible[i]:
+            continue
+        if thresholds[i] >= atr_pct:
+            streaks[i] += 1
+        else:
+            streaks[i] = 0
+        if streaks[i] >= bars_required[i]:
+            return i
+    return -1
+
+
+@njit(cache=True)
+def pick_bands(P: float, pct_below_base: np.ndarray, pct_above_base: np.ndarray,
+               total_width_pct: np.ndarray):
+    """
+    (Pa, Pb) de cada banda a abrir no preço P: escala o skew base para a largura total
+    (assumida como LARGURA TOTAL do range) e aplica os clamps de banda válida.
+    """
+    n = total_width_pct.shape[0]
+    Pa = np.empty(n)
+    Pb = np.empty(n)
+    EPS_POS = 1e-12
+    mid_pad = EPS_POS * max(1.0, P)
+    for i in range(n):
+        width = max(total_width_pct[i], 2e-6)
+        base_sum = pct_below_base[i] + pct_above_base[i]
+        if base_sum > 0:
+            scale = width / base_sum
+            pct_below = pct_below_base[i] * scale
+            pct_above = pct_above_base[i] * scale
+        else:
+            pct_below = pct_above = max(1e-12, width / 2.0)
+        a = P * (1.0 - pct_below)
+        b = P * (1.0 + pct_above)
+
+        # banda válida: positiva, Pa < P < Pb
+        a = max(EPS_POS, a)
+        b = max(a + EPS_POS, b)
+        a = min(P - mid_pad, a)
+        b = max(P + mid_pad, b)
+        if not (a < b):
+            a = P - mid_pad
+            b = P + mid_pad
+        Pa[i] = a
+        Pb[i] = b
+    return Pa, Pb
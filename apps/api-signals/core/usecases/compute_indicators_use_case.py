@@ -1,15 +1,24 @@
+import asyncio
 import logging
-from typing import Optional
+from typing import Dict, List, Optional
 
+import numpy as np
+
+from ..domain.entities.indicator_state_entity import IndicatorStateDoc
 from ..repositories.candle_repository import CandleRepository
 from ..repositories.indicator_repository import IndicatorRepository
+from ..repositories.indicator_state_repository import IndicatorStateRepository
 from ..services.indicator_calculation_service import IndicatorCalculationService
 
 
 class ComputeIndicatorsUseCase:
     """
-    Use case that, on each closed candle, loads the last required bars and computes
-    EMA fast/slow and ATR% for the last candle; then upserts an indicator snapshot.
+    Use case that, on each closed candle, computes EMA fast/slow and ATR% for the last
+    candle and upserts an indicator snapshot.
+
+    Each indicator set keeps its running EMA/ATR state (in memory, persisted by cfg_hash),
+    so a warm set only needs the new candle; the last required bars are loaded only to
+    bootstrap a set (cold start, restart without state, or a gap in the candle stream).
     """
 
     def __init__(
@@ -17,18 +26,24 @@ class ComputeIndicatorsUseCase:
         candle_repository: CandleRepository,
         indicator_repository: IndicatorRepository,
         indicator_service: IndicatorCalculationService,
+        indicator_state_repository: Optional[IndicatorStateRepository] = None,
         logger: logging.Logger | None = None,
     ):
         """
         :param candle_repository: Candle repository.
         :param indicator_repository: Indicator repository.
         :param indicator_service: Indicator calculation helper.
+        :param indicator_state_repository: Optional store for the running EMA/ATR state
+                                           (without it the state lives only in memory).
         :param logger: Optional logger.
         """
         self._candle_repo = candle_repository
         self._indicator_repo = indicator_repository
         self._svc = indicator_service
+        self._state_repo = indicator_state_repository
         self._logger = logger or logging.getLogger(self.__class__.__name__)
+        # cfg_hash -> running state (write-through to the state repository)
+        self._states: Dict[str, IndicatorStateDoc] = {}
 
     @staticmethod
     def required_bars_for(ema_slow: int, atr_window: int) -> int:
@@ -50,8 +65,9 @@ class ComputeIndicatorsUseCase:
         cfg_hash: str,
     ) -> Optional[dict]:
         """
-        Load the last required candles (based on ema_slow/atr_window), compute indicators
-        for the last bar and persist the snapshot keyed by (symbol, ts, cfg_hash).
+        Compute indicators for the last closed bar (incrementally when the set is warm,
+        otherwise from the last required candles) and persist the snapshot keyed by
+        (symbol, ts, cfg_hash).
 
         :param symbol: Trading symbol, e.g. 'ETHUSDT'.
         :param interval: Interval string, e.g. '1m'.
@@ -62,27 +78,146 @@ class ComputeIndicatorsUseCase:
         :param cfg_hash: Hash representing (symbol, ema_fast, ema_slow, atr_window).
         :return: The snapshot dict persisted, or None if not enough data.
         """
-        need = self.required_bars_for(ema_slow, atr_window)
-        candles = await self._candle_repo.get_last_n_closed(symbol, interval, need)
-
-        snapshot = self._svc.compute_snapshot_for_last(
-            candles,
-            ema_fast=int(ema_fast),
-            ema_slow=int(ema_slow),
-            atr_window=int(atr_window),
+        snapshots = await self.execute_for_indicator_sets(
+            symbol=symbol,
+            interval=interval,
+            indicator_sets=[{
+                "_id": indicator_set_id,
+                "cfg_hash": cfg_hash,
+                "ema_fast": ema_fast,
+                "ema_slow": ema_slow,
+                "atr_window": atr_window,
+            }],
         )
-        if snapshot is None:
-            self._logger.debug("Not enough candles for indicators: have=%s need=%s", len(candles), need)
-            return None
+        return snapshots[0]
+
+    async def execute_for_indicator_sets(
+        self,
+        *,
+        symbol: str,
+        interval: str,
+        indicator_sets: List[Dict],
+    ) -> List[Optional[dict]]:
+        """
+        Same as `execute_for_indicator_set`, but for every indicator set of one symbol at once.
+
+        Warm sets (state at the previous candle) are advanced with the O(1) EMA/ATR
+        recurrence from the last two candles. Cold sets are bootstrapped from one load
+        of the last required bars, all tuples computed in one vectorized pass.
+
+        :param symbol: Trading symbol, e.g. 'ETHUSDT'.
+        :param interval: Interval string, e.g. '1m'.
+        :param indicator_sets: Indicator set documents (ema_fast, ema_slow, atr_window, cfg_hash).
+        :return: Snapshots persisted (or None when not enough data), aligned with indicator_sets.
+        """
+        if not indicator_sets:
+            return []
+
+        tuples = [
+            (int(s["ema_fast"]), int(s["ema_slow"]), int(s["atr_window"]))
+            for s in indicator_sets
+        ]
+        states = await self._load_states([s["cfg_hash"] for s in indicator_sets])
 
-        # Enrich with indicator set identifiers (used by indicators_1m unique index)
-        snapshot["indicator_set_id"] = indicator_set_id
-        snapshot["cfg_hash"] = cfg_hash
+        # sets whose state is missing or belongs to other periods need the full window
+        cold = [
+            i for i, (indset, tup) in enumerate(zip(indicator_sets, tuples))
+            if not self._state_matches(states.get(indset["cfg_hash"]), tup)
+        ]
+        if cold:
+            need = max(self.required_bars_for(tuples[i][1], tuples[i][2]) for i in cold)
+            candles = await self._candle_repo.get_last_n_closed_array(symbol, interval, max(2, need))
+        else:
+            candles = await self._candle_repo.get_last_n_closed_array(symbol, interval, 2)
 
-        await self._indicator_repo.upsert_snapshot(snapshot)
+        snapshots: List[Optional[dict]] = [None] * len(indicator_sets)
+        new_states: List[IndicatorStateDoc] = []
+        for i, indset in enumerate(indicator_sets):
+            if i in cold:
+                continue
+            advanced = self._advance(states[indset["cfg_hash"]], symbol, candles)
+            if advanced is None:
+                cold.append(i)  # gap in the candle stream: re-bootstrap
+                continue
+            snapshots[i], state = advanced
+            if state is not states[indset["cfg_hash"]]:
+                new_states.append(state)
+
+        if cold:
+            need = max(self.required_bars_for(tuples[i][1], tuples[i][2]) for i in cold)
+            if len(candles) < need:
+                candles = await self._candle_repo.get_last_n_closed_array(symbol, interval, need)
+            boot = self._svc.compute_snapshots_for_last_array(symbol, candles, [tuples[i] for i in cold])
+            for i, snapshot in zip(cold, boot):
+                snapshots[i] = snapshot
+                if snapshot is None:
+                    continue
+                fast, slow, atr = tuples[i]
+                state = self._svc.state_from_snapshot(
+                    snapshot, cfg_hash=indicator_sets[i]["cfg_hash"], ema_fast=fast, ema_slow=slow, atr_window=atr
+                )
+                if state is not None:
+                    new_states.append(state)
+
+        to_persist: List[dict] = []
+        for indset, snapshot in zip(indicator_sets, snapshots):
+            if snapshot is None:
+                self._logger.debug(
+                    "Not enough candles for indicators: have=%s set=%s", len(candles), indset["cfg_hash"]
+                )
+                continue
+
+            snapshot["indicator_set_id"] = indset.get("_id", indset["cfg_hash"])
+            snapshot["cfg_hash"] = indset["cfg_hash"]
+            to_persist.append(snapshot)
+
+        for state in new_states:
+            self._states[state["cfg_hash"]] = state
+
+        # submitted together so the repositories can coalesce them into bulk writes
+        await asyncio.gather(
+            *(self._indicator_repo.upsert_snapshot(s) for s in to_persist),
+            *(self._state_repo.upsert(st) for st in (new_states if self._state_repo else [])),
+        )
         self._logger.debug(
-            "Indicator snapshot upserted: symbol=%s ts=%s set=%s ema_f=%s ema_s=%s atr=%.6f",
-            snapshot["symbol"], snapshot["ts"], cfg_hash,
-            snapshot["ema_fast"], snapshot["ema_slow"], snapshot["atr_pct"]
+            "Indicator snapshots upserted: symbol=%s ts=%s sets=%s bootstrapped=%s",
+            symbol, to_persist[0]["ts"] if to_persist else None,
+            [s["cfg_hash"] for s in to_persist], len(cold),
         )
-        return snapshot
\ No newline at end of file
+        return snapshots
+
+    async def _load_states(self, cfg_hashes: List[str]) -> Dict[str, IndicatorStateDoc]:
+        """
+        Running states for the given sets: memory first, then the state repository.
+        """
+        found = {h: self._states[h] for h in cfg_hashes if h in self._states}
+        missing = [h for h in cfg_hashes if h not in found]
+        if missing and self._state_repo is not None:
+            stored = await self._state_repo.get_many(missing)
+            self._states.update(stored)
+            found.update(stored)
+        return found
+
+    @staticmethod
+    def _state_matches(state: Optional[IndicatorStateDoc], tup: tuple) -> bool:
+        if state is None:
+            return False
+        return (
+            int(state["ema_fast_period"]), int(state["ema_slow_period"]), int(state["atr_window"])
+        ) == tuple(tup)
+
+    def _advance(self, state: IndicatorStateDoc, symbol: str, candles: np.ndarray):
+        """
+        Bring `state` to the last candle (rows in CANDLE_ARRAY_COLUMNS order).
+        Returns (snapshot, state) or None when the state is not at the previous
+        (or the same) candle.
+        """
+        if len(candles) == 0:
+            return None
+        last = self._svc.candle_from_row(symbol, candles[-1])
+        if int(last["close_time"]) == int(state["ts"]):
+            # same candle again (e.g. replay): state already includes it
+            return self._svc.snapshot_from_state(state, last), state
+        if len(candles) >= 2 and int(candles[-2, 0]) == int(state["ts"]):
+            return self._svc.update_snapshot(state, last)
+        return None
@@ -1,6 +1,16 @@
+import asyncio
+import copy
 import logging
-from typing import Dict, List, Optional, Tuple
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
 
+import numpy as np
+
+from ..domain.entities.signal_entity import SignalEntity
+from ..domain.entities.strategy_episode_entity import EpisodeEntity
+from ..domain.enums.strategy_enums import TriggerKind
+from ._njit_kernels import pick_bands, tier_scan
 from ..services.strategy_reconciler_service import StrategyReconcilerService
 
 from ..repositories.strategy_repository import StrategyRepository
@@ -9,6 +19,196 @@ from ..repositories.signal_repository import SignalRepository
 from ..repositories.indicator_set_repository import IndicatorSetRepository
 
 
+# === Gates de todas as estratégias de um snapshot, vetorizados ===
+# colunas da matriz de gates (uma linha por estratégia com episódio aberto)
+_G_PA, _G_PB, _G_EPS, _G_ABOVE, _G_BELOW, _G_LAST_BAR, _G_COOLOFF, _G_CONFIRM, _G_VOL_TH, \
+    _G_POOL_HV, _G_MODE_DOWN, _G_MODE_UP = range(12)
+
+
+def _gate_batch(
+    P: float, atr_pct: float, ema_gap: float, m: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Streaks de breakout, confirmação, high vol e reabertura high vol para N estratégias
+    de uma vez. `m` é (N, 12) nas colunas _G_*; vol_th ausente vem como NaN.
+    Retorna (i_since_open, out_above_streak, out_below_streak, trigger, tier_ready), onde
+    tier_ready marca quem segue para o scan de tiers (in-range, sem gatilho, fora do cooloff).
+    """
+    Pa, Pb = m[:, _G_PA], m[:, _G_PB]
+    eps = m[:, _G_EPS]
+
+    # breakout com confirmação por streak no episódio
+    is_above = P > Pb * (1.0 + eps)
+    is_below = ~is_above & (P < Pa * (1.0 - eps))
+    above = np.where(is_above, m[:, _G_ABOVE] + 1, 0).astype(np.int64)
+    below = np.where(is_below, m[:, _G_BELOW] + 1, 0).astype(np.int64)
+
+    i_since = m[:, _G_LAST_BAR].astype(np.int64) + 1
+    ready = i_since >= m[:, _G_COOLOFF]
+    confirm = m[:, _G_CONFIRM]
+    trigger = np.full(len(m), TriggerKind.NONE, dtype=np.int64)
+    trigger[ready & (above >= confirm)] = TriggerKind.CROSS_MAX
+    trigger[ready & (trigger == TriggerKind.NONE) & (below >= confirm)] = TriggerKind.CROSS_MIN
+
+    # high vol (evita reabrir se já high_vol); NaN nunca passa do threshold
+    pool_hv = m[:, _G_POOL_HV] > 0
+    with np.errstate(invalid="ignore"):
+        high_vol = atr_pct > m[:, _G_VOL_TH]
+    trigger[ready & (trigger == TriggerKind.NONE) & high_vol & ~pool_hv] = TriggerKind.HIGH_VOL
+
+    # reabre high vol do lado certo (prevalece sobre os outros gatilhos)
+    reopen = pool_hv & (((m[:, _G_MODE_DOWN] > 0) & (ema_gap > 10)) | ((m[:, _G_MODE_UP] > 0) & (ema_gap < -10)))
+    trigger[reopen] = TriggerKind.HIGH_VOL
+
+    tier_ready = (trigger == TriggerKind.NONE) & (Pa < P) & (P < Pb) & ready
+    return i_since, above, below, trigger, tier_ready
+
+
+BandSpec = Tuple[str, str, float, float, float]
+
+
+def _compile_band_spec(
+    params: Dict, tier_names: FrozenSet[str]
+) -> Callable[[str, Optional[str], Optional[float]], BandSpec]:
+    """
+    Especializa, por estratégia, a escolha de skew base e largura total (assumindo que
+    'max_major_side_pct' e afins são LARGURA TOTAL do range). Os params ficam capturados
+    no closure; a função retornada só faz os desvios e a aritmética.
+
+    band_spec(trend, pool_type, total_width_override) ->
+        (mode, majority, pct_below_base, pct_above_base, total_width_pct)
+    O preço da banda é calculado depois, em lote, por _njit_kernels.pick_bands.
+    """
+    skew_low = float(params.get("skew_low_pct", 0.075))
+    skew_high = float(params.get("skew_high_pct", 0.025))
+    high_vol_width = float(params.get("high_vol_max_major_side_pct", 2.0))
+    standard_width = float(params.get("standard_max_major_side_pct", 0.05))
+    max_major = params.get("max_major_side_pct")
+    max_major = float(max_major) if max_major is not None else None
+
+    # (tipo de pool, tendência de baixa) -> (mode, majority, pct_below_base, pct_above_base)
+    skew_table = {
+        # high vol: largo do lado da tendência, curto do outro
+        ("high_vol", True): ("trend_down", "token1", 0.09, 0.01),
+        ("high_vol", False): ("trend_up", "token2", 0.01, 0.09),
+        ("tier", True): ("trend_down", "token1", 0.05, 0.05),
+        ("tier", False): ("trend_up", "token2", 0.05, 0.05),
+        ("default", True): ("trend_down", "token1", skew_low, skew_high),
+        ("default", False): ("trend_up", "token2", skew_high, skew_low),
+    }
+    kind_by_pool: Dict[Optional[str], str] = {name: "tier" for name in tier_names}
+    kind_by_pool["high_vol"] = "high_vol"  # precede um tier de mesmo nome
+    # largura total fixa por pool_type; os demais usam max_major ou a soma do skew base
+    fixed_width = {"high_vol": high_vol_width, "standard": standard_width, None: standard_width}
+
+    def band_spec(trend: str, pool_type: Optional[str], total_width_override: Optional[float] = None) -> BandSpec:
+        kind = kind_by_pool.get(pool_type, "default")
+        mode, majority, pct_below_base, pct_above_base = skew_table[(kind, trend == "down")]
+
+        if total_width_override is not None:
+            total_width_pct = float(total_width_override)
+        else:
+            total_width_pct = fixed_width.get(pool_type)
+            if total_width_pct is None:
+                total_width_pct = max_major if max_major is not None else pct_below_base + pct_above_base
+
+        return mode, majority, pct_below_base, pct_above_base, total_width_pct
+
+    return band_spec
+
+
+@dataclass(slots=True)
+class _StrategyCompiled:
+    """
+    Params de uma estratégia pré-processados (escalares já convertidos, tiers ordenados/indexados
+    e o closure de banda); recompilado só quando params muda.
+    Arrays alinhados com tier_names_asc (ordem crescente de atr_pct_threshold).
+    """
+
+    params_raw: Dict
+    band_spec: Callable[[str, Optional[str], Optional[float]], BandSpec]
+    # gates
+    eps: float
+    cooloff: int
+    breakout_confirm: int
+    vol_high_threshold: Optional[float]
+    # larguras das reaberturas (defaults diferentes dos do band_spec, como no backtest)
+    first_open_width: Optional[float]
+    standard_reopen_width: float
+    high_vol_reopen_width: float
+    # campos do vault copiados para cada episódio novo
+    dex: Optional[str]
+    alias: Optional[str]
+    token0_address: Optional[str]
+    token1_address: Optional[str]
+    gauge_flow_enabled: bool
+    tier_names_asc: List[str]
+    tier_thresholds: np.ndarray
+    tier_bars_required: np.ndarray
+    tier_allowed_from: List[FrozenSet[str]]
+    # próxima pool (pool_type, largura total) por gatilho
+    breakout_reopen: Tuple[str, float]
+    tighten_reopen: Dict[str, Tuple[str, float]]
+    tier_names: FrozenSet[str]
+    # atr_streak inicial de um episódio novo (copiar antes de usar)
+    zero_streaks: Dict[str, int]
+    # pool_type atual -> máscara dos tiers avaliados no scan
+    eligible_by_pool: Dict[Optional[str], Tuple[np.ndarray, Tuple[int, ...]]]
+
+    @classmethod
+    def build(cls, params: Dict) -> "_StrategyCompiled":
+        tiers: List[Dict] = list(params.get("tiers", []))
+        asc = sorted(tiers, key=lambda t: t["atr_pct_threshold"])
+        by_name: Dict[str, Dict] = {}
+        for t in tiers:
+            by_name.setdefault(t["name"], t)
+        vol_th = params.get("vol_high_threshold_pct")
+        first_width = params.get("standard_max_major_side_pct")
+        standard_reopen = ("standard", float(params.get("standard_max_major_side_pct", 0.05)))
+        return cls(
+            params_raw=copy.deepcopy(params),
+            band_spec=_compile_band_spec(params, frozenset(by_name)),
+            eps=float(params.get("eps", 1e-6)),
+            cooloff=int(params.get("cooloff_bars", 1)),
+            breakout_confirm=int(params.get("breakout_confirm_bars", 1)),
+            vol_high_threshold=float(vol_th) if vol_th is not None else None,
+            first_open_width=float(first_width) if first_width is not None else None,
+            standard_reopen_width=standard_reopen[1],
+            high_vol_reopen_width=float(params.get("high_vol_max_major_side_pct", 0.10)),
+            dex=params.get("dex"),
+            alias=params.get("alias"),
+            token0_address=params.get("token0_address"),
+            token1_address=params.get("token1_address"),
+            gauge_flow_enabled=bool(params.get("gauge_flow_enabled", False)),
+            tier_names_asc=[t["name"] for t in asc],
+            tier_thresholds=np.array([float(t["atr_pct_threshold"]) for t in asc], dtype=np.float64),
+            tier_bars_required=np.array([int(t["bars_required"]) for t in asc], dtype=np.int64),
+            tier_allowed_from=[frozenset(t.get("allowed_from", [])) for t in asc],
+            # breakout reabre no tier mais estreito (maior threshold)
+            breakout_reopen=(asc[-1]["name"], float(asc[-1]["max_major_side_pct"])) if asc else standard_reopen,
+            tighten_reopen={name: (name, float(t["max_major_side_pct"])) for name, t in by_name.items()},
+            tier_names=frozenset(by_name),
+            zero_streaks={t["name"]: 0 for t in tiers},
+            eligible_by_pool={},
+        )
+
+    def eligible_for(self, pool_type: Optional[str]) -> Tuple[np.ndarray, Tuple[int, ...]]:
+        """
+        Tiers que o scan crescente avalia partindo de `pool_type`: para no tier atual
+        e pula os que não aceitam vir de `pool_type`. Retorna (máscara, índices).
+        """
+        hit = self.eligible_by_pool.get(pool_type)
+        if hit is None:
+            mask = np.zeros(len(self.tier_names_asc), dtype=bool)
+            for i, (name, allowed_from) in enumerate(zip(self.tier_names_asc, self.tier_allowed_from)):
+                if name == pool_type:
+                    break
+                mask[i] = pool_type in allowed_from
+            hit = (mask, tuple(int(i) for i in np.flatnonzero(mask)))
+            self.eligible_by_pool[pool_type] = hit
+        return hit
+
+
 class EvaluateActiveStrategiesUseCase:
     """
     Evaluates all ACTIVE strategies tied to a given indicator set when a new snapshot arrives.
@@ -23,123 +223,60 @@ class EvaluateActiveStrategiesUseCase:
         signal_repo: SignalRepository,
         reconciling_service: StrategyReconcilerService,
         logger: Optional[logging.Logger] = None,
+        reconcile_concurrency: int = 16,
+        active_ttl_sec: float = 5.0,
+        defer_streak_writes: bool = False,
+        on_signals: Optional[Callable[[], None]] = None,
     ):
         self._strategy_repo = strategy_repo
         self._episode_repo = episode_repo
         self._signal_repo = signal_repo
         self._reconciler = reconciling_service
         self._logger = logger or logging.getLogger(self.__class__.__name__)
+        # limita chamadas simultâneas ao LP (get_status) durante o reconcile em lote
+        self._reconcile_sem = asyncio.Semaphore(max(1, int(reconcile_concurrency)))
+        # strategy name -> tiers compilados
+        self._compiled: Dict[str, _StrategyCompiled] = {}
+        # cfg_hash -> (instante da leitura, estratégias ativas); 0 desliga o cache
+        self._active_ttl = float(active_ttl_sec)
+        self._active_cache: Dict[str, Tuple[float, List[Dict]]] = {}
+        # contadores de streak em memória (episode_id -> campos), gravados por flush() e no fechamento;
+        # sem defer, vão no bulk de cada snapshot
+        self._defer_streaks = bool(defer_streak_writes)
+        self._streaks: Dict[str, Dict] = {}
+        self._dirty: Dict[str, Dict] = {}
+        self._seen: set = set()
+        self._flush_lock = asyncio.Lock()
+        # avisado depois de gravar sinais PENDING (acorda o executor sem esperar o poll)
+        self._on_signals = on_signals
 
-    @staticmethod
-    def _trend_at(ema_fast_val: float, ema_slow_val: float) -> str:
-        return "up" if ema_fast_val > ema_slow_val else "down"
-
-    @staticmethod
-    def _gate_high_vol(atr_pct: Optional[float], threshold: Optional[float]) -> bool:
-        return (atr_pct is not None) and (threshold is not None) and (atr_pct > threshold)
+    def _compiled_for(self, strat: Dict) -> _StrategyCompiled:
+        params = strat["params"]
+        compiled = self._compiled.get(strat["name"])
+        if compiled is None or compiled.params_raw != params:
+            compiled = _StrategyCompiled.build(params)
+            self._compiled[strat["name"]] = compiled
+        return compiled
 
-    # === Helpers de banda (clamps e largura total) ===
-    @staticmethod
-    def _ensure_valid_band(Pa: float, Pb: float, P: float) -> Tuple[float, float]:
-        EPS_POS = 1e-12
-        Pa = max(EPS_POS, float(Pa))
-        Pb = max(Pa + EPS_POS, float(Pb))
-        mid_pad = EPS_POS * max(1.0, float(P))
-        Pa = min(P - mid_pad, Pa)
-        Pb = max(P + mid_pad, Pb)
-        if not (Pa < Pb):
-            Pa = P - mid_pad
-            Pb = P + mid_pad
-        return Pa, Pb
+    async def _active_strategies(self, cfg_hash: str) -> List[Dict]:
+        now = time.monotonic()
+        hit = self._active_cache.get(cfg_hash)
+        if hit is not None and now - hit[0] < self._active_ttl:
+            return hit[1]
+        strategies = await self._strategy_repo.get_active_by_indicator_set(indicator_set_id=cfg_hash)
+        if self._active_ttl > 0:
+            self._active_cache[cfg_hash] = (now, strategies)
+        return strategies
 
-    @staticmethod
-    def _scale_to_total_width(pct_below_base: float, pct_above_base: float, total_width_pct: float) -> Tuple[float, float]:
-        base_sum = pct_below_base + pct_above_base
-        if base_sum <= 0:
-            half = max(1e-12, total_width_pct / 2.0)
-            return half, half
-        scale = total_width_pct / base_sum
-        return pct_below_base * scale, pct_above_base * scale
-
-    def _pick_band_for_trend_totalwidth(
-        self,
-        P: float,
-        trend: str,
-        params: Dict,
-        atr_pct_now: Optional[float],
-        total_width_override: Optional[float] = None,
-        pool_type: Optional[str] = None,
-    ) -> Tuple[float, float, str, str, bool, float, float]:
+    def invalidate_active(self, cfg_hash: Optional[str] = None) -> None:
         """
-        Gera (Pa,Pb) assumindo que 'max_major_side_pct' e afins são LARGURA TOTAL do range.
+        Drop the cached active strategies of one indicator set (or all of them),
+        so a strategy create/update is picked up on the next snapshot.
         """
-        tiers: List[Dict] = list(params.get("tiers", []))
-        last_tier = tiers[-1].get("name")
-        # skew base
-        if pool_type == "high_vol":
-            if trend == "down":
-                majority = "token1"; mode = "trend_down"
-                pct_below_base = float(0.09)   # largo abaixo
-                pct_above_base = float(0.01)  # curto acima
-            else:
-                majority = "token2"; mode = "trend_up"
-                pct_below_base = float(0.01)  # curto abaixo
-                pct_above_base = float(0.09)   # largo acima
-        elif pool_type in [t['name'] for t in tiers]:
-            if trend == "down":
-                majority = "token1"; mode = "trend_down"
-                pct_below_base = float(0.05)   # largo abaixo
-                pct_above_base = float(0.05)  # curto acima
-            else:
-                majority = "token2"; mode = "trend_up"
-                pct_below_base = float(0.05)  # curto abaixo
-                pct_above_base = float(0.05)   # largo acima
+        if cfg_hash is None:
+            self._active_cache.clear()
         else:
-            if trend == "down":
-                majority = "token1"; mode = "trend_down"
-                pct_below_base = float(params.get("skew_low_pct", 0.075))   # largo abaixo
-                pct_above_base = float(params.get("skew_high_pct", 0.025))  # curto acima
-            else:
-                majority = "token2"; mode = "trend_up"
-                pct_below_base = float(params.get("skew_high_pct", 0.025))  # curto abaixo
-                pct_above_base = float(params.get("skew_low_pct", 0.075))   # largo acima
-                
-        # regime de vol (flag informativa)
-        vol_th = params.get("vol_high_threshold_pct")
-        high_vol = (atr_pct_now is not None and vol_th is not None and atr_pct_now > float(vol_th))
-
-        # total width
-        if total_width_override is not None:
-            total_width_pct = float(total_width_override)
-        elif pool_type == "high_vol":
-            total_width_pct = float(params.get("high_vol_max_major_side_pct", 2.0))
-        elif pool_type == "standard" or pool_type is None:
-            total_width_pct = float(params.get("standard_max_major_side_pct", 0.05))
-        elif params.get("max_major_side_pct") is not None:
-            total_width_pct = float(params["max_major_side_pct"])
-        else:
-            total_width_pct = pct_below_base + pct_above_base
-
-        total_width_pct = max(float(total_width_pct), 2e-6)
-        pct_below, pct_above = self._scale_to_total_width(pct_below_base, pct_above_base, total_width_pct)
-
-        Pa = P * (1.0 - pct_below)
-        Pb = P * (1.0 + pct_above)
-        Pa, Pb = self._ensure_valid_band(Pa, Pb, P)
-        return Pa, Pb, mode, majority, high_vol, pct_below_base, pct_above_base
-
-    # === Breakout com confirmação por streak no episódio ===
-    @staticmethod
-    def _update_breakout_streaks(P: float, Pa: float, Pb: float, eps: float,
-                                 out_above_streak: int, out_below_streak: int) -> Tuple[int, int]:
-        above = P > Pb * (1.0 + eps)
-        below = P < Pa * (1.0 - eps)
-        if above:
-            return out_above_streak + 1, 0
-        if below:
-            return 0, out_below_streak + 1
-        # voltou para dentro
-        return 0, 0
+            self._active_cache.pop(cfg_hash, None)
 
     # ===== execute =====
     async def execute_for_snapshot(self, indicator_set: Dict, snapshot: Dict) -> None:
@@ -149,232 +286,351 @@ class EvaluateActiveStrategiesUseCase:
         ema_s = float(snapshot["ema_slow"])
         atr_pct = float(snapshot["atr_pct"])
         ts = int(snapshot["ts"])
+        created_at_iso = snapshot.get("created_at_iso")
+        cfg_hash = indicator_set["cfg_hash"]
+        # iguais para todas as estratégias do snapshot
+        ema_gap = ema_f - ema_s
+        trend_now = "up" if ema_f > ema_s else "down"
 
-        strategies = await self._strategy_repo.get_active_by_indicator_set(indicator_set_id=indicator_set["cfg_hash"])
+        strategies = await self._active_strategies(cfg_hash)
         if not strategies:
             return
 
+        # escritas do snapshot inteiro acumuladas e enviadas no final (1 round-trip por coleção)
+        pending_partial: Dict[str, Dict] = {}
+        pending_close: Dict[str, Dict] = {}
+        pending_open: List[EpisodeEntity] = []
+        pending_signals: List[SignalEntity] = []
+
+        # episódios abertos de todas as estratégias numa única consulta
+        open_eps = await self._episode_repo.get_open_by_strategy_ids([st["name"] for st in strategies])
+        if self._streaks:
+            # o Mongo pode estar atrás dos contadores ainda não gravados
+            for sid, ep in open_eps.items():
+                overlay = self._streaks.get(ep["_id"])
+                if overlay is not None:
+                    open_eps[sid] = {**ep, **overlay}
+                    self._seen.add(ep["_id"])
+
+        # 1) gates de todas as estratégias com episódio aberto num passe vetorizado;
+        #    sem episódio → primeira banda (standard)
+        to_open: List[Tuple[Dict, str, Optional[float]]] = []
+        evaluated: List[Tuple[Dict, _StrategyCompiled, Dict]] = []
+        rows: List[Tuple[float, ...]] = []
         for strat in strategies:
-            params = strat["params"]
-            eps = float(params.get("eps", 1e-6))
-            cooloff = int(params.get("cooloff_bars", 1))
-            breakout_confirm = int(params.get("breakout_confirm_bars", 1))
-            inrange_mode = params.get("inrange_resize_mode", "skew_swap")
-            gauge_flow_enabled = bool(params.get("gauge_flow_enabled", False))
-            
-            # 1) episódio atual
-            strat_id = strat["name"]
-            current = await self._episode_repo.get_open_by_strategy(strat_id)
-            if current is None:
-                # abre primeira banda centrada pela tendência
-                Pa, Pb, mode, majority, _, pct_below_base, pct_above_base = self._pick_band_for_trend_totalwidth(
-                    P, self._trend_at(ema_f, ema_s), params, atr_pct, total_width_override=params.get("standard_max_major_side_pct"), pool_type="standard"
+            try:
+                compiled = self._compiled_for(strat)
+                current = open_eps.get(strat["name"])
+                if current is None:
+                    # abre primeira banda centrada pela tendência
+                    to_open.append((strat, "standard", compiled.first_open_width))
+                    continue
+                # defaults de campos antigos
+                pool_type_cur = current.get("pool_type", "standard")
+                mode_on_open_cur = current.get("mode_on_open", "")
+                vol_th = compiled.vol_high_threshold
+                rows.append((
+                    float(current.get("Pa")), float(current.get("Pb")), compiled.eps,
+                    int(current.get("out_above_streak", 0)), int(current.get("out_below_streak", 0)),
+                    int(current.get("last_event_bar", 0)), compiled.cooloff, compiled.breakout_confirm,
+                    vol_th if vol_th is not None else np.nan,
+                    pool_type_cur == "high_vol", mode_on_open_cur == "trend_down", mode_on_open_cur == "trend_up",
+                ))
+                evaluated.append((strat, compiled, current))
+            except Exception:
+                # uma estratégia com params/episódio quebrados não derruba as outras do snapshot
+                self._logger.exception("Strategy evaluation failed: strategy=%s ts=%s", strat.get("name"), ts)
+
+        if evaluated:
+            i_since, above, below, triggers, tier_ready = _gate_batch(
+                P, atr_pct, ema_gap, np.array(rows, dtype=np.float64)
+            )
+            # 1.1) caminho rápido (mercado calmo, quase todas): sem gatilho e fora do scan de
+            #      tiers → só os contadores
+            busy = (triggers != TriggerKind.NONE) | tier_ready
+            for k in np.flatnonzero(~busy):
+                self._streak_patch(
+                    evaluated[k][2], int(i_since[k]), int(above[k]), int(below[k]), pending_partial
                 )
-                
-                if majority == "token1":
-                    major_pct = pct_below_base*10
-                    minor_pct = pct_above_base*10
-                    
-                else:  # majority == "token2"
-                    major_pct = pct_above_base*10
-                    minor_pct = pct_below_base*10
-                
-                new_ep = {
-                    "_id": f"ep_{strat_id}_{ts}",
-                    "strategy_id": strat_id,
-                    "symbol": symbol,
-                    "pool_type": "standard",
-                    "mode_on_open": mode,
-                    "majority_on_open": majority,
-                    "target_major_pct": major_pct,  # ex: 0.90 ou 0.75
-                    "target_minor_pct": minor_pct,
-                    "open_time": ts,
-                    "open_time_iso": snapshot.get("created_at_iso", None),
-                    "open_price": P,
-                    "Pa": Pa, "Pb": Pb,
-                    "last_event_bar": 0,
-                    "atr_streak": {tier["name"]: 0 for tier in params.get("tiers", [])},
-                    "out_above_streak": 0,
-                    "out_below_streak": 0,
-                    "dex": params.get("dex"),
-                    "alias": params.get("alias"),
-                    "token0_address": params.get("token0_address"),
-                    "token1_address": params.get("token1_address"),
-                    "gauge_flow_enabled": gauge_flow_enabled
-                }
-                await self._episode_repo.open_new(new_ep)
-                signal_plan = await self._reconciler.reconcile(strat_id, new_ep, symbol)
-                if signal_plan:
-                    await self._signal_repo.upsert_signal({
-                        "strategy_id": strat_id,
-                        "indicator_set_id": indicator_set["cfg_hash"],
-                        "cfg_hash": indicator_set["cfg_hash"],
-                        "symbol": symbol,
-                        "ts": ts,
-                        "signal_type": signal_plan["signal_type"],
-                        "steps": signal_plan["steps"],
-                        "episode": signal_plan["episode"], 
-                        "status": "PENDING",
-                        "attempts": 0,
-                    })
-                continue
+            # 1.2) demais: scan de tiers, fechamento e próxima pool
+            for k in np.flatnonzero(busy):
+                strat, compiled, current = evaluated[k]
+                try:
+                    opening = self._evaluate_strategy(
+                        compiled, current, int(i_since[k]), int(above[k]), int(below[k]),
+                        TriggerKind(int(triggers[k])), bool(tier_ready[k]),
+                        created_at_iso, P, atr_pct, ts, pending_partial, pending_close,
+                    )
+                except Exception:
+                    self._logger.exception("Strategy evaluation failed: strategy=%s ts=%s", strat.get("name"), ts)
+                    continue
+                if opening is not None:
+                    to_open.append((strat, *opening))
 
-            # defaults de campos antigos
-            Pa_cur = float(current.get("Pa"))
-            Pb_cur = float(current.get("Pb"))
-            i_since_open = int(current.get("last_event_bar", 0)) + 1
-            out_above_streak = int(current.get("out_above_streak", 0))
-            out_below_streak = int(current.get("out_below_streak", 0))
-            pool_type_cur = current.get("pool_type", "standard")
-            mode_on_open_cur = current.get("mode_on_open", "")
-            
-            trigger: Optional[str] = None
+        if not to_open:
+            await self._write_episodes(pending_partial, pending_close, pending_open, ts)
+            return
 
-            # 2) atualiza streaks de breakout e verifica confirmação
-            out_above_streak, out_below_streak = self._update_breakout_streaks(
-                P, Pa_cur, Pb_cur, eps, out_above_streak, out_below_streak
-            )
-            # persiste os contadores mesmo sem evento
-            await self._episode_repo.update_partial(current["_id"], {
-                "out_above_streak": out_above_streak,
-                "out_below_streak": out_below_streak,
-                "last_event_bar": i_since_open
-            })
-
-            if (i_since_open >= cooloff) and (
-                out_above_streak >= breakout_confirm or out_below_streak >= breakout_confirm
-            ):
-                trigger = "cross_max" if out_above_streak >= breakout_confirm else "cross_min"
-
-            # 3) gate high vol (evita reabrir se já high_vol)
-            if not trigger and (i_since_open >= cooloff):
-                vol_th = params.get("vol_high_threshold_pct")
-                if (atr_pct is not None and vol_th is not None and atr_pct > float(vol_th)) and pool_type_cur != "high_vol":
-                    trigger = "high_vol"
-            
-            # 3.1) Reabre high vol do lado certo
-            if pool_type_cur == "high_vol" and mode_on_open_cur == "trend_down" and ema_f - ema_s > 10:
-                trigger = "high_vol"
-            if pool_type_cur == "high_vol" and mode_on_open_cur == "trend_up" and ema_f - ema_s < -10:
-                trigger = "high_vol"
-            
-            # 4) tiers — apenas se in-range e sem trigger ainda
-            if not trigger and (Pa_cur < P < Pb_cur) and (i_since_open >= cooloff):
-                tiers: List[Dict] = list(params.get("tiers", []))
-                tiers.sort(key=lambda t: t["atr_pct_threshold"])
-                streaks = current.get("atr_streak", {})
-                chosen = None
-                for tier in tiers:
-                    if pool_type_cur == tier["name"]:
-                        break
-                    if pool_type_cur not in tier.get("allowed_from", []) and pool_type_cur != tier["name"]:
-                        continue
-                    # atualiza streak
-                    thr = float(tier["atr_pct_threshold"])
-                    name = tier["name"]
-                    
-                    streaks[name] = int(streaks.get(name, 0)) + 1 if (atr_pct is not None and atr_pct <= thr) else 0
-                    if streaks[name] >= int(tier["bars_required"]):
-                        chosen = tier
-                        break
-                if chosen:
-                    trigger = f"tighten_{chosen['name']}"
-                # persiste streaks (mesmo sem trigger)
-                await self._episode_repo.update_partial(current["_id"], {"atr_streak": streaks})
+        # 2) bandas de todas as aberturas num único passe vetorizado
+        compiled_open = [self._compiled_for(strat) for strat, _, _ in to_open]
+        specs = [
+            compiled.band_spec(trend_now, pool_type, width)
+            for compiled, (_, pool_type, width) in zip(compiled_open, to_open)
+        ]
+        Pa_arr, Pb_arr = pick_bands(
+            P,
+            np.array([sp[2] for sp in specs], dtype=np.float64),
+            np.array([sp[3] for sp in specs], dtype=np.float64),
+            np.array([sp[4] for sp in specs], dtype=np.float64),
+        )
+
+        # 3) monta episódios novos
+        for i, (strat, pool_type, _) in enumerate(to_open):
+            pending_open.append(self._build_episode(
+                strat["name"], compiled_open[i], specs[i], symbol, pool_type, ts, created_at_iso,
+                P, float(Pa_arr[i]), float(Pb_arr[i]),
+            ))
 
-            # 5) sem gatilho → segue
-            if not trigger:
+        # 4) reconcilia todos com o LP em paralelo (limitado pelo semáforo), enquanto o bulk de
+        #    episódios vai para o Mongo — um não depende do outro; o get_status de um mesmo
+        #    (dex, alias) é compartilhado pelo cache do PipelineHttpClient
+        failed, plans = await asyncio.gather(
+            self._write_episodes(pending_partial, pending_close, pending_open, ts),
+            asyncio.gather(
+                *(self._reconcile_one(ep.strategy_id, ep, symbol) for ep in pending_open)
+            ),
+        )
+        for new_ep, signal_plan in zip(pending_open, plans):
+            if new_ep.id in failed:
+                # episódio não gravado (ou fechamento do anterior falhou): só esta estratégia fica sem sinal
                 continue
+            if signal_plan:
+                pending_signals.append(SignalEntity(
+                    strategy_id=new_ep.strategy_id,
+                    indicator_set_id=cfg_hash,
+                    cfg_hash=cfg_hash,
+                    symbol=symbol,
+                    ts=ts,
+                    signal_type=signal_plan["signal_type"],
+                    steps=signal_plan["steps"],
+                    episode=signal_plan["episode"],
+                    status="PENDING",
+                    attempts=0,
+                ))
 
-            # 6) fechar episódio atual
-            await self._episode_repo.close_episode(
-                current["_id"],
-                {
-                    "close_time": ts,
-                    "close_time_iso": snapshot.get("created_at_iso", None),
-                    "close_reason": trigger,
-                    "close_price": P,
-                },
-            )
+        # 5) sinais por último: referenciam episódios já persistidos
+        if pending_signals:
+            await self._signal_repo.bulk_upsert([sig.to_doc() for sig in pending_signals])
+            if self._on_signals is not None:
+                self._on_signals()
 
-            trend_now = self._trend_at(ema_f, ema_s)
+    @staticmethod
+    def _build_episode(
+        strat_id: str,
+        compiled: _StrategyCompiled,
+        spec: BandSpec,
+        symbol: str,
+        pool_type: str,
+        ts: int,
+        created_at_iso: Optional[str],
+        P: float,
+        Pa: float,
+        Pb: float,
+    ) -> EpisodeEntity:
+        """
+        Episódio OPEN novo com streaks zerados e os campos do vault da estratégia.
+        """
+        mode, majority, pct_below_base, pct_above_base, _ = spec
+        if majority == "token1":
+            major_pct = pct_below_base*10
+            minor_pct = pct_above_base*10
+        else:  # majority == "token2"
+            major_pct = pct_above_base*10
+            minor_pct = pct_below_base*10
 
-            # helper para abrir com "total width"; aplica preserve quando aplicável
-            def _open_with_width(next_pool_type: str, total_width_override: Optional[float]):
-                # decide total width alvo
-                total_width_pct = (
-                    float(total_width_override) if total_width_override is not None
-                    else (float(params.get("high_vol_max_major_side_pct")) if next_pool_type == "high_vol"
-                          else float(params.get("standard_max_major_side_pct")))
-                )
-                Pa_new, Pb_new, mode_now, majority_now, _, pct_below_base, pct_above_base = self._pick_band_for_trend_totalwidth(
-                    P, trend_now, params, atr_pct, total_width_override=total_width_pct, pool_type=next_pool_type
+        return EpisodeEntity(
+            id=f"ep_{strat_id}_{ts}",
+            strategy_id=strat_id,
+            symbol=symbol,
+            pool_type=pool_type,
+            mode_on_open=mode,
+            majority_on_open=majority,
+            target_major_pct=major_pct,  # ex: 0.90 ou 0.75
+            target_minor_pct=minor_pct,
+            open_time=ts,
+            open_time_iso=created_at_iso,
+            open_price=P,
+            Pa=Pa, Pb=Pb,
+            last_event_bar=0,
+            atr_streak=compiled.zero_streaks.copy(),
+            out_above_streak=0,
+            out_below_streak=0,
+            dex=compiled.dex,
+            alias=compiled.alias,
+            token0_address=compiled.token0_address,
+            token1_address=compiled.token1_address,
+            gauge_flow_enabled=compiled.gauge_flow_enabled,
+        )
+
+    async def _reconcile_one(self, strategy_id: str, desired: EpisodeEntity, symbol: str) -> Optional[Dict]:
+        async with self._reconcile_sem:
+            try:
+                return await self._reconciler.reconcile(strategy_id, desired, symbol)
+            except Exception:
+                # só esta estratégia fica sem sinal; os planos das demais seguem para o bulk
+                self._logger.exception("Reconcile failed: strategy=%s episode=%s", strategy_id, desired.id)
+                return None
+
+    async def _write_episodes(
+        self,
+        pending_partial: Dict[str, Dict],
+        pending_close: Dict[str, Dict],
+        pending_open: List[EpisodeEntity],
+        ts: int,
+    ) -> Set[str]:
+        """
+        Persiste as escritas de episódio acumuladas do snapshot (patches e fechamentos, depois
+        aberturas). Entidades viram dict só aqui, na fronteira com o Mongo.
+        Com defer_streak_writes os patches ficam em memória até o próximo flush().
+        Retorna os ids de episódio que não foram gravados.
+        """
+        failed: Set[str] = set()
+        if not self._defer_streaks:
+            if pending_partial or pending_close or pending_open:
+                failed = await self._episode_repo.bulk_write_episodes(
+                    partials=pending_partial, closes=pending_close, opens=[ep.to_doc() for ep in pending_open]
                 )
-                    
-                if majority_now == "token1":
-                    major_pct = pct_below_base*10
-                    minor_pct = pct_above_base*10
-                    
-                else:  # majority == "token2"
-                    major_pct = pct_above_base*10
-                    minor_pct = pct_below_base*10
-                
-                return {
-                    "_id": f"ep_{strat_id}_{ts}",
-                    "strategy_id": strat_id,
-                    "symbol": symbol,
-                    "pool_type": next_pool_type,
-                    "mode_on_open": mode_now,
-                    "majority_on_open": majority_now,
-                    "target_major_pct": major_pct,  # ex: 0.90 ou 0.75
-                    "target_minor_pct": minor_pct,
-                    "open_time": ts,
-                    "open_time_iso": snapshot.get("created_at_iso", None),
-                    "open_price": P,
-                    "Pa": Pa_new, "Pb": Pb_new,
-                    "last_event_bar": 0,
-                    "atr_streak": {tier["name"]: 0 for tier in params.get("tiers", [])},
-                    "out_above_streak": 0,
-                    "out_below_streak": 0,
-                    "dex": params.get("dex"),
-                    "alias": params.get("alias"),
-                    "token0_address": params.get("token0_address"),
-                    "token1_address": params.get("token1_address"),
-                    "gauge_flow_enabled": gauge_flow_enabled
-                }
-
-            # 7) escolher próxima pool
-            new_ep = None
-            if trigger in ("cross_min", "cross_max"):
-                tiers = params.get("tiers", [])
-                if tiers:
-                    tiers_sorted = sorted(tiers, key=lambda t: t["atr_pct_threshold"])
-                    for tier in reversed(tiers_sorted):  # mais estreito primeiro
-                        new_ep = _open_with_width(tier["name"], float(tier["max_major_side_pct"]))
+        else:
+            for ep_id, patch in pending_partial.items():
+                self._streaks.setdefault(ep_id, {}).update(patch)
+                self._dirty.setdefault(ep_id, {}).update(patch)
+                self._seen.add(ep_id)
+            for ep_id, fields in pending_close.items():
+                # fechamento leva os contadores ainda não gravados
+                self._streaks.pop(ep_id, None)
+                dirty = self._dirty.pop(ep_id, None)
+                if dirty:
+                    pending_close[ep_id] = {**dirty, **fields}
+            if pending_close or pending_open:
+                # depois de um flush em andamento, para não sobrescrever o fechamento com streaks antigos
+                async with self._flush_lock:
+                    failed = await self._episode_repo.bulk_write_episodes(
+                        partials={}, closes=pending_close, opens=[ep.to_doc() for ep in pending_open]
+                    )
+        if failed:
+            self._logger.warning("Episode writes failed: ts=%s episodes=%s", ts, sorted(failed))
+        return failed
+
+    async def flush(self) -> None:
+        """
+        Persist the streak counters kept in memory (defer_streak_writes).
+        Called periodically and on shutdown; a no-op when nothing changed.
+        """
+        async with self._flush_lock:
+            if self._dirty:
+                dirty, self._dirty = self._dirty, {}
+                try:
+                    failed = await self._episode_repo.bulk_write_episodes(partials=dirty, closes={}, opens=[])
+                except Exception:
+                    failed = set(dirty)
+                    raise
+                finally:
+                    # volta para o próximo flush sem sobrescrever valores mais novos
+                    for ep_id in failed:
+                        self._dirty[ep_id] = {**dirty[ep_id], **self._dirty.get(ep_id, {})}
+            # episódios não vistos desde o último flush (estratégia inativa etc.) já estão gravados
+            for ep_id in [k for k in self._streaks if k not in self._seen and k not in self._dirty]:
+                del self._streaks[ep_id]
+            self._seen.clear()
+
+    @staticmethod
+    def _streak_patch(
+        current: Dict,
+        i_since_open: int,
+        out_above_streak: int,
+        out_below_streak: int,
+        pending_partial: Dict[str, Dict],
+    ) -> Dict:
+        """
+        Persiste os contadores mesmo sem evento (só os campos que mudaram); retorna o patch do episódio.
+        """
+        patch = pending_partial.setdefault(current["_id"], {})
+        patch["last_event_bar"] = i_since_open
+        if out_above_streak != int(current.get("out_above_streak", 0)):
+            patch["out_above_streak"] = out_above_streak
+        if out_below_streak != int(current.get("out_below_streak", 0)):
+            patch["out_below_streak"] = out_below_streak
+        return patch
+
+    def _evaluate_strategy(
+        self,
+        compiled: _StrategyCompiled,
+        current: Dict,
+        i_since_open: int,
+        out_above_streak: int,
+        out_below_streak: int,
+        trigger: TriggerKind,
+        tier_ready: bool,
+        created_at_iso: Optional[str],
+        P: float,
+        atr_pct: float,
+        ts: int,
+        pending_partial: Dict[str, Dict],
+        pending_close: Dict[str, Dict],
+    ) -> Optional[Tuple[str, Optional[float]]]:
+        """
+        Aplica ao episódio aberto o resultado dos gates (_gate_batch) e o scan de tiers; se
+        precisar abrir uma banda nova, retorna (pool_type, total_width_override). None quando nada muda.
+        Patches e fechamentos vão para pending_partial / pending_close (por id do episódio).
+        """
+        patch = self._streak_patch(current, i_since_open, out_above_streak, out_below_streak, pending_partial)
+        chosen: Optional[str] = None  # tier que confirmou (TIGHTEN)
+
+        # 4) tiers — apenas se in-range e sem trigger ainda
+        if tier_ready:
+            pool_type_cur = current.get("pool_type", "standard")
+            prev_streaks = current.get("atr_streak", {})
+            # cópia só quando algum contador muda (o persistido não é alterado)
+            streaks: Optional[Dict[str, int]] = None
+            eligible, eligible_idx = compiled.eligible_for(pool_type_cur)
+            if eligible_idx:
+                names = compiled.tier_names_asc
+                counters = np.fromiter((prev_streaks.get(n, 0) for n in names), dtype=np.int64, count=len(names))
+                # o scan para no primeiro tier (menor threshold) que confirma
+                fired = tier_scan(atr_pct, compiled.tier_thresholds, compiled.tier_bars_required, eligible, counters)
+                for i in eligible_idx:
+                    if fired >= 0 and i > fired:
                         break
-                if new_ep is None:
-                    new_ep = _open_with_width("standard", float(params.get("standard_max_major_side_pct", 0.05)))
-            elif trigger == "high_vol":
-                new_ep = _open_with_width("high_vol", float(params.get("high_vol_max_major_side_pct", 0.10)))
-            elif trigger.startswith("tighten_"):
-                tier_name = trigger.split("_", 1)[1]
-                tier = next((t for t in params.get("tiers", []) if t["name"] == tier_name), None)
-                width = float(tier["max_major_side_pct"]) if tier else float(params.get("standard_max_major_side_pct", 0.05))
-                new_ep = _open_with_width(tier_name if tier else "standard", width)
-
-            if new_ep:
-                await self._episode_repo.open_new(new_ep)
-                signal_plan = await self._reconciler.reconcile(strat_id, new_ep, symbol)
-                if signal_plan:
-                    await self._signal_repo.upsert_signal({
-                        "strategy_id": strat_id,
-                        "indicator_set_id": indicator_set["cfg_hash"],
-                        "cfg_hash": indicator_set["cfg_hash"],
-                        "symbol": symbol,
-                        "ts": ts,
-                        "signal_type": signal_plan["signal_type"],
-                        "steps": signal_plan["steps"],
-                        "episode": signal_plan["episode"], 
-                        "status": "PENDING",
-                        "attempts": 0,
-                    })
\ No newline at end of file
+                    value = int(counters[i])
+                    if prev_streaks.get(names[i]) != value:
+                        if streaks is None:
+                            streaks = dict(prev_streaks)
+                        streaks[names[i]] = value
+                if fired >= 0:
+                    chosen = names[fired]
+            if chosen is not None:
+                trigger = TriggerKind.TIGHTEN
+            # persiste streaks (mesmo sem trigger), só se mudaram
+            if streaks is not None:
+                patch["atr_streak"] = streaks
+
+        # 5) sem gatilho → segue
+        if trigger is TriggerKind.NONE:
+            return None
+
+        # 6) fechar episódio atual — os streaks finais vão no mesmo update do fechamento
+        close_fields = pending_partial.pop(current["_id"], {})
+        close_fields.update({
+            "close_time": ts,
+            "close_time_iso": created_at_iso,
+            "close_reason": trigger.close_reason(chosen),
+            "close_price": P,
+        })
+        pending_close[current["_id"]] = close_fields
+
+        # 7) escolher próxima pool (pool_type, largura total)
+        if trigger is TriggerKind.CROSS_MIN or trigger is TriggerKind.CROSS_MAX:
+            return compiled.breakout_reopen
+        if trigger is TriggerKind.HIGH_VOL:
+            return "high_vol", compiled.high_vol_reopen_width
+        return compiled.tighten_reopen[chosen]
@@ -1,12 +1,153 @@
 import asyncio
 import logging
+import os
+import random
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from math import sqrt
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ...core.repositories.strategy_episode_repository import StrategyEpisodeRepository
 
 from ..repositories.signal_repository import SignalRepository
 from ...adapters.external.pipeline.pipeline_http_client import PipelineHttpClient
+from ...adapters.external.pipeline.circuit_breaker import CircuitOpenError
+
+class TransientPipelineError(RuntimeError):
+    """Step failure worth retrying (provider unavailable, call returned no result)."""
+
+
+class PermanentPipelineError(RuntimeError):
+    """Step failure no retry can fix (malformed step); the signal fails at once."""
+
+# SWAP_EXACT_IN: (alinha token1?, falta > 0) -> (lado vendido, lado comprado, direção); 0 = WETH, 1 = USDC
+_SWAP_SIDES = {
+    (True, True): (0, 1, "WETH->USDC"),    # falta token1: vender WETH
+    (True, False): (1, 0, "USDC->WETH"),   # sobra token1: vender USDC
+    (False, True): (1, 0, "USDC->WETH"),   # falta WETH: vender USDC
+    (False, False): (0, 1, "WETH->USDC"),  # sobra WETH: vender WETH
+}
+
+
+
+@dataclass(slots=True)
+class _SignalCtx:
+    """
+    Campos do episódio que os steps de um sinal usam, lidos uma vez por sinal.
+    """
+
+    episode_id: Optional[str]
+    dex: Optional[str]
+    alias: Optional[str]
+    token0_addr: Optional[str]
+    token1_addr: Optional[str]
+    majority_flag: Optional[str]
+    # pedaço fixo dos logs, compartilhado entre entradas (só leitura)
+    vault_req: Dict[str, Any]
+    # saldos/preço do snapshot "after" do WITHDRAW; vale só para o step seguinte
+    last_holdings: Optional["_VaultSnapshot"] = None
+
+    @classmethod
+    def from_signal(cls, sig: Dict) -> "_SignalCtx":
+        episode = sig.get("episode") or {}
+        dex = episode.get("dex")
+        alias = episode.get("alias")
+        return cls(
+            episode_id=episode.get("_id"),
+            dex=dex,
+            alias=alias,
+            token0_addr=episode.get("token0_address"),
+            token1_addr=episode.get("token1_address"),
+            majority_flag=episode.get("majority_on_open"),
+            vault_req={"dex": dex, "alias": alias},
+        )
+
+
+@dataclass(slots=True)
+class _VaultSnapshot:
+    """
+    Saldos idle (totals) e preço corrente de um payload de /status, já em float.
+    """
+
+    amt0: float
+    amt1: float
+    p_t1_t0: float
+
+    @classmethod
+    def from_status(cls, st: Dict[str, Any]) -> "_VaultSnapshot":
+        totals = (st.get("holdings") or {}).get("totals") or {}
+        current = (st.get("prices") or {}).get("current") or {}
+        return cls(
+            amt0=float(totals.get("token0", 0.0)),
+            amt1=float(totals.get("token1", 0.0)),
+            p_t1_t0=float(current.get("p_t1_t0") or 0.0),
+        )
+
+    @classmethod
+    def from_exit_response(cls, res: Optional[Dict[str, Any]]) -> Optional["_VaultSnapshot"]:
+        """
+        Snapshot "after" da resposta do /withdraw (mesmos totals e preço corrente do
+        /status), ou None se a resposta não o trouxer.
+        """
+        after = (res or {}).get("after") or {}
+        totals = after.get("totals") or {}
+        price = (after.get("prices") or {}).get("p_t1_t0")
+        if totals.get("token0") is None or totals.get("token1") is None or not price:
+            return None
+        return cls(amt0=float(totals["token0"]), amt1=float(totals["token1"]), p_t1_t0=float(price))
+
+
+@dataclass(slots=True)
+class _SwapPlan:
+    """
+    Alvo do SWAP_EXACT_IN para um snapshot: valores em USD, tokens pedidos pela banda e
+    o swap (direção/valor) que alinha o lado majoritário.
+    """
+
+    usd0: float
+    usd1: float
+    total_usd: float
+    t0_needed: float
+    t1_needed: float
+    falta_t0: Optional[float]
+    falta_t1: Optional[float]
+    t0_needed_usd: Optional[float]
+    in_side: int
+    out_side: int
+    direction: str
+    req_amount_usd: float
+
+
+@dataclass(slots=True)
+class _StepCtx:
+    """
+    Constantes de um step, lidas uma vez e reaproveitadas entre as tentativas.
+    """
+
+    action: Optional[str]
+    payload: Dict[str, Any]
+    lower_price: Optional[float]
+    upper_price: Optional[float]
+    # faixa pedida, como vai nos logs de OPEN (só leitura)
+    band: Dict[str, Any]
+    # (sqrt(Pa), sqrt(Pb)) calculados na primeira tentativa do SWAP
+    band_roots: Optional[Tuple[float, float]] = None
+
+    @classmethod
+    def from_step(cls, step: Dict) -> "_StepCtx":
+        payload = step.get("payload") or {}
+        lower_price = payload.get("lower_price")
+        upper_price = payload.get("upper_price")
+        return cls(
+            action=step.get("action"),
+            payload=payload,
+            lower_price=lower_price,
+            upper_price=upper_price,
+            band={"lower_price": lower_price, "upper_price": upper_price},
+        )
 
 
 class ExecuteSignalPipelineUseCase:
@@ -16,12 +157,14 @@ class ExecuteSignalPipelineUseCase:
 
     Rules:
       - Steps = [COLLECT, WITHDRAW, SWAP_EXACT_IN, OPEN] (some may be skipped).
-      - Each step retries with backoff.
+      - Only TransientPipelineError is retried (jittered exponential backoff); any other
+        error, CircuitOpenError included (provider endpoint down), fails the step at once.
       - On hard failure -> mark FAILED and stop processing that signal.
       - On full success -> mark SENT.
 
     Runtime sizing logic:
-      - before SWAP_EXACT_IN we read /status to pick direction/amount.
+      - before SWAP_EXACT_IN we read /status to pick direction/amount, unless the
+        WITHDRAW response right before it already shows a dust-sized delta.
       - before OPEN we read /status again to snapshot idle caps.
     """
 
@@ -33,6 +176,13 @@ class ExecuteSignalPipelineUseCase:
         logger: Optional[logging.Logger] = None,
         max_retries: int = 3,
         base_backoff_sec: float = 1.0,
+        max_backoff_sec: float = 10.0,
+        max_concurrency: int = 8,
+        log_batch_size: int = 200,
+        log_max_wait_sec: float = 0.2,
+        worker_id: Optional[str] = None,
+        claim_ttl_sec: float = 3600.0,
+        on_vault_unsettled: Optional[Callable[[str, str], None]] = None,
     ):
         self._signals = signal_repo
         self._episodes = episode_repo
@@ -40,19 +190,37 @@ class ExecuteSignalPipelineUseCase:
         self._logger = logger or logging.getLogger(self.__class__.__name__)
         self._max_retries = max_retries
         self._base_backoff = base_backoff_sec
+        self._max_backoff = max_backoff_sec
+        # limita quantos vaults são processados ao mesmo tempo (carga no provider e no Mongo)
+        self._max_concurrency = max(1, int(max_concurrency))
+        # execution_log sai do caminho crítico: fila + flusher em background (bulk por episódio)
+        self._log_queue: asyncio.Queue = asyncio.Queue()
+        self._log_batch_size = max(1, int(log_batch_size))
+        self._log_max_wait = log_max_wait_sec
+        self._log_task: Optional[asyncio.Task] = None
+        # sinais são tomados com claim atômico: várias instâncias podem rodar sem executar o mesmo sinal
+        self._worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        # claim mais velho que isso = executor morreu no meio; o sinal volta para PENDING
+        self._claim_ttl = claim_ttl_sec
+        # (dex, alias) de um vault cujo step falhou ou foi pulado: a posição pode não bater com o plano
+        self._on_vault_unsettled = on_vault_unsettled
+        # uma execução por vez nesta instância (gatilho por evento + poll não se sobrepõem)
+        self._run_lock = asyncio.Lock()
         self.EPS_POS = 1e-12  # usado para clamps de raiz e separação Pa<P<Pb
+        # action -> handler do step; ação desconhecida cai em _do_unknown
+        self._handlers = {
+            "NOOP_LEGACY": self._do_noop,
+            "UNSTAKE": self._do_unstake,
+            "COLLECT": self._do_collect,
+            "WITHDRAW": self._do_withdraw,
+            "SWAP_EXACT_IN_REWARD": self._do_swap_reward,
+            "SWAP_EXACT_IN": self._do_swap,
+            "OPEN": self._do_open,
+            "STAKE": self._do_stake,
+        }
+        # o lp_client deve ser o singleton do processo (pool compartilhado); o id facilita achar instâncias duplicadas
+        self._logger.debug("Using PipelineHttpClient id=%s", id(lp_client))
         
-    def _tokens_from_L(self, L, Pa, Pb, P):
-        xa, xb, x = sqrt(Pa), sqrt(Pb), sqrt(P)
-        if P <= Pa:   # tudo vira token0
-            t0 = L * (1/xa - 1/xb); t1 = 0
-        elif P >= Pb: # tudo vira token1
-            t0 = 0; t1 = L * (xb - xa)
-        else:         # misto
-            t0 = L * (1/x - 1/xb)
-            t1 = L * (x - xa)
-        return t0, t1
-
     def _ensure_valid_band(self, Pa: float, Pb: float, P: float) -> Tuple[float, float]:
         """
         Garante:
@@ -75,25 +243,106 @@ class ExecuteSignalPipelineUseCase:
 
         return Pa, Pb
 
-    def _L_closed(self, total_P: float, P: float, Pa: float, Pb: float) -> float:
-        # assegura banda válida
-        Pa, Pb = self._ensure_valid_band(Pa, Pb, P)
-
-        a  = sqrt(max(self.EPS_POS, P))
-        xa = sqrt(max(self.EPS_POS, Pa))
-        xb = sqrt(max(self.EPS_POS, Pb))
-
-        denom = 2 * a - xa - (P / xb)
+    def _size_position(
+        self,
+        total_usd: float,
+        P: float,
+        Pa: float,
+        Pb: float,
+        band_roots: Optional[Tuple[float, float]] = None,
+    ) -> Tuple[float, float, float]:
+        """
+        (L, t0, t1): liquidez alvo para `total_usd` (forma fechada, banda validada) e os
+        tokens que essa L pede na banda pedida. Cada raiz é calculada uma vez só; as da
+        banda validada só são refeitas se o clamp mexeu em Pa/Pb.
+        `band_roots` = (sqrt(Pa), sqrt(Pb)) já calculados pelo chamador.
+        """
+        EPS = self.EPS_POS
+        x = sqrt(P)
+        xa, xb = band_roots if band_roots is not None else (sqrt(Pa), sqrt(Pb))
+
+        # L fechado (assegura banda válida)
+        Pa_v, Pb_v = self._ensure_valid_band(Pa, Pb, P)
+        a = x if P >= EPS else sqrt(EPS)
+        xa_v = xa if Pa_v == Pa >= EPS else sqrt(max(EPS, Pa_v))
+        xb_v = xb if Pb_v == Pb >= EPS else sqrt(max(EPS, Pb_v))
+        denom = 2 * a - xa_v - (P / xb_v)
         if denom <= 0:
-            denom = self.EPS_POS
-        return total_P / denom
+            denom = EPS
+        L = total_usd / denom
+
+        if P <= Pa:   # tudo vira token0
+            t0 = L * (1/xa - 1/xb); t1 = 0
+        elif P >= Pb: # tudo vira token1
+            t0 = 0; t1 = L * (xb - xa)
+        else:         # misto
+            t0 = L * (1/x - 1/xb)
+            t1 = L * (x - xa)
+        return L, t0, t1
 
     async def execute_once(self) -> None:
         """
-        Fetch up to N pending signals and attempt to execute them.
+        Claim up to N pending signals and attempt to execute them. Stale claims of a
+        dead executor are put back to PENDING first.
+
+        Signals of different vaults run concurrently (at most `max_concurrency` workers);
+        signals of the same vault stay sequential, in the order claim_pending yields them,
+        since their steps move the same position. Work starts with the first signal claimed,
+        while the rest are still being claimed. /status reads go through the client's
+        per-vault cache, which every POST drops.
+
+        Runs are serialized: a call made while another is in progress waits for it.
         """
-        pending = await self._signals.list_pending(limit=50)
-        for sig in pending:
+        async with self._run_lock:
+            await self._execute_once()
+
+    async def _execute_once(self) -> None:
+        lanes: Dict[Tuple, deque] = {}   # vault -> sinais ainda não executados, em ordem
+        ready: deque = deque()            # vaults aguardando um worker
+        wakeup = asyncio.Event()
+        streaming = True
+
+        async def _worker() -> None:
+            while True:
+                if not ready:
+                    if not streaming:
+                        return
+                    wakeup.clear()
+                    await wakeup.wait()
+                    continue
+                await self._run_lane(ready.popleft(), lanes)
+
+        stale_before_ms = int((time.time() - self._claim_ttl) * 1000)
+        requeued = await self._signals.requeue_stale_claims(stale_before_ms)
+        if requeued:
+            self._logger.warning("Requeued %s stale CLAIMED signals", requeued)
+
+        workers = [asyncio.create_task(_worker()) for _ in range(self._max_concurrency)]
+        try:
+            async for sig in self._signals.claim_pending(self._worker_id, limit=50):
+                episode = sig.get("episode") or {}
+                dex, alias = episode.get("dex"), episode.get("alias")
+                key = ("vault", dex, alias) if dex and alias else ("strategy", sig.get("strategy_id"))
+                lane = lanes.get(key)
+                if lane is None:
+                    # vault sem execução em andamento: nova fila
+                    lanes[key] = deque([sig])
+                    ready.append(key)
+                    wakeup.set()
+                else:
+                    lane.append(sig)
+        finally:
+            streaming = False
+            wakeup.set()
+            results = await asyncio.gather(*workers, return_exceptions=True)
+        for res in results:
+            if isinstance(res, BaseException):
+                self._logger.error("Signal worker aborted: %r", res)
+
+    async def _run_lane(self, key: Tuple, lanes: Dict[Tuple, deque]) -> None:
+        lane = lanes[key]
+        while lane:
+            sig = lane[0]
             try:
                 ok = await self._process_single_signal(sig)
                 if ok:
@@ -101,7 +350,16 @@ class ExecuteSignalPipelineUseCase:
                 # if not ok, _process_single_signal already marked FAILED
             except Exception as exc:
                 self._logger.exception("Unexpected error processing signal %s: %s", sig, exc)
-                await self._signals.mark_failure(sig, f"UNEXPECTED: {exc}")
+                if key[0] == "vault":
+                    self._vault_unsettled(key[1], key[2])
+                try:
+                    await self._signals.mark_failure(sig, f"UNEXPECTED: {exc}")
+                except Exception as mark_exc:
+                    # fica CLAIMED e volta para PENDING pelo requeue de claims vencidos; a fila segue
+                    self._logger.exception("Could not mark signal %s as failed: %s", sig, mark_exc)
+            lane.popleft()
+        # fila vazia: um sinal que chegar depois abre outra
+        del lanes[key]
 
     async def _append_log(
         self,
@@ -109,16 +367,86 @@ class ExecuteSignalPipelineUseCase:
         base: Dict,
     ) -> None:
         """
-        Helper: push a log line into the episode doc, if we have an episode_id.
+        Helper: queue a log line for the episode doc, if we have an episode_id.
+        The entry is timestamped here and written later by the background flusher.
         """
         if not episode_id:
             return
+        now_ms = int(time.time() * 1000)
+        now_iso = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+        self._log_queue.put_nowait((episode_id, {"ts": now_ms, "ts_iso": now_iso, **base}))
+        if self._log_task is None or self._log_task.done():
+            self._log_task = asyncio.create_task(self._log_flusher())
+
+    async def _log_flusher(self) -> None:
+        """
+        Drains the log queue in batches: waits for one entry, then takes whatever else
+        arrives within `log_max_wait_sec` (up to `log_batch_size`) and pushes it in one bulk.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._log_queue.get()]
+            deadline = loop.time() + self._log_max_wait
+            while len(batch) < self._log_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._log_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write_logs(batch)
+
+    async def _write_logs(self, batch: List[Tuple[str, Dict]]) -> None:
+        logs: Dict[str, List[Dict]] = {}
+        for episode_id, entry in batch:
+            logs.setdefault(episode_id, []).append(entry)
         try:
-            await self._episodes.append_execution_log(episode_id, base)
+            await self._episodes.bulk_append_execution_logs(logs)
         except Exception as log_exc:
             # logging de fallback pra não matar o fluxo
-            self._logger.warning("Failed to append_execution_log for %s: %s", episode_id, log_exc)
+            self._logger.warning("Failed to append execution logs for %s: %s", list(logs), log_exc)
+        finally:
+            for _ in batch:
+                self._log_queue.task_done()
 
+    async def aclose(self) -> None:
+        """
+        Stop the log flusher after writing everything still queued.
+        """
+        if self._log_task is not None and not self._log_task.done():
+            await self._log_queue.join()
+            self._log_task.cancel()
+            try:
+                await self._log_task
+            except asyncio.CancelledError:
+                pass
+        self._log_task = None
+        batch = []
+        while not self._log_queue.empty():
+            batch.append(self._log_queue.get_nowait())
+        if batch:
+            await self._write_logs(batch)
+
+    async def _preflight_aligned(self, dex: str, alias: str, steps: List[Dict]) -> bool:
+        """
+        True when the signal ends in an OPEN whose band the vault already holds (same
+        on-chain ticks), e.g. an earlier signal of the strategy already rotated it.
+        Any missing piece (no OPEN, no position, unknown ticks/decimals) means "run it".
+        """
+        open_payload = next((st.get("payload") or {} for st in steps if st.get("action") == "OPEN"), None)
+        if not open_payload:
+            return False
+        Pa, Pb = open_payload.get("lower_price"), open_payload.get("upper_price")
+        if Pa is None or Pb is None:
+            return False
+        summary = await self._lp.get_status_summary(dex, alias)
+        if summary is None or not summary.has_pool:
+            return False
+        if summary.lower_tick is None or summary.upper_tick is None:
+            return False
+        ticks = summary.ticks_for(float(Pa), float(Pb))
+        return ticks is not None and ticks == (summary.lower_tick, summary.upper_tick)
 
     async def _process_single_signal(self, sig: Dict) -> bool:
         """
@@ -126,14 +454,22 @@ class ExecuteSignalPipelineUseCase:
         Returns True on full success, False if FAILED.
         """
         steps: List[Dict] = sig.get("steps") or []
-        episode = sig.get("episode") or {}
-
-        episode_id = episode.get("_id")
-        dex = episode.get("dex")
-        alias = episode.get("alias")
-        token0_addr = episode.get("token0_address")
-        token1_addr = episode.get("token1_address")
-        majority_flag = episode.get("majority_on_open")
+        ctx = _SignalCtx.from_signal(sig)
+        episode_id = ctx.episode_id
+        dex, alias = ctx.dex, ctx.alias
+
+        if dex and alias and await self._preflight_aligned(dex, alias, steps):
+            # o vault já está na faixa que este sinal abriria: nada a executar
+            self._logger.info("Signal for %s/%s already aligned; skipping its steps", dex, alias)
+            await self._append_log(
+                episode_id,
+                {
+                    "phase": "all_steps_done",
+                    "status": "SENT",
+                    "reason": "preflight_aligned",
+                },
+            )
+            return True
 
         for step in steps:
             action = step.get("action")
@@ -153,432 +489,14 @@ class ExecuteSignalPipelineUseCase:
                 )
                 
                 continue
-            
-            success = False
-            last_err: Optional[str] = None
 
-            for attempt in range(self._max_retries):
-                try:
-                    if action == "NOOP_LEGACY":
-                        success = True
-                        await self._append_log(
-                            episode_id,
-                            {
-                                "step": action,
-                                "phase": "noop",
-                                "attempt": attempt + 1,
-                                "info": "NOOP_LEGACY executed",
-                            },
-                        )
-                    
-                    elif action == "UNSTAKE":
-                        # só desestaca se status indica que há gauge e está staked
-                        st = await self._lp.get_status(dex, alias)
-                        if not st:
-                            raise RuntimeError("status_unavailable_before_unstake")
-
-                        if bool(st.get("has_gauge")) and (st.get("staked") or st.get("position_location") == "gauge"):
-                            res = await self._lp.post_unstake(dex, alias)
-                            await self._append_log(episode_id, {
-                                "step": action, "phase": "unstake_call",
-                                "attempt": attempt + 1, "request": {"dex": dex, "alias": alias},
-                                "response": res,
-                            })
-                            if res is None:
-                                raise RuntimeError("unstake_failed")
-                        else:
-                            await self._append_log(episode_id, {
-                                "step": action, "phase": "skip_no_stake",
-                                "attempt": attempt + 1,
-                                "reason": "no gauge or already unstaked",
-                            })
-                        success = True
-                    
-                    elif action == "COLLECT":
-                        st = await self._lp.get_status(dex, alias)
-                        if not st:
-                            raise RuntimeError("status_unavailable_before_swap")
-                        
-                        position_location = st.get("position_location", None)
-                        if position_location == "pool":
-                            res = await self._lp.post_collect(dex, alias)
-                            await self._append_log(
-                                episode_id,
-                                {
-                                    "step": action,
-                                    "attempt": attempt + 1,
-                                    "request": {"dex": dex, "alias": alias},
-                                    "response": res,
-                                },
-                            )
-                            if res is None:
-                                raise RuntimeError("collect_failed")
-                        
-                        success = True
-                            
-                    elif action == "WITHDRAW":
-                        st = await self._lp.get_status(dex, alias)
-                        if not st:
-                            raise RuntimeError("status_unavailable_before_swap")
-                        
-                        position_location = st.get("position_location", None)
-                        if position_location == "pool":
-                            # always withdraw mode "pool" to bring capital back idle
-                            res = await self._lp.post_withdraw(dex, alias, mode="pool")
-                            await self._append_log(
-                                episode_id,
-                                {
-                                    "step": action,
-                                    "attempt": attempt + 1,
-                                    "request": {"dex": dex, "alias": alias, "mode": "pool"},
-                                    "response": res,
-                                },
-                            )
-                            if res is None:
-                                raise RuntimeError("withdraw_failed")
-                            
-                        success = True
-
-                    elif action == "SWAP_EXACT_IN_REWARD":
-                        # after withdraw, capital is idle in vault.
-                        st = await self._lp.get_status(dex, alias)
-                        if not st:
-                            raise RuntimeError("status_unavailable_before_swap")
-                        
-                        gauge_reward_balances = st.get("gauge_reward_balances", {}) or {}
-                        reward_token = gauge_reward_balances.get("token", None)
-                        reward_symbol = gauge_reward_balances.get("symbol", None)
-                        reward_in_vault = gauge_reward_balances.get("in_vault", 0.0)
-                        reward_in_vault_to_swap = reward_in_vault - 0.000001
-                        
-                        if reward_token and reward_symbol and reward_in_vault > 0:
-                            # log snapshot BEFORE swap calc
-                            await self._append_log(
-                                episode_id,
-                                {
-                                    "step": action,
-                                    "phase": "pre_calc",
-                                    "attempt": attempt + 1,
-                                    "reward_token": reward_token,
-                                    "reward_symbol": reward_symbol,
-                                    "reward_in_vault": reward_in_vault,
-                                    "reward_in_vault_to_swap": reward_in_vault_to_swap
-                                },
-                            )
-                            
-                            res = await self._lp.post_swap_exact_in(
-                                dex=dex if dex == "pancake" else "uniswap",
-                                alias=alias,
-                                token_in=reward_token,
-                                token_out=token1_addr,
-                                amount_in=reward_in_vault_to_swap,
-                                pool_override="CAKE_USDC" if dex == "pancake" else "AERO_USDC",
-                                convert_gauge_to_usdc=True
-                            )
-                                
-                            await self._append_log(
-                                episode_id,
-                                {
-                                    "step": action,
-                                    "phase": "swap_call",
-                                    "attempt": attempt + 1,
-                                    "request": {
-                                        "token_in": reward_token,
-                                        "token_out": token1_addr,
-                                        "amount_in_usd": reward_in_vault_to_swap,
-                                    },
-                                    "response": res,
-                                },
-                            )
-
-                            if res is None:
-                                raise RuntimeError("swap_failed")
-
-                            success = True
-                        else:
-                            await self._append_log(
-                                episode_id,
-                                    {
-                                        "step": action,
-                                        "phase": "skip_small",
-                                        "attempt": attempt + 1,
-                                        "reward_token": reward_token,
-                                        "reward_symbol": reward_symbol,
-                                        "reward_in_vault": reward_in_vault
-                                    },
-                                )
-                            success = True
-                            
-                    elif action == "SWAP_EXACT_IN":
-                        # after withdraw, capital is idle in vault.
-                        st = await self._lp.get_status(dex, alias)
-                        if not st:
-                            raise RuntimeError("status_unavailable_before_swap")
-                        
-                        holdings = st.get("holdings", {}) or {}
-                        totals = holdings.get("totals", {}) or {}
-                        amt0 = float(totals.get("token0", 0.0))
-                        amt1 = float(totals.get("token1", 0.0))
-                        
-                        prices = st.get("prices", {}) or {}
-                        current_prices = prices.get("current", {}) or {}
-                        p_t1_t0 = float(current_prices.get("p_t1_t0", 0.0))
-                    
-                        # log snapshot BEFORE swap calc
-                        await self._append_log(
-                            episode_id,
-                            {
-                                "step": action,
-                                "phase": "pre_calc",
-                                "attempt": attempt + 1,
-                                "holdings_raw": {
-                                    "amt0": amt0,
-                                    "amt1": amt1,
-                                },
-                                "price_snapshot": {
-                                    "p_t1_t0": p_t1_t0,
-                                },
-                            },
-                        )
-
-                        if p_t1_t0 <= 0.0:
-                            # sem preço confiável = não dá pra calcular USD; nesse caso a gente não swapa
-                            await self._append_log(
-                                episode_id,
-                                {
-                                    "step": action,
-                                    "phase": "skip_no_price",
-                                    "attempt": attempt + 1,
-                                    "reason": "p_t1_t0 <= 0",
-                                },
-                            )
-                            success = True
-                        else:
-                            usd0 = amt0 * p_t1_t0  # quanto vale nosso token0 em USDC
-                            usd1 = amt1            # token1 já é USDC
-                            total_usd = usd0 + usd1
-                            P = p_t1_t0
-                            
-                            Pa = step["payload"].get("lower_price")
-                            Pb = step["payload"].get("upper_price")
-                            L_target = self._L_closed(total_usd, P, Pa, Pb)
-                            t0_needed, t1_needed = self._tokens_from_L(L_target, Pa, Pb, P)
-                            
-                            majority_flag = episode.get("majority_on_open")
-                            
-                            falta_t0 = None
-                            falta_t1 = None
-                            t0_needed_usd = None
-                            if majority_flag == "token1":
-                                # queremos alinhar token1 (USDC-like)
-                                falta_t1 = t1_needed - usd1
-                                if falta_t1 > 0:
-                                    token_in_addr = token0_addr  # vender WETH
-                                    token_out_addr = token1_addr # comprar USDC
-                                    req_amount_usd = falta_t1
-                                    direction = "WETH->USDC"
-                                else:
-                                    token_in_addr = token1_addr  # vender USDC
-                                    token_out_addr = token0_addr # comprar WETH
-                                    req_amount_usd = (-falta_t1)
-                                    direction = "USDC->WETH"
-                                    
-                            else:
-                                # majority_flag == "token2" (WETH)
-                                t0_needed_usd = t0_needed * P
-                                falta_t0  = t0_needed_usd - usd0
-                                if falta_t0 > 0:
-                                    token_in_addr = token1_addr  # vender USDC
-                                    token_out_addr = token0_addr # comprar WETH
-                                    req_amount_usd = falta_t0
-                                    direction = "USDC->WETH"
-                                else:
-                                    token_in_addr = token0_addr  # vender WETH
-                                    token_out_addr = token1_addr # comprar USDC
-                                    req_amount_usd = (-falta_t0)
-                                    direction = "WETH->USDC"
-
-                            # para evitar o valor exato e causar erros de saldo
-                            req_amount_usd = req_amount_usd - 0.01
-                            
-                            # log cálculo alvo
-                            await self._append_log(
-                                episode_id,
-                                {
-                                    "step": action,
-                                    "phase": "calc_swap",
-                                    "attempt": attempt + 1,
-                                    "majority_flag": majority_flag,
-                                    "p_t1_t0": p_t1_t0,
-                                    "usd0": usd0,
-                                    "usd1": usd1,
-                                    "total_usd": total_usd,
-                                    "t0_needed":t0_needed if t0_needed else None,
-                                    "t1_needed": t1_needed if t1_needed else None,
-                                    "falta_t1": falta_t1 if falta_t1 else None,
-                                    "falta_t0": falta_t0 if falta_t0 else None,
-                                    "t0_needed_usd": t0_needed_usd if t0_needed_usd else None,
-                                    "req_amount_usd": req_amount_usd if req_amount_usd else None,
-                                    "direction": direction,
-                                    "request_amount_in_usd": req_amount_usd,
-                                },
-                            )
-
-                            # se req_amount_usd ~ 0, nada a fazer
-                            if req_amount_usd <= 0.0:
-                                await self._append_log(
-                                    episode_id,
-                                    {
-                                        "step": action,
-                                        "phase": "skip_small",
-                                        "attempt": attempt + 1,
-                                        "reason": "no meaningful delta",
-                                    },
-                                )
-                                success = True
-                            else:
-                                res = await self._lp.post_swap_exact_in(
-                                    dex="aerodrome", # todas as pools sao WETH/USDC, entao o swap sempre aerodrome com fee 0.0008
-                                    alias=alias,
-                                    token_in=token_in_addr,
-                                    token_out=token_out_addr,
-                                    amount_in_usd=req_amount_usd if direction == "WETH->USDC" else None,
-                                    amount_in=req_amount_usd if direction == "USDC->WETH" else None,
-                                    pool_override="WETH_USDC" if dex == "pancake" else None
-                                )
-
-                                await self._append_log(
-                                    episode_id,
-                                    {
-                                        "step": action,
-                                        "phase": "swap_call",
-                                        "attempt": attempt + 1,
-                                        "request": {
-                                            "token_in": token_in_addr,
-                                            "token_out": token_out_addr,
-                                            "amount_in_usd": req_amount_usd,
-                                        },
-                                        "response": res,
-                                    },
-                                )
-
-                                if res is None:
-                                    raise RuntimeError("swap_failed")
-
-                                success = True
-                                                 
-                    elif action == "OPEN":
-                        # Antes de abrir nova faixa, snapshot de idle caps atuais
-                        st2 = await self._lp.get_status(dex, alias)
-                        if not st2:
-                            raise RuntimeError("status_unavailable_before_open")
-
-                        hold2 = st2.get("holdings", {}) or {}
-                        totals2 = hold2.get("totals", {}) or {}
-                        cap0 = float(totals2.get("token0", 0.0))
-                        cap1 = float(totals2.get("token1", 0.0))
-
-                        lower_price = step["payload"].get("lower_price")
-                        upper_price = step["payload"].get("upper_price")
-
-                        await self._append_log(
-                            episode_id,
-                            {
-                                "step": action,
-                                "phase": "pre_open",
-                                "attempt": attempt + 1,
-                                "idle_caps": {
-                                    "cap0": cap0,
-                                    "cap1": cap1,
-                                },
-                                "range": {
-                                    "lower_price": lower_price,
-                                    "upper_price": upper_price,
-                                },
-                            },
-                        )
-
-                        # Chamar o novo endpoint open
-                        res = await self._lp.post_open(
-                            dex=dex,
-                            alias=alias,
-                            lower_price=lower_price,
-                            upper_price=upper_price,
-                            lower_tick=None,
-                            upper_tick=None,
-                        )
-
-                        await self._append_log(
-                            episode_id,
-                            {
-                                "step": action,
-                                "phase": "open_call",
-                                "attempt": attempt + 1,
-                                "request": {
-                                    "lower_price": lower_price,
-                                    "upper_price": upper_price,
-                                },
-                                "response": res,
-                            },
-                        )
-
-                        if res is None:
-                            raise RuntimeError("open_failed")
-                        success = True
-                    
-                    elif action == "STAKE":
-                        # estaca somente se existir gauge e a posição estiver no pool (não-gauge)
-                        st = await self._lp.get_status(dex, alias)
-                        if not st:
-                            raise RuntimeError("status_unavailable_before_stake")
-
-                        if bool(st.get("has_gauge")) and (st.get("position_location") != "gauge"):
-                            # token_id é opcional; o provider pode resolver internamente
-                            token_id = step.get("payload", {}).get("token_id")
-                            res = await self._lp.post_stake(dex, alias, token_id=token_id)
-                            await self._append_log(episode_id, {
-                                "step": action, "phase": "stake_call",
-                                "attempt": attempt + 1, "request": {"token_id": token_id},
-                                "response": res,
-                            })
-                            if res is None:
-                                raise RuntimeError("stake_failed")
-                        else:
-                            await self._append_log(episode_id, {
-                                "step": action, "phase": "skip_no_gauge",
-                                "attempt": attempt + 1,
-                                "reason": "no gauge or already staked",
-                            })
-                        success = True
-
-                    else:
-                        raise RuntimeError(f"unknown action {action}")
-
-                    if success:
-                        break
-
-                except Exception as exc:
-                    last_err = str(exc)
-                    self._logger.warning(
-                        "Step %s failed on attempt %s/%s: %s",
-                        action, attempt + 1, self._max_retries, exc,
-                    )
-                    
-                    await self._append_log(
-                        episode_id,
-                        {
-                            "step": action,
-                            "phase": "attempt_fail",
-                            "attempt": attempt + 1,
-                            "error": last_err,
-                        },
-                    )
-                    
-                    # incremental backoff
-                    await asyncio.sleep(self._base_backoff * (attempt + 1))
+            success, last_err = await self._with_retry(ctx, _StepCtx.from_step(step))
+            if action != "WITHDRAW":
+                ctx.last_holdings = None
 
             if not success:
                 # hard fail -> mark FAILED and stop this signal
+                self._vault_unsettled(dex, alias)
                 await self._signals.mark_failure(sig, last_err or f"{action} failed")
                 
                 await self._append_log(
@@ -601,3 +519,471 @@ class ExecuteSignalPipelineUseCase:
             },
         )
         return True
+
+    def _vault_unsettled(self, dex: Optional[str], alias: Optional[str]) -> None:
+        """Report a vault whose step failed or was skipped (see `on_vault_unsettled`)."""
+        if self._on_vault_unsettled is not None and dex and alias:
+            self._on_vault_unsettled(dex, alias)
+
+    async def _with_retry(self, ctx: _SignalCtx, sc: _StepCtx) -> Tuple[bool, Optional[str]]:
+        """
+        Runs the step's handler up to `max_retries` times.
+        Returns (success, last error message).
+        """
+        action = sc.action
+        handler = self._handlers.get(action, self._do_unknown)
+        dex, alias = ctx.dex, ctx.alias
+        last_err: Optional[str] = None
+
+        for attempt in range(self._max_retries):
+            try:
+                await handler(ctx, sc, attempt)
+                return True, None
+
+            except Exception as exc:
+                last_err = str(exc)
+                # só falha transitória do provider merece nova tentativa; o resto (permanente,
+                # circuito aberto, bug) é registrado uma vez e encerra o step
+                retryable = isinstance(exc, TransientPipelineError)
+                # a nova tentativa relê o /status
+                if dex and alias:
+                    self._lp.invalidate(dex, alias)
+                if retryable:
+                    self._logger.warning(
+                        "Step %s failed on attempt %s/%s: %s",
+                        action, attempt + 1, self._max_retries, exc,
+                    )
+                elif isinstance(exc, (PermanentPipelineError, CircuitOpenError)):
+                    self._logger.warning("Step %s failed permanently: %s", action, exc)
+                else:
+                    self._logger.exception("Step %s raised unexpectedly: %s", action, exc)
+
+                await self._append_log(
+                    ctx.episode_id,
+                    {
+                        "step": action,
+                        "phase": "attempt_fail",
+                        "attempt": attempt + 1,
+                        "error": last_err,
+                    },
+                )
+
+                if not retryable:
+                    break
+                # backoff exponencial com jitter total; sem espera depois da última tentativa
+                if attempt < self._max_retries - 1:
+                    cap = min(self._max_backoff, self._base_backoff * (2 ** attempt))
+                    await asyncio.sleep(random.uniform(0, cap))
+
+        return False, last_err
+
+    # ---- handlers de step: retornam em caso de sucesso, levantam em caso de falha ----
+
+    async def _do_unknown(self, ctx: _SignalCtx, sc: _StepCtx, attempt: int) -> None:
+        raise PermanentPipelineError(f"unknown action {sc.action}")
+
+    async def _do_noop(self, ctx: _SignalCtx, sc: _StepCtx, attempt: int) -> None:
+        await self._append_log(
+            ctx.episode_id,
+            {
+                "step": sc.action,
+                "phase": "noop",
+                "attempt": attempt + 1,
+                "info": "NOOP_LEGACY executed",
+            },
+        )
+
+    async def _do_unstake(self, ctx: _SignalCtx, sc: _StepCtx, attempt: int) -> None:
+        dex, alias = ctx.dex, ctx.alias
+        # só desestaca se status indica que há gauge e está staked
+        st = await self._lp.get_status(dex, alias)
+        if not st:
+            raise TransientPipelineError("status_unavailable_before_unstake")
+
+        if bool(st.get("has_gauge")) and (st.get("staked") or st.get("position_location") == "gauge"):
+            res = await self._lp.post_unstake(dex, alias)
+            await self._append_log(ctx.episode_id, {
+                "step": sc.action, "phase": "unstake_call",
+                "attempt": attempt + 1, "request": ctx.vault_req,
+                "response": res,
+            })
+            if res is None:
+                raise TransientPipelineError("unstake_failed")
+        else:
+            await self._append_log(ctx.episode_id, {
+                "step": sc.action, "phase": "skip_no_stake",
+                "attempt": attempt + 1,
+                "reason": "no gauge or already unstaked",
+            })
+
+    async def _do_collect(self, ctx: _SignalCtx, sc: _StepCtx, attempt: int) -> None:
+        dex, alias = ctx.dex, ctx.alias
+        st = await self._lp.get_status(dex, alias)
+        if not st:
+            raise TransientPipelineError("status_unavailable_before_swap")
+        
+        position_location = st.get("position_location", None)
+        if position_location == "pool":
+            res = await self._lp.post_collect(dex, alias)
+            await self._append_log(
+                ctx.episode_id,
+                {
+                    "step": sc.action,
+                    "attempt": attempt + 1,
+                    "request": ctx.vault_req,
+                    "response": res,
+                },
+            )
+            if res is None:
+                raise TransientPipelineError("collect_failed")
+
+    async def _do_withdraw(self, ctx: _SignalCtx, sc: _StepCtx, attempt: int) -> None:
+        dex, alias = ctx.dex, ctx.alias
+        st = await self._lp.get_status(dex, alias)
+        if not st:
+            raise TransientPipelineError("status_unavailable_before_swap")
+        
+        position_location = st.get("position_location", None)
+        if position_location == "pool":
+            # always withdraw mode "pool" to bring capital back idle
+            res = await self._lp.post_withdraw(dex, alias, mode="pool")
+            await self._append_log(
+                ctx.episode_id,
+                {
+                    "step": sc.action,
+                    "attempt": attempt + 1,
+                    "request": {"dex": dex, "alias": alias, "mode": "pool"},
+                    "response": res,
+                },
+            )
+            if res is None:
+                raise TransientPipelineError("withdraw_failed")
+            ctx.last_holdings = _VaultSnapshot.from_exit_response(res)
+
+    async def _do_swap_reward(self, ctx: _SignalCtx, sc: _StepCtx, attempt: int) -> None:
+        dex, alias = ctx.dex, ctx.alias
+        episode_id = ctx.episode_id
+        # after withdraw, capital is idle in vault.
+        st = await self._lp.get_status(dex, alias)
+        if not st:
+            raise TransientPipelineError("status_unavailable_before_swap")
+        
+        gauge_reward_balances = st.get("gauge_reward_balances", {}) or {}
+        reward_token = gauge_reward_balances.get("token", None)
+        reward_symbol = gauge_reward_balances.get("symbol", None)
+        reward_in_vault = gauge_reward_balances.get("in_vault", 0.0)
+        reward_in_vault_to_swap = reward_in_vault - 0.000001
+        
+        if not (reward_token and reward_symbol and reward_in_vault > 0):
+            await self._append_log(
+                episode_id,
+                {
+                    "step": sc.action,
+                    "phase": "skip_small",
+                    "attempt": attempt + 1,
+                    "reward_token": reward_token,
+                    "reward_symbol": reward_symbol,
+                    "reward_in_vault": reward_in_vault
+                },
+            )
+            return
+
+        # log snapshot BEFORE swap calc
+        await self._append_log(
+            episode_id,
+            {
+                "step": sc.action,
+                "phase": "pre_calc",
+                "attempt": attempt + 1,
+                "reward_token": reward_token,
+                "reward_symbol": reward_symbol,
+                "reward_in_vault": reward_in_vault,
+                "reward_in_vault_to_swap": reward_in_vault_to_swap
+            },
+        )
+        
+        res = await self._lp.post_swap_exact_in(
+            dex=dex if dex == "pancake" else "uniswap",
+            alias=alias,
+            token_in=reward_token,
+            token_out=ctx.token1_addr,
+            amount_in=reward_in_vault_to_swap,
+            pool_override="CAKE_USDC" if dex == "pancake" else "AERO_USDC",
+            convert_gauge_to_usdc=True
+        )
+            
+        await self._append_log(
+            episode_id,
+            {
+                "step": sc.action,
+                "phase": "swap_call",
+                "attempt": attempt + 1,
+                "request": {
+                    "token_in": reward_token,
+                    "token_out": ctx.token1_addr,
+                    "amount_in_usd": reward_in_vault_to_swap,
+                },
+                "response": res,
+            },
+        )
+
+        if res is None:
+            raise TransientPipelineError("swap_failed")
+
+    def _swap_plan(self, ctx: _SignalCtx, sc: _StepCtx, snap: _VaultSnapshot) -> _SwapPlan:
+        """
+        Sizes the target position for the snapshot and the swap that aligns the majority side.
+        Expects a positive price and the step's band.
+        """
+        usd0 = snap.amt0 * snap.p_t1_t0  # quanto vale nosso token0 em USDC
+        usd1 = snap.amt1                 # token1 já é USDC
+        total_usd = usd0 + usd1
+        P = snap.p_t1_t0
+        
+        Pa, Pb = sc.lower_price, sc.upper_price
+        if sc.band_roots is None:
+            sc.band_roots = (sqrt(Pa), sqrt(Pb))
+        L_target, t0_needed, t1_needed = self._size_position(total_usd, P, Pa, Pb, sc.band_roots)
+
+        falta_t0 = None
+        falta_t1 = None
+        t0_needed_usd = None
+        if ctx.majority_flag == "token1":
+            # queremos alinhar token1 (USDC-like)
+            falta_t1 = delta_usd = t1_needed - usd1
+        else:
+            # majority_flag == "token2" (WETH)
+            t0_needed_usd = t0_needed * P
+            falta_t0 = delta_usd = t0_needed_usd - usd0
+        in_side, out_side, direction = _SWAP_SIDES[(ctx.majority_flag == "token1", delta_usd > 0)]
+
+        return _SwapPlan(
+            usd0=usd0,
+            usd1=usd1,
+            total_usd=total_usd,
+            t0_needed=t0_needed,
+            t1_needed=t1_needed,
+            falta_t0=falta_t0,
+            falta_t1=falta_t1,
+            t0_needed_usd=t0_needed_usd,
+            in_side=in_side,
+            out_side=out_side,
+            direction=direction,
+            # para evitar o valor exato e causar erros de saldo
+            req_amount_usd=abs(delta_usd) - 0.01,
+        )
+
+    async def _do_swap(self, ctx: _SignalCtx, sc: _StepCtx, attempt: int) -> None:
+        lower_price, upper_price = sc.lower_price, sc.upper_price
+        if lower_price is None or upper_price is None:
+            raise PermanentPipelineError("missing_band_in_payload")
+        dex, alias = ctx.dex, ctx.alias
+        episode_id = ctx.episode_id
+        action = sc.action
+
+        # o WITHDRAW anterior já devolveu saldos e preço: se o delta é poeira, nem lê o /status
+        pre = ctx.last_holdings
+        ctx.last_holdings = None
+        if pre is not None:
+            pre_plan = self._swap_plan(ctx, sc, pre)
+            if pre_plan.req_amount_usd <= 0.0:
+                self._vault_unsettled(ctx.dex, ctx.alias)
+                await self._append_log(
+                    episode_id,
+                    {
+                        "step": action,
+                        "phase": "skip_small_precomputed",
+                        "attempt": attempt + 1,
+                        "holdings_raw": {"amt0": pre.amt0, "amt1": pre.amt1},
+                        "price_snapshot": {"p_t1_t0": pre.p_t1_t0},
+                        "direction": pre_plan.direction,
+                        "reason": "no meaningful delta after withdraw",
+                    },
+                )
+                return
+
+        # after withdraw, capital is idle in vault.
+        st = await self._lp.get_status(dex, alias)
+        if not st:
+            raise TransientPipelineError("status_unavailable_before_swap")
+        
+        snap = _VaultSnapshot.from_status(st)
+        amt0, amt1, p_t1_t0 = snap.amt0, snap.amt1, snap.p_t1_t0
+    
+        # log snapshot BEFORE swap calc
+        await self._append_log(
+            episode_id,
+            {
+                "step": action,
+                "phase": "pre_calc",
+                "attempt": attempt + 1,
+                "holdings_raw": {
+                    "amt0": amt0,
+                    "amt1": amt1,
+                },
+                "price_snapshot": {
+                    "p_t1_t0": p_t1_t0,
+                },
+            },
+        )
+
+        if p_t1_t0 <= 0.0:
+            # sem preço confiável = não dá pra calcular USD; nesse caso a gente não swapa
+            await self._append_log(
+                episode_id,
+                {
+                    "step": action,
+                    "phase": "skip_no_price",
+                    "attempt": attempt + 1,
+                    "reason": "p_t1_t0 <= 0",
+                },
+            )
+            return
+
+        plan = self._swap_plan(ctx, sc, snap)
+        direction = plan.direction
+        token_in_addr = (ctx.token0_addr, ctx.token1_addr)[plan.in_side]
+        token_out_addr = (ctx.token0_addr, ctx.token1_addr)[plan.out_side]
+        req_amount_usd = plan.req_amount_usd
+        
+        # log cálculo alvo (campos do ramo não usado / zerados ficam de fora)
+        calc_log = {
+            "step": action,
+            "phase": "calc_swap",
+            "attempt": attempt + 1,
+            "majority_flag": ctx.majority_flag,
+            "p_t1_t0": p_t1_t0,
+            "usd0": plan.usd0,
+            "usd1": plan.usd1,
+            "total_usd": plan.total_usd,
+            "direction": direction,
+        }
+        calc_log.update({
+            k: v for k, v in (
+                ("t0_needed", plan.t0_needed),
+                ("t1_needed", plan.t1_needed),
+                ("falta_t1", plan.falta_t1),
+                ("falta_t0", plan.falta_t0),
+                ("t0_needed_usd", plan.t0_needed_usd),
+                ("req_amount_usd", req_amount_usd),
+            ) if v
+        })
+        await self._append_log(episode_id, calc_log)
+
+        # se req_amount_usd ~ 0, nada a fazer
+        if req_amount_usd <= 0.0:
+            self._vault_unsettled(ctx.dex, ctx.alias)
+            await self._append_log(
+                episode_id,
+                {
+                    "step": action,
+                    "phase": "skip_small",
+                    "attempt": attempt + 1,
+                    "reason": "no meaningful delta",
+                },
+            )
+            return
+
+        res = await self._lp.post_swap_exact_in(
+            dex="aerodrome", # todas as pools sao WETH/USDC, entao o swap sempre aerodrome com fee 0.0008
+            alias=alias,
+            token_in=token_in_addr,
+            token_out=token_out_addr,
+            amount_in_usd=req_amount_usd if direction == "WETH->USDC" else None,
+            amount_in=req_amount_usd if direction == "USDC->WETH" else None,
+            pool_override="WETH_USDC" if dex == "pancake" else None
+        )
+
+        await self._append_log(
+            episode_id,
+            {
+                "step": action,
+                "phase": "swap_call",
+                "attempt": attempt + 1,
+                "request": {
+                    "token_in": token_in_addr,
+                    "token_out": token_out_addr,
+                    "amount_in_usd": req_amount_usd,
+                },
+                "response": res,
+            },
+        )
+
+        if res is None:
+            raise TransientPipelineError("swap_failed")
+
+    async def _do_open(self, ctx: _SignalCtx, sc: _StepCtx, attempt: int) -> None:
+        lower_price, upper_price = sc.lower_price, sc.upper_price
+        if lower_price is None or upper_price is None:
+            raise PermanentPipelineError("missing_band_in_payload")
+        dex, alias = ctx.dex, ctx.alias
+        # Antes de abrir nova faixa, snapshot de idle caps atuais
+        st2 = await self._lp.get_status(dex, alias)
+        if not st2:
+            raise TransientPipelineError("status_unavailable_before_open")
+
+        snap2 = _VaultSnapshot.from_status(st2)
+        cap0, cap1 = snap2.amt0, snap2.amt1
+
+        await self._append_log(
+            ctx.episode_id,
+            {
+                "step": sc.action,
+                "phase": "pre_open",
+                "attempt": attempt + 1,
+                "idle_caps": {
+                    "cap0": cap0,
+                    "cap1": cap1,
+                },
+                "range": sc.band,
+            },
+        )
+
+        # Chamar o novo endpoint open
+        res = await self._lp.post_open(
+            dex=dex,
+            alias=alias,
+            lower_price=lower_price,
+            upper_price=upper_price,
+            lower_tick=None,
+            upper_tick=None,
+        )
+
+        await self._append_log(
+            ctx.episode_id,
+            {
+                "step": sc.action,
+                "phase": "open_call",
+                "attempt": attempt + 1,
+                "request": sc.band,
+                "response": res,
+            },
+        )
+
+        if res is None:
+            raise TransientPipelineError("open_failed")
+
+    async def _do_stake(self, ctx: _SignalCtx, sc: _StepCtx, attempt: int) -> None:
+        dex, alias = ctx.dex, ctx.alias
+        # estaca somente se existir gauge e a posição estiver no pool (não-gauge)
+        st = await self._lp.get_status(dex, alias)
+        if not st:
+            raise TransientPipelineError("status_unavailable_before_stake")
+
+        if bool(st.get("has_gauge")) and (st.get("position_location") != "gauge"):
+            # token_id é opcional; o provider pode resolver internamente
+            token_id = sc.payload.get("token_id")
+            res = await self._lp.post_stake(dex, alias, token_id=token_id)
+            await self._append_log(ctx.episode_id, {
+                "step": sc.action, "phase": "stake_call",
+                "attempt": attempt + 1, "request": {"token_id": token_id},
+                "response": res,
+            })
+            if res is None:
+                raise TransientPipelineError("stake_failed")
+        else:
+            await self._append_log(ctx.episode_id, {
+                "step": sc.action, "phase": "skip_no_gauge",
+                "attempt": attempt + 1,
+                "reason": "no gauge or already staked",
+            })
@@ -1,11 +1,15 @@
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import List, Optional, Tuple
 
 from ..repositories.candle_repository import CandleRepository
 from ..repositories.indicator_set_repository import IndicatorSetRepository
+from ..domain.entities.indicator_set_entity import IndicatorSetDoc
 from ..usecases.evaluate_active_strategies_use_case import EvaluateActiveStrategiesUseCase
 from ..repositories.processing_offset_repository import ProcessingOffsetRepository
-from ...adapters.external.binance.binance_websocket_client import BinanceWebsocketClient  # type: ignore
+from ...adapters.external.binance.binance_websocket_client import BinanceWebsocketClient, KlineEvent  # type: ignore
+from ..domain.entities.candle_entity import CandleDoc
 from .compute_indicators_use_case import ComputeIndicatorsUseCase
 
 
@@ -27,6 +31,7 @@ class StartRealtimeIngestionUseCase:
         indicator_set_repo: Optional[IndicatorSetRepository] = None,
         evaluate_use_case: Optional[EvaluateActiveStrategiesUseCase] = None,
         logger: logging.Logger | None = None,
+        active_sets_ttl_sec: float = 30.0,
     ):
         """
         :param symbol: Symbol to subscribe (e.g., 'ethusdt').
@@ -36,6 +41,7 @@ class StartRealtimeIngestionUseCase:
         :param processing_offset_repository: Offsets repository.
         :param compute_indicators_use_case: Optional indicators computation use case.
         :param logger: Optional logger.
+        :param active_sets_ttl_sec: How long the symbol's ACTIVE indicator sets are reused (0 disables).
         """
         self._symbol = symbol.upper()
         self._interval = interval
@@ -47,6 +53,9 @@ class StartRealtimeIngestionUseCase:
         self._evaluate_uc = evaluate_use_case
         self._logger = logger or logging.getLogger(self.__class__.__name__)
         self._stream_key = f"{symbol.lower()}_{self._interval}"
+        # (instante da leitura, sets ativos do símbolo); sets mudam na escala humana, não por kline
+        self._active_sets_ttl = float(active_sets_ttl_sec)
+        self._active_sets: Optional[Tuple[float, List[IndicatorSetDoc]]] = None
         
     async def execute(self) -> None:
         """
@@ -56,24 +65,41 @@ class StartRealtimeIngestionUseCase:
         self._logger.info("Starting realtime ingestion for %s@kline_%s", self._symbol, self._interval)
         await self._ws.subscribe_kline_1m(self._symbol, self._on_kline_closed)
 
-    async def _on_kline_closed(self, event: Dict[str, Any]) -> None:
+    async def _active_sets_for_symbol(self) -> List[IndicatorSetDoc]:
+        now = time.monotonic()
+        hit = self._active_sets
+        if hit is not None and now - hit[0] < self._active_sets_ttl:
+            return hit[1]
+        active_sets = await self._indicator_set_repo.get_active_by_symbol(self._symbol)
+        if self._active_sets_ttl > 0:
+            self._active_sets = (now, active_sets)
+        return active_sets
+
+    def invalidate_active_sets(self) -> None:
+        """
+        Drop the cached ACTIVE indicator sets, so a new/changed set is used on the next kline.
+        """
+        self._active_sets = None
+
+    async def _on_kline_closed(self, event: KlineEvent) -> None:
         """
         Async callback invoked when a CLOSED kline is received.
         Maps the event into our document format and persists it. Then, optionally, computes indicators.
         """
         try:
-            k = event["k"]
-            candle_doc = {
-                "symbol": event["s"],
-                "interval": k["i"],  # expected '1m'
-                "open_time": int(k["t"]),
-                "close_time": int(k["T"]),
-                "open": float(k["o"]),
-                "high": float(k["h"]),
-                "low": float(k["l"]),
-                "close": float(k["c"]),
-                "volume": float(k["v"]),
-                "trades": int(k["n"]),
+            # campos já tipados pelo decoder do WS client: só copia
+            k = event.kline
+            candle_doc: CandleDoc = {
+                "symbol": event.symbol,
+                "interval": k.interval,  # expected '1m'
+                "open_time": k.open_time,
+                "close_time": k.close_time,
+                "open": k.open,
+                "high": k.high,
+                "low": k.low,
+                "close": k.close,
+                "volume": k.volume,
+                "trades": k.trades,
                 "is_closed": True,
             }
 
@@ -86,19 +112,26 @@ class StartRealtimeIngestionUseCase:
 
             # Trigger indicators and evaluation for each ACTIVE indicator set of this symbol
             if self._compute_indicators is not None and self._indicator_set_repo and self._evaluate_uc:
-                active_sets = await self._indicator_set_repo.get_active_by_symbol(self._symbol)
-                for indset in active_sets:
-                    snapshot = await self._compute_indicators.execute_for_indicator_set(
-                        symbol=self._symbol,
-                        interval=self._interval,
-                        ema_fast=int(indset["ema_fast"]),
-                        ema_slow=int(indset["ema_slow"]),
-                        atr_window=int(indset["atr_window"]),
-                        indicator_set_id=indset.get("_id", indset["cfg_hash"]),
-                        cfg_hash=indset["cfg_hash"],
-                    )
-                    if snapshot:
-                        await self._evaluate_uc.execute_for_snapshot(indicator_set=indset, snapshot=snapshot)
+                active_sets = await self._active_sets_for_symbol()
+                # one candle load + one vectorized pass for all sets of this symbol
+                snapshots = await self._compute_indicators.execute_for_indicator_sets(
+                    symbol=self._symbol,
+                    interval=self._interval,
+                    indicator_sets=active_sets,
+                )
+                # sets are independent (own strategies/episodes): evaluate them concurrently
+                ready = [(indset, snapshot) for indset, snapshot in zip(active_sets, snapshots) if snapshot]
+                results = await asyncio.gather(
+                    *(self._evaluate_uc.execute_for_snapshot(indicator_set=indset, snapshot=snapshot)
+                      for indset, snapshot in ready),
+                    return_exceptions=True,
+                )
+                for (indset, _), res in zip(ready, results):
+                    if isinstance(res, Exception):
+                        self._logger.error(
+                            "Strategy evaluation failed for indicator set %s: %r", indset.get("cfg_hash"), res,
+                            exc_info=res,
+                        )
 
         except Exception as exc:
             self._logger.exception("Failed to process closed kline: %s", exc)
\ No newline at end of file
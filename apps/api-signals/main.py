@@ -1,6 +1,10 @@
+import asyncio
 import logging
+import logging.handlers
 import os
+import queue
 from contextlib import asynccontextmanager
+from typing import Optional
 
 from fastapi import FastAPI
 
@@ -9,9 +13,13 @@ from .adapters.entry.http.admin_router import router as admin_router
 from .workers.realtime_supervisor import RealtimeSupervisor
 
 
-def _setup_logging():
+def _setup_logging() -> Optional[logging.handlers.QueueListener]:
     """
     Configure basic logging. You can later replace this with structlog JSON logs.
+
+    Root handlers are moved behind a QueueHandler: a log call on the event loop only
+    enqueues the record, and a QueueListener thread does the formatting and stream I/O.
+    Returns the listener (stop it on shutdown to flush), or None if already set up.
     """
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
     logging.basicConfig(
@@ -19,6 +27,15 @@ def _setup_logging():
         format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
     )
 
+    root = logging.getLogger()
+    if any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers):
+        return None
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
 
 supervisor = RealtimeSupervisor()
 
@@ -28,11 +45,20 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context for startup/shutdown lifecycle.
     """
-    _setup_logging()
+    log_listener = _setup_logging()
     logging.getLogger(__name__).info("Starting api-signals (lifespan startup)...")
+    loop_module = type(asyncio.get_running_loop()).__module__
+    if not loop_module.startswith("uvloop"):
+        logging.getLogger(__name__).warning(
+            "Running on %s event loop; start uvicorn with --loop uvloop for better I/O throughput", loop_module
+        )
     await supervisor.start()
     
     app.state.db = supervisor.db
+    app.state.pipeline_http = supervisor.pipeline_http
+    app.state.evaluate_strategies = supervisor.evaluate_strategies
+    app.state.ingestion = supervisor.ingestion
+    app.state.indicator_sets = supervisor.indicator_sets
     
     app.include_router(admin_router)
     
@@ -41,6 +67,8 @@ async def lifespan(app: FastAPI):
     finally:
         logging.getLogger(__name__).info("Shutting down api-signals (lifespan shutdown)...")
         await supervisor.stop()
+        if log_listener is not None:
+            log_listener.stop()
 
 
 app = FastAPI(title="api-signals", version="0.1.0", lifespan=lifespan)
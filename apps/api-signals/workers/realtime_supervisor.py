@@ -16,6 +16,7 @@ from ..adapters.external.database.candle_repository_mongodb import CandleReposit
 from ..adapters.external.database.processing_offset_repository_mongodb import ProcessingOffsetRepositoryMongoDB
 from ..adapters.external.database.indicator_repository_mongodb import IndicatorRepositoryMongoDB
 from ..adapters.external.database.indicator_set_repository_mongodb import IndicatorSetRepositoryMongoDB
+from ..adapters.external.database.indicator_state_repository_mongodb import IndicatorStateRepositoryMongoDB
 from ..adapters.external.database.strategy_repository_mongodb import StrategyRepositoryMongoDB
 from ..adapters.external.database.strategy_episode_repository_mongodb import StrategyEpisodeRepositoryMongoDB
 from ..adapters.external.database.signal_repository_mongodb import SignalRepositoryMongoDB
@@ -43,15 +44,41 @@ class RealtimeSupervisor:
 
         self._ws_client: BinanceWebsocketClient | None = None
         self._ingestion_use_case: StartRealtimeIngestionUseCase | None = None
+        self._evaluate_uc: EvaluateActiveStrategiesUseCase | None = None
+        self._indicator_set_repo: IndicatorSetRepositoryMongoDB | None = None
 
+        self._pipeline_http: PipelineHttpClient | None = None
         self._signal_executor_uc: ExecuteSignalPipelineUseCase | None = None
         self._executor_task: asyncio.Task | None = None
+        # set by the evaluator after it writes PENDING signals; wakes the executor loop
+        self._signals_pending = asyncio.Event()
+        self._streak_flush_task: asyncio.Task | None = None
 
     @property
     def db(self):
         """Expose the AsyncIOMotorDatabase instance after start()."""
         return self._db
+
+    @property
+    def pipeline_http(self) -> PipelineHttpClient | None:
+        """Expose the process-wide PipelineHttpClient after start()."""
+        return self._pipeline_http
     
+    @property
+    def ingestion(self) -> StartRealtimeIngestionUseCase | None:
+        """Expose the realtime ingestion after start() (admin routes invalidate its cache)."""
+        return self._ingestion_use_case
+
+    @property
+    def indicator_sets(self) -> IndicatorSetRepositoryMongoDB | None:
+        """Expose the indicator-set repository after start() (admin routes share its caches)."""
+        return self._indicator_set_repo
+
+    @property
+    def evaluate_strategies(self) -> EvaluateActiveStrategiesUseCase | None:
+        """Expose the strategy evaluator after start() (admin routes invalidate its cache)."""
+        return self._evaluate_uc
+
     async def start(self):
         """
         Create connections, ensure indexes, and start realtime ingestion.
@@ -69,17 +96,20 @@ class RealtimeSupervisor:
         candle_repo = CandleRepositoryMongoDB(self._db)
         offset_repo = ProcessingOffsetRepositoryMongoDB(self._db)
         indicator_repo = IndicatorRepositoryMongoDB(self._db)
+        indicator_state_repo = IndicatorStateRepositoryMongoDB(self._db)
 
         await candle_repo.ensure_indexes()
         await offset_repo.ensure_indexes()
         await indicator_repo.ensure_indexes()
+        await indicator_state_repo.ensure_indexes()
 
-        # Indicator service + use case (stateless periods; provided per call)
+        # Indicator service + use case (periods provided per call; running EMA/ATR state per cfg_hash)
         indicator_svc = IndicatorCalculationService()
         compute_indicators_uc = ComputeIndicatorsUseCase(
             candle_repository=candle_repo,
             indicator_repository=indicator_repo,
             indicator_service=indicator_svc,
+            indicator_state_repository=indicator_state_repo,
         )
 
         # WebSocket client
@@ -87,6 +117,7 @@ class RealtimeSupervisor:
 
         # Strategy infra
         indicator_set_repo = IndicatorSetRepositoryMongoDB(self._db)
+        self._indicator_set_repo = indicator_set_repo
         strategy_repo = StrategyRepositoryMongoDB(self._db)
         episode_repo = StrategyEpisodeRepositoryMongoDB(self._db)
         signal_repo = SignalRepositoryMongoDB(self._db)
@@ -96,9 +127,10 @@ class RealtimeSupervisor:
         await episode_repo.ensure_indexes()
         await signal_repo.ensure_indexes()
 
-        # pipeline/vault HTTP client (our LP bridge)
+        # pipeline/vault HTTP client (our LP bridge) — single pooled instance for the whole process
         pipeline_base_url = os.getenv("LP_BASE_URL", "http://172.17.0.1:8000")
         pipeline_http = PipelineHttpClient(pipeline_base_url)
+        self._pipeline_http = pipeline_http
 
         # Reconciler: turns desired band -> ordered steps [COLLECT, WITHDRAW, SWAP, REBALANCE]
         reconciler = StrategyReconcilerService(pipeline_http)
@@ -109,7 +141,10 @@ class RealtimeSupervisor:
             episode_repo=episode_repo,
             signal_repo=signal_repo,
             reconciling_service=reconciler,
+            defer_streak_writes=True,
+            on_signals=self._signals_pending.set,
         )
+        self._evaluate_uc = evaluate_uc
 
         # Realtime ingestion orchestration (candles -> indicators -> evaluate strategies)
         self._ingestion_use_case = StartRealtimeIngestionUseCase(
@@ -128,22 +163,48 @@ class RealtimeSupervisor:
             signal_repo=signal_repo,
             episode_repo = episode_repo,
             lp_client=pipeline_http,
+            max_concurrency=int(os.getenv("SIGNAL_EXECUTOR_CONCURRENCY", "8")),
+            claim_ttl_sec=float(os.getenv("SIGNAL_CLAIM_TTL_SEC", "3600")),
+            # vault com step falho/pulado: o reconciler volta a ler o /status dele
+            on_vault_unsettled=reconciler.forget_vault,
         )
 
+        executor_poll_sec = float(os.getenv("SIGNAL_EXECUTOR_POLL_SEC", "30"))
+
         async def _executor_loop():
             """
             Forever-loop for executing pending signals. This runs in the background.
+            Runs as soon as the evaluator writes signals; the poll timeout still picks up
+            signals from elsewhere (other processes, requeued stale claims).
             """
             while True:
+                # cleared before the run: signals written during it trigger the next one
+                self._signals_pending.clear()
                 try:
                     await self._signal_executor_uc.execute_once()
                 except Exception as exc:
                     self._logger.exception("signal executor loop error: %s", exc)
-                await asyncio.sleep(5)
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._signals_pending.wait(), timeout=executor_poll_sec)
 
         # spawn executor loop task
         self._executor_task = asyncio.create_task(_executor_loop())
 
+        streak_flush_sec = float(os.getenv("STREAK_FLUSH_SEC", "5"))
+
+        async def _streak_flush_loop():
+            """
+            Periodically persist the episode streak counters the evaluator keeps in memory.
+            """
+            while True:
+                await asyncio.sleep(streak_flush_sec)
+                try:
+                    await evaluate_uc.flush()
+                except Exception as exc:
+                    self._logger.exception("streak flush error: %s", exc)
+
+        self._streak_flush_task = asyncio.create_task(_streak_flush_loop())
+
         # finally, start ingestion (this call sets up WS consuming etc.)
         await self._ingestion_use_case.execute()
         self._logger.info("Realtime ingestion started for %s@%s", symbol, interval)
@@ -156,13 +217,35 @@ class RealtimeSupervisor:
         # stop background executor loop
         if self._executor_task:
             self._executor_task.cancel()
-            with contextlib.suppress(Exception):
+            with contextlib.suppress(asyncio.CancelledError, Exception):
                 await self._executor_task
 
+        # write the execution logs still queued by the executor
+        if self._signal_executor_uc:
+            try:
+                await self._signal_executor_uc.aclose()
+            except Exception as exc:
+                self._logger.exception("execution log flush error: %s", exc)
+
         # close WS
         if self._ws_client:
             await self._ws_client.close()
 
+        # persist in-memory streak counters before Mongo goes away
+        if self._streak_flush_task:
+            self._streak_flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await self._streak_flush_task
+        if self._evaluate_uc:
+            try:
+                await self._evaluate_uc.flush()
+            except Exception as exc:
+                self._logger.exception("final streak flush error: %s", exc)
+
+        # close LP HTTP pool
+        if self._pipeline_http:
+            await self._pipeline_http.close()
+
         # close Mongo
         if self._mongo_client:
             self._mongo_client.close()